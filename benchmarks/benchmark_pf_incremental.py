@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------
+# Benchmark: direct vs. incremental evaluation of the trigger probability
+# in TDSR1 for different numbers of time steps (nt) and stress nodes (NZ)
+# --------------------------
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BENCHMARK_DIR = Path(__file__).parent
+REPO_ROOT = BENCHMARK_DIR.parent.absolute()
+sys.path.insert(0, str(REPO_ROOT))
+
+from tdsr import TDSR1, Config  # noqa: E402
+from tdsr.loading import CyclicLoading  # noqa: E402
+
+hours = 3600.0
+deltat = 1.0 * hours
+ntvalues = (1000, 5000, 20000)
+nzvalues = (1000, 10000, 50000)
+
+
+def timed(tdsr, **kwargs):
+    start = time.perf_counter()
+    t, chiz, cf, r, xn = tdsr(**kwargs)
+    return time.perf_counter() - start, r
+
+
+print("%8s %8s %12s %12s %8s %12s" % ("nt", "NZ", "direct[s]", "increm.[s]", "speedup", "max rel.err"))
+for nt in ntvalues:
+    tend = nt * deltat
+    config = Config(deltat=deltat, tend=tend, depthS=-0.5, t0=deltat)
+    # background trend adds 2 MPa over the whole simulation
+    loading = CyclicLoading(
+        strend=2.0 / tend, ampsin=0.2, Tsin=24 * hours, deltat=deltat, config=config
+    )
+    tdsr = TDSR1(config=config)
+    for NZ in nzvalues:
+        t_direct, r_direct = timed(tdsr, loading=loading, NZ=NZ)
+        t_inc, r_inc = timed(tdsr, loading=loading, NZ=NZ, pf_incremental=True)
+        good = r_direct > 0
+        err = np.max(np.abs(r_inc[good] / r_direct[good] - 1.0))
+        print(
+            "%8d %8d %12.3f %12.3f %8.2f %12.2e"
+            % (nt, NZ, t_direct, t_inc, t_direct / t_inc, err)
+        )
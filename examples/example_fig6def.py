@@ -7,7 +7,6 @@
 
 import sys
 import matplotlib.pyplot as plt
-from scipy import special
 import numpy as np
 from pathlib import Path
 
@@ -16,7 +15,9 @@ REPO_ROOT = EXAMPLE_DIR.parent.absolute()
 sys.path.insert(0, str(REPO_ROOT))
 
 from tdsr import TDSR1  # noqa: E402
-from tdsr.loading import CustomLoading  # noqa: E402, F401
+from tdsr.loading import PressureLoading  # noqa: E402
+from tdsr.loading.pressure import rudnicki_pressure  # noqa: E402
+from tdsr.utils import gridrange  # noqa: E402
 
 data_file = REPO_ROOT / "data/CFSloading_KTB.dat"
 figname = REPO_ROOT / "plots/fig6def"
@@ -72,43 +73,6 @@ def read_pressuredata():
     return tp, p
 
 
-def calculateP(Dm2s, tgrid, rdist, tq, dq):
-    """
-    Calculation of pore-pressure according to Rudnicki (1986); Eq.25
-    Input:
-    D:       [m2/s] hydraulic diffusivity
-    tq:      [days] time of changes in flow rate
-    dq:      [m^3/s] flow rate change
-    tgrid:   [days] time grid values
-    rdist:   [m] distance
-    Return:
-    P:       [MPa] pore pressure
-    """
-    ########################################
-    vd = 0.25  # drained Poisson's ratio
-    vu = 0.30  # undrained Poisson's ratio
-    mu = 1e9  # [Pa] shear modulus
-    alpha = 0.1  # Biot coefficient
-
-    # Segall & Lu 2015, below Eq.(2)
-    lambda_d = 2.0 * mu * vd / (1.0 - 2.0 * vd)
-    lambda_u = 2.0 * mu * vu / (1.0 - 2.0 * vu)
-
-    # Segall & Lu 2015, Eq.(4): k/eta = D * ketafac
-    ketafac = np.square(alpha) * (lambda_u + 2.0 * mu)
-    ketafac /= (lambda_u - lambda_d) * (lambda_d + 2.0 * mu)
-    kappa = D * ketafac
-    fac = 1.0 / (4 * np.pi * kappa)
-    P = np.zeros(len(tgrid))
-    for i in range(len(tgrid)):
-        tzero = tgrid[i]
-        dqi = dq[(tq < tzero)]
-        dti = (tzero - tq[(tq < tzero)]) * day2sec
-        psi = rdist / np.sqrt(D * dti)
-        P[i] = (fac / (D * rdist)) * np.sum(dqi * special.erfc(0.5 * psi))  # [Pa]
-    return P / 1e6
-
-
 # read observed data again to get some paramter for plotting and scaling
 # Graessle et al 2006: Distance between open hole section of PH and MH:
 # open sections: depth: MH: 5.2-5.6 km  PH: 3.85-4.0 and horizontally: 0.2 km
@@ -139,29 +103,13 @@ tstart = T1    # in days
 c_tstart = T1
 tend = T2      # in days
 deltat = 0.1   # in days
-nt = np.floor((tend - tstart) / deltat).astype(int)
-nt=nt+1
-tgrid = np.linspace(tstart, tend, nt)
-dt = np.ediff1d(tgrid, to_end=tgrid[-1] - tgrid[-2])
+_, _, nt, tgrid, dt = gridrange(tstart, tend, deltat)
 
-Pcalibration = calculateP(D, tgrid, r_calibration, tq, dq)  # for plotting pressure model
+# pore pressure [MPa] at the calibration distance, for plotting
+Pcalibration = rudnicki_pressure(tgrid, r_calibration, tq, dq, D)[0] / 1e6
 
 Ri = np.linspace(r10, r90, 10)
 print("\t P calculation in distance range: [%.0f - %.0f]m" % (Ri[0], Ri[-1]))
-dSr = np.zeros((len(Ri), len(tgrid)))
-for i, R in enumerate(Ri):
-    P = calculateP(D, tgrid, R, tq, dq)
-    dSr[i, :] = np.ediff1d(P, to_begin=0.0)   # pressure change, as later a tectonic loading is added
-
-common_loading = dict(
-    scal_t=1.0,
-    scal_cf=1.0,
-    c_tstart=c_tstart,
-    tstart=tstart,
-    tend=tend,
-    deltat=deltat,
-    strend = strend,
-)
 
 common = dict(
     chi0=chi0,
@@ -177,20 +125,28 @@ common = dict(
 )
 
 # ----- calculate earthquake rates with tdsm, lcm and rsm
+# stress model (normalized by friction) is sum of pore pressure and tectonic
+# loading, one stress history per distance to the injection point
+loading = PressureLoading(
+    distances=Ri,
+    tq=tq,
+    dq=dq,
+    diffusivity=D,
+    strend=strend,
+    tstart=tstart,
+    tend=tend,
+    deltat=deltat,
+    taxis_log=False,
+)
+
 ns = len(dsigvalues)
-cfs = np.zeros(nt)
 r_tdsr = np.zeros((ns, nt))
-
 for i, dsig in enumerate(dsigvalues):
     depthS = -dsig
-    R = np.zeros(len(tgrid))
-    for k in range(len(Ri)):   # calculate mean rate over different distances to injection point
-        dS = dSr[k,:] + strend * dt  
-        S = np.cumsum(dS)  # stress model (normalized by friction) is sum of pore pressure and tectonic loading 
-        loading = CustomLoading(data=np.transpose([tgrid, S]), **common_loading)
-        t, chiz, cf, r, xn = tdsr(loading=loading, depthS=depthS, **common)
-        r /= np.sum(r*dt)
-        r_tdsr[i,:] += r * len(teq)/len(Ri)
+    t, chiz, cf, r, xn = tdsr(loading=loading, depthS=depthS, **common)
+    # calculate mean rate over different distances to injection point
+    r /= np.sum(r * dt, axis=1, keepdims=True)
+    r_tdsr[i, :] = np.mean(r, axis=0) * len(teq)
 
 # -------- plot results
 cb = ["b", "r", "g"]
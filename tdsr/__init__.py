@@ -7,7 +7,18 @@ __email__ = "torsten.dahm@gfz-potsdam.de"
 
 from tdsr.version import version as __version__  # noqa: F401
 from tdsr.config import Config
-from tdsr.tdsr import CFM, LCM, RSD, RSD1, RSM, TDSR, TDSR1, Result, Traditional
+from tdsr.tdsr import (
+    CFM,
+    LCM,
+    RSD,
+    RSD1,
+    RSM,
+    TDSR,
+    TDSR1,
+    TDSR1Stream,
+    Result,
+    Traditional,
+)
 from tdsr.utils import load, save
 
 __all__ = [
@@ -17,6 +28,7 @@ __all__ = [
     "load",
     "TDSR",
     "TDSR1",
+    "TDSR1Stream",
     "LCM",
     "Traditional",
     "CFM",
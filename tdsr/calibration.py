@@ -0,0 +1,362 @@
+################################
+# Time Dependent Seismicity Model - Catalog likelihood calibration
+################################
+
+"""
+Calibration of the seismicity models with an event catalog. The
+catalog is treated as an inhomogeneous Poisson process with the model
+rate ``ratez(t)`` (linear between samples), i.e. the log-likelihood of
+the event times ``t_i`` in the window ``[tmin, tmax]`` is
+
+    sum_i log ratez(t_i) - integral_tmin^tmax ratez(t) dt
+
+The likelihood is maximised over chosen model parameters with a
+Nelder-Mead simplex search (:func:`nelder_mead`). Model rates are
+compared with a catalog bin by bin with :func:`evaluate_catalog`.
+"""
+
+import inspect
+from copy import deepcopy
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+import numpy as np
+import numpy.typing as npt
+from numpy.typing import ArrayLike
+
+from tdsr.config import Config
+from tdsr.exceptions import InvalidParameter, MissingParameter
+from tdsr.loading import Loading
+from tdsr.sweep import SharedLoading
+from tdsr.utils import cumulative_integral, gridrange, gridrange_log
+
+# parameters optimised in log magnitude (keeping the sign of the start value)
+SCALE_PARAMETERS = ("chi0", "t0", "depthS")
+
+
+def _locate(
+    t: npt.NDArray[np.float64], x: npt.NDArray[np.float64]
+) -> Tuple[npt.NDArray[np.int_], npt.NDArray[np.float64]]:
+    """
+    interval index and linear interpolation weight of ``x`` on ``t``, ``x``
+    outside of ``t`` is moved to the nearest end (no rate outside of ``t``)
+    """
+    x = np.clip(x, t[0], t[-1])
+    k = np.clip(np.searchsorted(t, x, side="right") - 1, 0, len(t) - 2)
+    w = (x - t[k]) / (t[k + 1] - t[k])
+    return k, w
+
+
+def rates_at(
+    t: npt.NDArray[np.float64], ratez: ArrayLike, events: ArrayLike
+) -> npt.NDArray[np.float64]:
+    """
+    Rates at the event times, linearly interpolated along the last axis
+    of ``ratez`` (..., nt); returns (..., nevents).
+    """
+    r = np.asarray(ratez, dtype=float)
+    k, w = _locate(t, np.asarray(events, dtype=float))
+    rates: npt.NDArray[np.float64] = r[..., k] * (1.0 - w) + r[..., k + 1] * w
+    return rates
+
+
+def cumulative_at(
+    t: npt.NDArray[np.float64], ratez: ArrayLike, x: ArrayLike
+) -> npt.NDArray[np.float64]:
+    """
+    Expected number of events from ``t[0]`` to the times ``x``, the exact
+    integral of the piecewise linear rate along the last axis of
+    ``ratez`` (..., nt); returns (..., len(x)) in O(nt + len(x) log nt).
+    """
+    r = np.asarray(ratez, dtype=float)
+    cumulative = cumulative_integral(r, t)
+    k, w = _locate(t, np.asarray(x, dtype=float))
+    rx = r[..., k] * (1.0 - w) + r[..., k + 1] * w
+    counts: npt.NDArray[np.float64] = cumulative[..., k] + 0.5 * w * (
+        t[k + 1] - t[k]
+    ) * (r[..., k] + rx)
+    return counts
+
+
+def expected_events(
+    t: npt.NDArray[np.float64], ratez: ArrayLike, tmin: float, tmax: float
+) -> npt.NDArray[np.float64]:
+    """
+    Expected number of events in ``[tmin, tmax]``, the exact integral of
+    the piecewise linear rate along the last axis of ``ratez``.
+    """
+    ends = cumulative_at(t, ratez, [tmin, tmax])
+    return ends[..., 1] - ends[..., 0]
+
+
+def expected_counts(
+    t: npt.NDArray[np.float64], ratez: ArrayLike, bins: ArrayLike
+) -> npt.NDArray[np.float64]:
+    """
+    Expected number of events in the bins with the (ascending) edges
+    ``bins`` for the rates ``ratez`` (..., nt); returns (..., nbins).
+    """
+    return np.diff(cumulative_at(t, ratez, bins), axis=-1)
+
+
+def observed_counts(
+    events: ArrayLike, bins: ArrayLike
+) -> npt.NDArray[np.int_]:
+    """
+    Number of events in the bins with the (ascending) edges ``bins``,
+    as ``np.histogram`` (the last bin includes its right edge).
+    """
+    events = np.sort(np.asarray(events, dtype=float))
+    bins = np.asarray(bins, dtype=float)
+    edges = np.searchsorted(events, bins, side="left")
+    edges[-1] = np.searchsorted(events, bins[-1], side="right")
+    return np.diff(edges)
+
+
+def log_likelihood(
+    t: npt.NDArray[np.float64],
+    ratez: ArrayLike,
+    events: ArrayLike,
+    tmin: Optional[float] = None,
+    tmax: Optional[float] = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Inhomogeneous Poisson log-likelihood of the event times ``events``
+    in ``[tmin, tmax]`` (default: the time axis ``t``) for the rates
+    ``ratez`` (..., nt). Events outside the window are ignored; a
+    non-positive rate at an event gives ``-inf``.
+    """
+    tmin = t[0] if tmin is None else max(tmin, t[0])
+    tmax = t[-1] if tmax is None else min(tmax, t[-1])
+    if tmax <= tmin:
+        raise InvalidParameter("empty time window [%g, %g]" % (tmin, tmax))
+    events = np.asarray(events, dtype=float)
+    events = events[(events >= tmin) & (events <= tmax)]
+    rates = rates_at(t, ratez, events)
+    with np.errstate(divide="ignore"):
+        logrates = np.log(np.maximum(rates, 0.0))
+    loglike: npt.NDArray[np.float64] = np.sum(logrates, axis=-1) - expected_events(
+        t, ratez, tmin, tmax
+    )
+    return loglike
+
+
+def nelder_mead(
+    fun: Callable[[npt.NDArray[np.float64]], float],
+    x0: ArrayLike,
+    step: ArrayLike = 0.1,
+    tol: float = 1e-6,
+    maxiter: int = 1000,
+) -> Tuple[npt.NDArray[np.float64], float, int, int]:
+    """
+    Minimise ``fun`` with the Nelder-Mead simplex method, starting from
+    ``x0`` with initial simplex edges ``step``. Stops when the function
+    values and the simplex size are below ``tol`` (absolute) or after
+    ``maxiter`` iterations. Returns ``x``, ``fun(x)``, the number of
+    iterations and of function evaluations.
+    """
+    start = np.atleast_1d(np.asarray(x0, dtype=float))
+    n = len(start)
+    simplex = np.tile(start, (n + 1, 1))
+    simplex[1:] += np.diag(np.broadcast_to(np.asarray(step, dtype=float), (n,)))
+
+    def evaluate(x: npt.NDArray[np.float64]) -> float:
+        value = float(fun(x))
+        return value if np.isfinite(value) else np.inf
+
+    values = np.array([evaluate(x) for x in simplex])
+    nfev = n + 1
+    nit = 0
+    while nit < maxiter:
+        order = np.argsort(values, kind="stable")
+        simplex, values = simplex[order], values[order]
+        if (
+            np.max(np.abs(values[1:] - values[0])) <= tol
+            and np.max(np.abs(simplex[1:] - simplex[0])) <= tol
+        ):
+            break
+        nit += 1
+        centroid = np.mean(simplex[:-1], axis=0)
+        reflected = centroid + (centroid - simplex[-1])
+        fr = evaluate(reflected)
+        nfev += 1
+        if fr < values[0]:
+            expanded = centroid + 2.0 * (centroid - simplex[-1])
+            fe = evaluate(expanded)
+            nfev += 1
+            if fe < fr:
+                simplex[-1], values[-1] = expanded, fe
+            else:
+                simplex[-1], values[-1] = reflected, fr
+            continue
+        if fr < values[-2]:
+            simplex[-1], values[-1] = reflected, fr
+            continue
+        if fr < values[-1]:
+            contracted = centroid + 0.5 * (reflected - centroid)
+        else:
+            contracted = centroid + 0.5 * (simplex[-1] - centroid)
+        fc = evaluate(contracted)
+        nfev += 1
+        if fc < min(fr, values[-1]):
+            simplex[-1], values[-1] = contracted, fc
+            continue
+        # shrink towards the best vertex
+        simplex[1:] = simplex[0] + 0.5 * (simplex[1:] - simplex[0])
+        values[1:] = [evaluate(x) for x in simplex[1:]]
+        nfev += n
+    best = int(np.argmin(values))
+    return simplex[best], float(values[best]), nit, nfev
+
+
+class CatalogEvaluation(object):
+    """
+    Comparison of model rates with an event catalog (see
+    :func:`evaluate_catalog`): ``rates`` at the events (..., nevents),
+    ``expected`` (..., nbins) and ``observed`` (nbins) counts per bin.
+    """
+
+    def __init__(
+        self,
+        rates: npt.NDArray[np.float64],
+        expected: npt.NDArray[np.float64],
+        observed: npt.NDArray[np.int_],
+    ) -> None:
+        self.rates = rates
+        self.expected = expected
+        self.observed = observed
+
+
+def evaluate_catalog(
+    t: ArrayLike,
+    ratez: ArrayLike,
+    events: ArrayLike,
+    bins: ArrayLike,
+) -> CatalogEvaluation:
+    """
+    Rates at the event times, expected and observed counts in the bins
+    with the edges ``bins`` for the model rates ``ratez`` on the time
+    axis ``t``. Rates may have leading axes (e.g. ensembles, cells, or a
+    list of the rates of several runs on the same time axis), which are
+    kept.
+    """
+    taxis = np.asarray(t, dtype=float)
+    rates = np.asarray(ratez, dtype=float)
+    if rates.shape[-1:] != taxis.shape:
+        raise InvalidParameter("ratez must be sampled on the time axis t")
+    bins = np.asarray(bins, dtype=float)
+    if bins.ndim != 1 or len(bins) < 2 or np.any(np.diff(bins) < 0):
+        raise InvalidParameter("bins must be at least two ascending edges")
+    return CatalogEvaluation(
+        rates_at(taxis, rates, events),
+        expected_counts(taxis, rates, bins),
+        observed_counts(events, bins),
+    )
+
+
+class CalibrationResult(object):
+    """Best parameters of :meth:`Calibration.fit` and search statistics"""
+
+    def __init__(
+        self, params: Dict[str, float], loglike: float, nit: int, nfev: int
+    ) -> None:
+        self.params = params
+        self.loglike = loglike
+        self.nit = nit
+        self.nfev = nfev
+
+
+class Calibration(object):
+    """
+    Maximum likelihood calibration of ``model_cls`` (e.g.
+    :class:`tdsr.TDSR1`, :class:`tdsr.RSD1` or :class:`tdsr.CFM`) with the
+    event times ``events`` (in the units of the time axis). ``params``
+    maps the calibrated parameters to their start values, all other
+    keyword arguments are fixed model parameters. The loading is
+    evaluated once and reused by all evaluations. Rates of several cells
+    (cells x nt) are summed. The parameters in ``SCALE_PARAMETERS`` are
+    searched in log magnitude.
+    """
+
+    def __init__(
+        self,
+        model_cls: Type[Any],
+        events: ArrayLike,
+        params: Dict[str, float],
+        loading: Optional[Loading] = None,
+        config: Optional[Config] = None,
+        tmin: Optional[float] = None,
+        tmax: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
+        if not params:
+            raise MissingParameter("no parameters to calibrate")
+        accepted = inspect.signature(model_cls.__call__).parameters
+        for name in list(params) + list(kwargs):
+            if name not in accepted or name == "loading":
+                raise InvalidParameter(
+                    "%s is not a parameter of %s" % (name, model_cls.__name__)
+                )
+        config = deepcopy(config or Config())
+        config.merge(kwargs)
+        if loading is not None:
+            config.loading = loading
+        if config.taxis_log:
+            _, _, nt, self.t, _ = gridrange_log(
+                config.tstart, config.tend, config.ntlog
+            )
+        else:
+            _, _, nt, self.t, _ = gridrange(config.tstart, config.tend, config.deltat)
+        if config.loading is None:
+            raise MissingParameter("missing loading function")
+        cf = np.asarray(config.loading.values(length=nt), dtype=float)
+        config.loading = SharedLoading(config.loading, cf)
+        self.model = model_cls(config=config)
+        self.events = np.sort(np.asarray(events, dtype=float))
+        self.params = {k: float(v) for k, v in params.items()}
+        self.tmin = tmin
+        self.tmax = tmax
+        self.kwargs = kwargs
+        self.nfev = 0
+
+    def __call__(self, **params: float) -> float:
+        """log-likelihood for the given parameters (others at start values)"""
+        self.nfev += 1
+        _, _, _, ratez, _ = self.model(**{**self.kwargs, **self.params, **params})
+        ratez = np.asarray(ratez, dtype=float)
+        if ratez.ndim > 1:
+            ratez = np.sum(ratez.reshape(-1, ratez.shape[-1]), axis=0)
+        return float(log_likelihood(self.t, ratez, self.events, self.tmin, self.tmax))
+
+    def _transform(self, params: Dict[str, float]) -> npt.NDArray[np.float64]:
+        return np.array(
+            [
+                np.log(abs(v)) if k in SCALE_PARAMETERS else v
+                for k, v in params.items()
+            ]
+        )
+
+    def _params(self, x: npt.NDArray[np.float64]) -> Dict[str, float]:
+        return {
+            k: float(np.sign(v) * np.exp(xi)) if k in SCALE_PARAMETERS else float(xi)
+            for (k, v), xi in zip(self.params.items(), x)
+        }
+
+    def fit(
+        self, step: ArrayLike = 0.2, tol: float = 1e-6, maxiter: int = 500
+    ) -> CalibrationResult:
+        """
+        Maximise the log-likelihood with :func:`nelder_mead`, starting
+        from the start values. ``step`` are the initial simplex edges in
+        the search space (log magnitude for ``SCALE_PARAMETERS``).
+        """
+        for k, v in self.params.items():
+            if k in SCALE_PARAMETERS and v == 0:
+                raise InvalidParameter("start value of %s must not be zero" % k)
+
+        def negative(x: npt.NDArray[np.float64]) -> float:
+            return -self(**self._params(x))
+
+        x, value, nit, nfev = nelder_mead(
+            negative, self._transform(self.params), step, tol, maxiter
+        )
+        return CalibrationResult(self._params(x), -value, nit, nfev)
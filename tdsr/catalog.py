@@ -0,0 +1,131 @@
+################################
+# Time Dependent Seismicity Model - Synthetic catalogs
+################################
+
+"""
+Synthetic event catalogs from model rates. The events of a realisation
+are a non-homogeneous Poisson process with the rate ``ratez(t)`` (linear
+between samples): the number of events is Poisson distributed with the
+expected count, and the event times follow from inverting the cumulative
+count at uniform random levels. Magnitudes are drawn from the
+Gutenberg-Richter distribution above the completeness magnitude.
+"""
+
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+from numpy.typing import ArrayLike
+
+from tdsr.calibration import cumulative_at
+from tdsr.exceptions import InvalidParameter
+from tdsr.utils import cumulative_integral
+
+
+class Catalog(object):
+    """
+    Events of ``nrealisations`` synthetic catalogs as flat arrays:
+    ``times``, ``magnitudes`` and ``realisation`` (index of the catalog of
+    each event), sorted by realisation and time.
+    """
+
+    def __init__(
+        self,
+        times: npt.NDArray[np.float64],
+        magnitudes: npt.NDArray[np.float64],
+        realisation: npt.NDArray[np.int_],
+        nrealisations: int,
+    ) -> None:
+        self.times = times
+        self.magnitudes = magnitudes
+        self.realisation = realisation
+        self.nrealisations = nrealisations
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def counts(self) -> npt.NDArray[np.int_]:
+        """number of events per realisation"""
+        return np.bincount(self.realisation, minlength=self.nrealisations)
+
+    def get(
+        self, index: int
+    ) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """times and magnitudes of realisation ``index``"""
+        start, stop = np.searchsorted(self.realisation, [index, index + 1])
+        return self.times[start:stop], self.magnitudes[start:stop]
+
+
+def gutenberg_richter(
+    rng: np.random.Generator,
+    size: int,
+    mmin: float,
+    b: float = 1.0,
+    mmax: Optional[float] = None,
+) -> npt.NDArray[np.float64]:
+    """
+    ``size`` magnitudes of the Gutenberg-Richter distribution with
+    b-value ``b`` above ``mmin``, truncated at ``mmax`` if given.
+    """
+    u = 1.0 - rng.random(size)  # in (0, 1]
+    if mmax is not None:
+        if mmax <= mmin:
+            raise InvalidParameter("mmax must be larger than mmin")
+        u = 1.0 - (1.0 - u) * (1.0 - 10.0 ** (-b * (mmax - mmin)))
+    magnitudes: npt.NDArray[np.float64] = mmin - np.log10(u) / b
+    return magnitudes
+
+
+def synthetic_catalogs(
+    t: ArrayLike,
+    ratez: ArrayLike,
+    nrealisations: int = 1,
+    mmin: float = 0.0,
+    b: float = 1.0,
+    mmax: Optional[float] = None,
+    tmin: Optional[float] = None,
+    tmax: Optional[float] = None,
+    seed: Optional[Union[int, np.random.Generator]] = None,
+) -> Catalog:
+    """
+    Draw ``nrealisations`` synthetic catalogs from the model rates
+    ``ratez`` on the time axis ``t`` (e.g. of a model result
+    ``t, chiz, cf, ratez, neqz``), restricted to ``[tmin, tmax]``
+    (default: the time axis). The rate is taken as linear
+    between samples and its cumulative count is computed on the time axis
+    (independent of the ``neqz`` convention of the model), rates of
+    several cells are summed. Event times are found by exact inversion of
+    the cumulative count within a sample interval; magnitudes follow
+    :func:`gutenberg_richter` with ``mmin``, ``b`` and ``mmax``. All
+    realisations are drawn together from the seeded generator ``seed``.
+    """
+    taxis = np.asarray(t, dtype=float)
+    cells = np.asarray(ratez, dtype=float)
+    rate = np.maximum(cells.reshape(-1, cells.shape[-1]).sum(axis=0), 0.0)
+    tmin = taxis[0] if tmin is None else max(tmin, taxis[0])
+    tmax = taxis[-1] if tmax is None else min(tmax, taxis[-1])
+    if tmax <= tmin:
+        raise InvalidParameter("empty time window [%g, %g]" % (tmin, tmax))
+    rng = np.random.default_rng(seed)
+
+    cumulative = cumulative_integral(rate, taxis)
+    lo, hi = cumulative_at(taxis, rate, [tmin, tmax])
+    counts = rng.poisson(hi - lo, size=nrealisations)
+    realisation = np.repeat(np.arange(nrealisations), counts)
+    levels = lo + (hi - lo) * rng.random(len(realisation))
+
+    # invert r_k tau + (r_k+1 - r_k) tau^2 / (2 dt_k) = level - cumulative_k
+    k = np.searchsorted(cumulative, levels, side="left") - 1
+    k = np.clip(k, 0, len(taxis) - 2)
+    dt = taxis[k + 1] - taxis[k]
+    slope = (rate[k + 1] - rate[k]) / dt
+    remaining = np.maximum(levels - cumulative[k], 0.0)
+    root = np.sqrt(np.maximum(rate[k] ** 2 + 2.0 * slope * remaining, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau = np.where(rate[k] + root > 0, 2.0 * remaining / (rate[k] + root), 0.0)
+    times = np.clip(taxis[k] + np.minimum(tau, dt), tmin, tmax)
+
+    order = np.lexsort((times, realisation))
+    magnitudes = gutenberg_richter(rng, len(times), mmin, b, mmax)
+    return Catalog(times[order], magnitudes, realisation[order], nrealisations)
@@ -3,11 +3,12 @@
 # T. Dahm, R. Dahm 26.12.2021
 ################################
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence
 
 import toml
 
 from tdsr.constants import HOURS
+from tdsr.exceptions import InvalidParameter
 from tdsr.loading import LOADING, Loading, StepLoading
 from tdsr.utils import Number, PathLike
 
@@ -31,6 +32,25 @@ class Config(object):
         equilibrium: bool = False,
         sigma_max: int = 25,
         precision: int = 18,
+        NZ: int = 10000,
+        NZ_auto: bool = False,
+        NZ_tol: float = 1e-3,
+        NZ_max: int = 1000000,
+        Zgrid: str = "uniform",
+        Zstretch: float = 4.0,
+        pf_incremental: bool = False,
+        pf_renorm: int = 100,
+        band: bool = False,
+        band_tol: float = 1e-15,
+        integrator: str = "euler",
+        pf_average: bool = False,
+        adaptive: bool = False,
+        adaptive_tol: float = 1e-2,
+        sensitivities: Sequence[str] = (),
+        checkpoint_file: str = "",
+        checkpoint_every: int = 0,
+        neqz_dt: bool = False,
+        neqz_lazy: bool = False,
         loading: Optional[Loading] = None,
     ) -> None:
         self.chi0 = float(chi0)
@@ -49,11 +69,38 @@ class Config(object):
         self.sigma_max = float(sigma_max)
         self.precision = int(precision)
         self.iX0 = str(iX0)
+        self.NZ = int(NZ)
+        self.NZ_auto = bool(NZ_auto)
+        self.NZ_tol = float(NZ_tol)
+        self.NZ_max = int(NZ_max)
+        self.Zgrid = str(Zgrid)
+        self.Zstretch = float(Zstretch)
+        self.pf_incremental = bool(pf_incremental)
+        self.pf_renorm = int(pf_renorm)
+        self.band = bool(band)
+        self.band_tol = float(band_tol)
+        self.integrator = str(integrator)
+        self.pf_average = bool(pf_average)
+        self.adaptive = bool(adaptive)
+        self.adaptive_tol = float(adaptive_tol)
+        self.sensitivities = tuple(str(name) for name in sensitivities)
+        self.checkpoint_file = str(checkpoint_file)
+        self.checkpoint_every = int(checkpoint_every)
+        self.neqz_dt = bool(neqz_dt)
+        self.neqz_lazy = bool(neqz_lazy)
         self.loading = loading
         if loading is None:
             self.loading = StepLoading(config=self)
 
-    def merge(self, config: Dict[str, Any]) -> None:
+    def merge(self, config: Dict[str, Any], strict: bool = False) -> None:
+        """
+        Set the options given in ``config`` (None values are skipped).
+        Unknown keys are ignored, or rejected if ``strict==True``.
+        """
+        if strict:
+            unknown = [k for k in config if k == "loading" or k not in vars(self)]
+            if unknown:
+                raise InvalidParameter("unknown options %s" % unknown)
         config = {k: v for k, v in config.items() if v is not None}
         if "chi0" in config:
             self.chi0 = config["chi0"]
@@ -87,6 +134,44 @@ class Config(object):
             self.Zstd = config["Zstd"]
         if "precision" in config:
             self.precision = config["precision"]
+        if "NZ" in config:
+            self.NZ = config["NZ"]
+        if "NZ_auto" in config:
+            self.NZ_auto = config["NZ_auto"]
+        if "NZ_tol" in config:
+            self.NZ_tol = config["NZ_tol"]
+        if "NZ_max" in config:
+            self.NZ_max = config["NZ_max"]
+        if "Zgrid" in config:
+            self.Zgrid = config["Zgrid"]
+        if "Zstretch" in config:
+            self.Zstretch = config["Zstretch"]
+        if "pf_incremental" in config:
+            self.pf_incremental = config["pf_incremental"]
+        if "pf_renorm" in config:
+            self.pf_renorm = config["pf_renorm"]
+        if "band" in config:
+            self.band = config["band"]
+        if "band_tol" in config:
+            self.band_tol = config["band_tol"]
+        if "integrator" in config:
+            self.integrator = config["integrator"]
+        if "pf_average" in config:
+            self.pf_average = config["pf_average"]
+        if "adaptive" in config:
+            self.adaptive = config["adaptive"]
+        if "adaptive_tol" in config:
+            self.adaptive_tol = config["adaptive_tol"]
+        if "sensitivities" in config:
+            self.sensitivities = tuple(str(name) for name in config["sensitivities"])
+        if "checkpoint_file" in config:
+            self.checkpoint_file = config["checkpoint_file"]
+        if "checkpoint_every" in config:
+            self.checkpoint_every = config["checkpoint_every"]
+        if "neqz_dt" in config:
+            self.neqz_dt = config["neqz_dt"]
+        if "neqz_lazy" in config:
+            self.neqz_lazy = config["neqz_lazy"]
 
     @classmethod
     def open(cls, config_file: PathLike) -> "Config":
@@ -12,6 +12,9 @@ from tdsr.loading.background import BackgroundLoading
 from tdsr.loading.trend_change import TrendchangeLoading
 from tdsr.loading.ramp import RampLoading
 from tdsr.loading.custom import CustomLoading
+from tdsr.loading.matrix import MatrixLoading
+from tdsr.loading.pressure import PressureLoading
+from tdsr.loading.wells import WellsLoading
 
 LOADING: Dict[str, Type[Loading]] = {
     "step": StepLoading,
@@ -21,4 +24,7 @@ LOADING: Dict[str, Type[Loading]] = {
     "trendchange": TrendchangeLoading,
     "ramp": RampLoading,
     "custom": CustomLoading,
+    "matrix": MatrixLoading,
+    "pressure": PressureLoading,
+    "wells": WellsLoading,
 }
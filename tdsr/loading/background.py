@@ -43,6 +43,11 @@ class BackgroundLoading(Loading):
         # return (self.sc1 - self.sc0) / (self.n1 * self.deltat)
         return (self.sc3 - self.sc0) / (self.tend - self.tstart)
 
+    def segments(self, length: int) -> npt.NDArray[np.int_]:
+        """breakpoints of the loading: a single linear segment"""
+        nt = self.ntlog if self.taxis_log else length
+        return np.array([0, nt - 1])
+
     def values(self, length: int) -> npt.NDArray[np.float64]:
         # sc0 = self.sstep
         # spaeter evtl wieder auskommentieren:
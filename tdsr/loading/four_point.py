@@ -46,6 +46,12 @@ class FourPointLoading(Loading):
     def stress_rate(self) -> float:
         return (self.sc1 - self.sc0) / (self.n1 * self.deltat)
 
+    def segments(self, length: int) -> npt.NDArray[np.int_]:
+        """breakpoints of the loading: the samples of the four points"""
+        breaks = [0, self.n1 - 1, self.n2 - 1, length - 1]
+        segments: npt.NDArray[np.int_] = np.unique(np.clip(breaks, 0, length - 1))
+        return segments
+
     def values(self, length: int) -> npt.NDArray[np.float64]:
         return np.hstack(
             [
@@ -23,6 +23,23 @@ class Loading(ABC):
     def values(self, length: int) -> npt.NDArray[np.float64]:
         pass
 
+    def segments(self, length: int) -> npt.NDArray[np.int_]:
+        """
+        Sample indices of the breakpoints of the loading (including the
+        first and the last sample). Between two breakpoints the stress is
+        linear in time, i.e. it is defined by the rate of the segment. A
+        stress step is a segment of one sampling interval.
+        The default detects the kinks of ``values(length)`` assuming
+        equidistant sampling; piecewise-linear loadings override this.
+        """
+        cf = self.values(length)
+        scale = max(float(np.max(np.abs(cf))), float(np.finfo(float).tiny))
+        kinks = np.nonzero(np.abs(np.diff(cf, n=2)) > 1e-9 * scale)[0] + 1
+        segments: npt.NDArray[np.int_] = np.unique(
+            np.concatenate(([0], kinks, [len(cf) - 1]))
+        )
+        return segments
+
     @property
     @abstractmethod
     def stress_rate(self) -> float:
@@ -0,0 +1,56 @@
+from tdsr.loading.loading import Loading
+
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+import numpy.typing as npt
+from numpy.typing import ArrayLike
+from tdsr.types import Number
+from tdsr.exceptions import InvalidParameter
+
+
+if TYPE_CHECKING:
+    from tdsr.config import Config
+
+
+class MatrixLoading(Loading):
+    """
+    MatrixLoading (short name "matrix") holds the Coulomb stress histories of many cells (e.g. distances to an injection point) as a 2-D matrix of shape (cells x nt). All histories are sampled on the time axis of the seismicity model (``gridrange(tstart, tend, deltat)``). Optional ``weights`` per cell are used by TDSR1 to compute a weighted average rate over all cells.
+    """
+
+    __name__: str = "Matrix"
+
+    def __init__(
+        self,
+        data: Optional[ArrayLike] = None,
+        weights: Optional[ArrayLike] = None,
+        strend: Number = 7.0e-5,
+        config: Optional["Config"] = None,
+    ):
+        self.config = config
+        self.strend = strend
+        self.data: npt.NDArray[np.float64] = np.atleast_2d(
+            np.asarray(data, dtype=float)
+        )
+        if self.data.ndim != 2:
+            raise InvalidParameter("data shape must be cells x nt")
+        self.weights = None
+        if weights is not None:
+            self.weights = np.asarray(weights, dtype=float)
+            if self.weights.shape != (self.data.shape[0],):
+                raise InvalidParameter("weights must have one value per cell")
+
+    @property
+    def ncells(self) -> int:
+        return int(self.data.shape[0])
+
+    @property
+    def stress_rate(self) -> float:
+        raise NotImplementedError
+
+    def values(self, length: int) -> npt.NDArray[np.float64]:
+        if self.data.shape[1] != length:
+            raise InvalidParameter(
+                "stress matrix has %d samples, but the time axis has %d"
+                % (self.data.shape[1], length)
+            )
+        return self.data
@@ -0,0 +1,396 @@
+from tdsr.loading.matrix import MatrixLoading
+
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
+import numpy as np
+import numpy.typing as npt
+from numpy.typing import ArrayLike
+from tdsr.types import Number, PathLike
+from tdsr.utils import gridrange, gridrange_log
+from tdsr.exceptions import InvalidParameter, MissingParameter
+
+
+if TYPE_CHECKING:
+    from tdsr.config import Config
+
+
+def erfc(x: ArrayLike, nterms: int = 40) -> npt.NDArray[np.float64]:
+    """
+    Complementary error function (numpy only, relative error below 1e-12):
+    Taylor series of ``erf`` for ``|x| < 2`` and the continued fraction of
+    ``erfc`` beyond.
+    """
+    x = np.asarray(x, dtype=float)
+    a = np.abs(x)
+    out = np.empty_like(a)
+    small = a < 2.0
+    xs = a[small]
+    term = xs.copy()
+    total = xs.copy()
+    for n in range(1, nterms):
+        term *= 2.0 * xs * xs / (2 * n + 1)
+        total += term
+    out[small] = 1.0 - 2.0 / np.sqrt(np.pi) * np.exp(-xs * xs) * total
+    xl = a[~small]
+    k = np.zeros_like(xl)
+    for n in range(nterms, 0, -1):
+        k = 0.5 * n / (xl + k)
+    with np.errstate(invalid="ignore"):
+        out[~small] = np.exp(-xl * xl) / np.sqrt(np.pi) / (xl + k)
+    return np.where(x < 0, 2.0 - out, out)
+
+
+def hydraulic_factor(
+    diffusivity: Number,
+    nu_drained: Number = 0.25,
+    nu_undrained: Number = 0.30,
+    shear_modulus: Number = 1.0e9,
+    biot: Number = 0.1,
+) -> float:
+    """
+    Mobility ``k/eta`` [m^2/(Pa s)] of the medium with hydraulic
+    ``diffusivity`` [m^2/s] (Segall & Lu 2015, Eq. 4), from the drained and
+    undrained Poisson's ratios, the shear modulus [Pa] and the Biot
+    coefficient.
+    """
+    mu = shear_modulus
+    lambda_d = 2.0 * mu * nu_drained / (1.0 - 2.0 * nu_drained)
+    lambda_u = 2.0 * mu * nu_undrained / (1.0 - 2.0 * nu_undrained)
+    ketafac = np.square(biot) * (lambda_u + 2.0 * mu)
+    ketafac /= (lambda_u - lambda_d) * (lambda_d + 2.0 * mu)
+    return float(diffusivity * ketafac)
+
+
+def _check_inputs(
+    t: ArrayLike,
+    distances: ArrayLike,
+    tq: ArrayLike,
+    dq: ArrayLike,
+    diffusivity: Number,
+) -> Tuple[
+    npt.NDArray[np.float64],
+    npt.NDArray[np.float64],
+    npt.NDArray[np.float64],
+    npt.NDArray[np.float64],
+]:
+    """validated times, distances and flow rate changes sorted by time"""
+    t = np.asarray(t, dtype=float)
+    r = np.atleast_1d(np.asarray(distances, dtype=float))
+    tq = np.asarray(tq, dtype=float)
+    dq = np.asarray(dq, dtype=float)
+    if t.ndim != 1 or r.ndim != 1:
+        raise InvalidParameter("times and distances must be 1-D")
+    if tq.shape != dq.shape or tq.ndim != 1:
+        raise InvalidParameter("tq and dq must be 1-D of equal length")
+    if np.any(r <= 0):
+        raise InvalidParameter("distances must be positive")
+    if diffusivity <= 0:
+        raise InvalidParameter("diffusivity must be positive")
+    order = np.argsort(tq, kind="stable")
+    return t, r, tq[order], dq[order]
+
+
+def _step_scale(
+    r: npt.NDArray[np.float64],
+    diffusivity: Number,
+    nu_drained: Number,
+    nu_undrained: Number,
+    shear_modulus: Number,
+    biot: Number,
+) -> npt.NDArray[np.float64]:
+    """final pressure [Pa] of a unit flow rate step at distances ``r``"""
+    kappa = hydraulic_factor(diffusivity, nu_drained, nu_undrained, shear_modulus, biot)
+    return 1.0 / (4.0 * np.pi * kappa * diffusivity * r)
+
+
+def rudnicki_pressure(
+    t: ArrayLike,
+    distances: ArrayLike,
+    tq: ArrayLike,
+    dq: ArrayLike,
+    diffusivity: Number,
+    nu_drained: Number = 0.25,
+    nu_undrained: Number = 0.30,
+    shear_modulus: Number = 1.0e9,
+    biot: Number = 0.1,
+    time_unit: Number = 86400.0,
+    blocksize: int = 1 << 22,
+) -> npt.NDArray[np.float64]:
+    """
+    Pore pressure [Pa] of a point injection (Rudnicki 1986, Eq. 25) at the
+    times ``t`` and ``distances`` [m], shape (distances x times). The flow
+    rate changes by ``dq`` [m^3/s] at the times ``tq``; times are in units
+    of ``time_unit`` seconds (default days). The step responses of all
+    changes before a time are superposed; the (distance, time, change)
+    terms are evaluated in blocks of at most ``blocksize`` values, and
+    only the changes before the last time of a block enter it.
+    """
+    t, r, tq, dq = _check_inputs(t, distances, tq, dq, diffusivity)
+    scale = _step_scale(r, diffusivity, nu_drained, nu_undrained, shear_modulus, biot)
+
+    P = np.zeros((len(r), len(t)))
+    nq = max(len(tq), 1)
+    nr = max(1, min(len(r), blocksize // nq))
+    nt = max(1, blocksize // (nr * nq))
+    for r0 in range(0, len(r), nr):
+        rb = r[r0 : r0 + nr, None, None]
+        for t0 in range(0, len(t), nt):
+            tb = t[t0 : t0 + nt]
+            m = np.searchsorted(tq, tb[-1], side="left") if len(tb) else 0
+            if m == 0:
+                continue
+            dti = (tb[:, None] - tq[None, :m]) * time_unit
+            with np.errstate(divide="ignore", invalid="ignore"):
+                psi = np.where(dti > 0, rb / np.sqrt(diffusivity * dti), np.inf)
+            P[r0 : r0 + nr, t0 : t0 + nt] = erfc(0.5 * psi) @ dq[:m]
+    return scale[:, None] * P
+
+
+def _next_fast_length(n: int) -> int:
+    """smallest 2^a 3^b >= ``n`` (efficient length of a real FFT)"""
+    best = 1 << max(int(n - 1).bit_length(), 0)
+    p3 = 1
+    while p3 < best:
+        p2 = p3
+        while p2 < n:
+            p2 *= 2
+        best = min(best, p2)
+        p3 *= 3
+    return best
+
+
+def grid_flow_changes(
+    t: npt.NDArray[np.float64],
+    tq: npt.NDArray[np.float64],
+    dq: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    """
+    Flow rate changes ``dq`` at the times ``tq`` sampled on the equidistant
+    times ``t`` (from ``t[0]`` on): a change between two samples is split
+    linearly between them, which keeps its mean time.
+    """
+    dt = t[1] - t[0]
+    k = (tq - t[0]) / dt
+    j = np.floor(k).astype(int)
+    w = k - j
+    increments = np.zeros(len(t) + 1)
+    np.add.at(increments, j, (1.0 - w) * dq)
+    np.add.at(increments, j + 1, w * dq)
+    return increments[: len(t)]
+
+
+def fft_pressure(
+    t: ArrayLike,
+    distances: ArrayLike,
+    tq: ArrayLike,
+    dq: ArrayLike,
+    diffusivity: Number,
+    nu_drained: Number = 0.25,
+    nu_undrained: Number = 0.30,
+    shear_modulus: Number = 1.0e9,
+    biot: Number = 0.1,
+    time_unit: Number = 86400.0,
+    blocklength: Optional[int] = None,
+    blocksize: int = 1 << 22,
+) -> npt.NDArray[np.float64]:
+    """
+    Pore pressure [Pa] as :func:`rudnicki_pressure` by FFT convolution
+    for equidistant times ``t``: the flow rate changes are sampled on the
+    time axis (:func:`grid_flow_changes`) and convolved with the step
+    response of every distance, O(nt log nt) per distance instead of
+    O(nt nq). Changes before ``t[0]`` are superposed exactly, or the axis
+    is extended back to the first change if that is cheaper. Long series
+    are convolved by overlap-add in blocks of ``blocklength`` samples
+    (default: one block), blocks without flow changes are skipped; the
+    spectra of at most ``blocksize`` values are held at once.
+    """
+    t, r, tq, dq = _check_inputs(t, distances, tq, dq, diffusivity)
+    poroelastic = (nu_drained, nu_undrained, shear_modulus, biot)
+    P: npt.NDArray[np.float64] = _fft_responses(
+        t, r, [(tq, dq)], diffusivity, poroelastic, time_unit, blocklength, blocksize
+    )[0]
+    return P
+
+
+def _fft_responses(
+    t: npt.NDArray[np.float64],
+    r: npt.NDArray[np.float64],
+    flows: Sequence[Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]],
+    diffusivity: Number,
+    poroelastic: Tuple[Number, Number, Number, Number],
+    time_unit: Number,
+    blocklength: Optional[int],
+    blocksize: int,
+) -> npt.NDArray[np.float64]:
+    """
+    pressure (flows x distances x times) of several sorted flow rate
+    histories ``(tq, dq)``, see :func:`fft_pressure`; the step response
+    and its spectra are shared by all histories
+    """
+    nt = len(t)
+    if nt < 2 or not np.allclose(np.diff(t), t[1] - t[0], rtol=1e-9, atol=0.0):
+        raise InvalidParameter("FFT pressure needs equidistant times")
+    dt = t[1] - t[0]
+    P = np.zeros((len(flows), len(r), nt))
+    gridded = []
+    npre = 0
+    for k, (tq, dq) in enumerate(flows):
+        before = tq < t[0]
+        nk = int(np.ceil((t[0] - tq[0]) / dt)) if np.any(before) else 0
+        # an erfc costs about as much as 64 samples of the FFT convolution
+        if np.count_nonzero(before) * nt <= 64 * nk:
+            P[k] = rudnicki_pressure(
+                t, r, tq[before], dq[before], diffusivity, *poroelastic, time_unit,
+                blocksize,
+            )
+            tq, dq = tq[~before], dq[~before]
+            nk = 0
+        npre = max(npre, nk)
+        gridded.append((tq, dq))
+    n = npre + nt
+    taxis = t[0] + dt * np.arange(-npre, nt)
+    increments = np.array(
+        [grid_flow_changes(taxis, tq[tq < t[-1]], dq[tq < t[-1]]) for tq, dq in gridded]
+    )
+
+    # step response H(r, m dt), zero at m = 0 (only earlier changes act)
+    tau = np.arange(n) * dt * time_unit
+    with np.errstate(divide="ignore"):
+        psi = r[:, None] / np.sqrt(diffusivity * tau)
+    H = _step_scale(r, diffusivity, *poroelastic)[:, None] * erfc(0.5 * psi)
+
+    blocklength = min(int(blocklength or n), n)
+    for s in range(0, n, blocklength):
+        segments = increments[:, s : s + blocklength]
+        active = np.flatnonzero(np.any(segments, axis=1))
+        if len(active) == 0:
+            continue
+        # outputs from sample max(s, npre) on, i.e. lags from lag0 on
+        lag0 = max(npre - s, 0)
+        m = n - s
+        nfft = _next_fast_length(segments.shape[1] + m - 1)
+        spectra = np.fft.rfft(segments[active], nfft)[:, None, :]
+        nr = max(1, min(len(r), blocksize // (nfft * len(active))))
+        for r0 in range(0, len(r), nr):
+            kernel = np.fft.rfft(H[r0 : r0 + nr, :m], nfft, axis=-1)
+            conv = np.fft.irfft(kernel * spectra, nfft)[..., lag0:m]
+            P[active, r0 : r0 + nr, s + lag0 - npre :] += conv
+    return P
+
+
+def read_flowrates(
+    file: PathLike, scal_q: Number = 1.0 / (1000.0 * 60.0)
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Times ``tq`` and flow rate changes ``dq`` from a flow rate file in the
+    format of ``data/ktb_flowrates.dat`` (one header line, columns time and
+    flow rate from that time on). Rates are scaled by ``scal_q`` (default
+    l/min to m^3/s).
+    """
+    data = np.loadtxt(file, skiprows=1, usecols=(0, 1), ndmin=2)
+    return data[:, 0], np.ediff1d(data[:, 1], to_begin=data[0, 1]) * scal_q
+
+
+def read_pressure(
+    file: PathLike,
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Times and pressures of an observed pressure file in the format of
+    ``data/ktb_HBpressure.dat`` (two header lines, comma separated).
+    """
+    data = np.loadtxt(file, skiprows=2, delimiter=",", usecols=(0, 1), ndmin=2)
+    return data[:, 0], data[:, 1]
+
+
+class _InjectionLoading(MatrixLoading):
+    """stress matrix of injections on the time axis of the model"""
+
+    def _axis(self, name: str, value: Optional[Number]) -> Number:
+        """time axis parameter ``name``, taken from the config if not given"""
+        if value is None:
+            if self.config is None:
+                raise MissingParameter("%s loading missing %s" % (self.name, name))
+            value = getattr(self.config, name)
+        return value
+
+    def _time_axis(
+        self,
+        tstart: Optional[Number],
+        tend: Optional[Number],
+        deltat: Optional[Number],
+        taxis_log: Optional[bool],
+        ntlog: Optional[Number],
+    ) -> npt.NDArray[np.float64]:
+        """set the time axis parameters and return the times"""
+        self.tstart = self._axis("tstart", tstart)
+        self.tend = self._axis("tend", tend)
+        self.taxis_log = bool(self._axis("taxis_log", taxis_log))
+        if self.taxis_log:
+            self.ntlog = self._axis("ntlog", ntlog)
+            _, _, _, t, _ = gridrange_log(self.tstart, self.tend, self.ntlog)
+        else:
+            self.deltat = self._axis("deltat", deltat)
+            _, _, _, t, _ = gridrange(self.tstart, self.tend, self.deltat)
+        return t
+
+
+class PressureLoading(_InjectionLoading):
+    """
+    PressureLoading (short name "pressure") is the Coulomb stress (normalised by friction) of the pore pressure of a point injection (Rudnicki 1986, see :func:`rudnicki_pressure`) at several ``distances`` [m] plus the tectonic trend ``strend``, one history per distance as in :class:`MatrixLoading`. The flow rate changes by ``dq`` [m^3/s] at the times ``tq``, or as read from ``file`` (see :func:`read_flowrates`). With ``method="fft"`` the pressure is computed by FFT convolution on the (equidistant) time axis (see :func:`fft_pressure`), which is much faster for long flow rate histories. The pressure [Pa] is scaled by ``scal_cf`` (default to MPa), times are in units of ``time_unit`` seconds (default days). The time axis (``tstart``, ``tend``, ``deltat``, ``taxis_log``, ``ntlog``) is taken from ``config`` if not given and must be the one of the seismicity model.
+    """
+
+    __name__: str = "Pressure"
+
+    def __init__(
+        self,
+        distances: Optional[ArrayLike] = None,
+        tq: Optional[ArrayLike] = None,
+        dq: Optional[ArrayLike] = None,
+        file: Optional[PathLike] = None,
+        diffusivity: Number = 0.033,
+        strend: Number = 7.0e-5,
+        nu_drained: Number = 0.25,
+        nu_undrained: Number = 0.30,
+        shear_modulus: Number = 1.0e9,
+        biot: Number = 0.1,
+        scal_cf: Number = 1.0e-6,
+        time_unit: Number = 86400.0,
+        tstart: Optional[Number] = None,
+        tend: Optional[Number] = None,
+        deltat: Optional[Number] = None,
+        taxis_log: Optional[bool] = None,
+        ntlog: Optional[Number] = None,
+        weights: Optional[ArrayLike] = None,
+        method: str = "direct",
+        blocklength: Optional[int] = None,
+        blocksize: int = 1 << 22,
+        config: Optional["Config"] = None,
+    ):
+        if file is not None:
+            tq, dq = read_flowrates(file)
+        if distances is None or tq is None or dq is None:
+            raise MissingParameter("pressure loading needs distances, tq and dq")
+        if method not in ("direct", "fft"):
+            raise InvalidParameter("method must be 'direct' or 'fft'")
+        self.config = config
+        self.method = method
+        t = self._time_axis(tstart, tend, deltat, taxis_log, ntlog)
+        if method == "fft" and self.taxis_log:
+            raise InvalidParameter("FFT pressure needs a linear time axis")
+        self.distances = np.atleast_1d(np.asarray(distances, dtype=float))
+        poroelastic = (nu_drained, nu_undrained, shear_modulus, biot)
+        if method == "fft":
+            self.pressure = fft_pressure(
+                t, self.distances, tq, dq, diffusivity, *poroelastic, time_unit,
+                blocklength, blocksize,
+            )
+        else:
+            self.pressure = rudnicki_pressure(
+                t, self.distances, tq, dq, diffusivity, *poroelastic, time_unit,
+                blocksize,
+            )
+        super().__init__(
+            data=scal_cf * self.pressure + strend * (t - t[0]),
+            weights=weights,
+            strend=strend,
+            config=config,
+        )
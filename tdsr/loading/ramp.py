@@ -46,6 +46,13 @@ class RampLoading(Loading):
     def stress_rate(self) -> float:
         return (self.sc1 - self.sc0) / (self.n1 * self.deltat)
 
+    def segments(self, length: int) -> npt.NDArray[np.int_]:
+        """breakpoints of the loading: begin and end of the ramp"""
+        n1 = np.floor((self.tstep - self.tstart) / self.deltat).astype(int) + 1
+        breaks = [0, n1, n1 + self.nsample2 - 1, length - 1]
+        segments: npt.NDArray[np.int_] = np.unique(np.clip(breaks, 0, length - 1))
+        return segments
+
     def values(self, length: int) -> npt.NDArray[np.float64]:
         nt = length
         n1 = np.floor((self.tstep - self.tstart) / self.deltat).astype(int) + 1
@@ -50,6 +50,13 @@ class StepLoading(Loading):
         """the loading stress rate"""
         return (self.sc1 - self.sc0) / (self.n1 * self.deltat)
 
+    def segments(self, length: int) -> npt.NDArray[np.int_]:
+        """breakpoints of the loading: background trend, step, trend"""
+        n1 = np.floor((self.tstep - self.tstart) / self.deltat).astype(int) + 1
+        breaks = np.clip([0, n1 - 1, n1, length - 1], 0, length - 1)
+        segments: npt.NDArray[np.int_] = np.unique(breaks)
+        return segments
+
     def values(self, length: int) -> npt.NDArray[np.float64]:
         """the loading values"""
         if self.taxis_log:
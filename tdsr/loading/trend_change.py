@@ -41,6 +41,13 @@ class TrendchangeLoading(Loading):
     def stress_rate(self) -> float:
         return (self.sc1 - self.sc0) / (self.n1 * self.deltat)
 
+    def segments(self, length: int) -> npt.NDArray[np.int_]:
+        """breakpoints of the loading: change of the stress rate at tstep"""
+        n1 = np.floor((self.tstep - self.tstart) / self.deltat).astype(int) + 1
+        breaks = [0, n1, length - 1]
+        segments: npt.NDArray[np.int_] = np.unique(np.clip(breaks, 0, length - 1))
+        return segments
+
     def values(self, length: int) -> npt.NDArray[np.float64]:
         n1 = np.floor((self.tstep - self.tstart) / self.deltat).astype(int) + 1
         nt = length
@@ -0,0 +1,217 @@
+from tdsr.loading.pressure import (
+    _InjectionLoading,
+    _check_inputs,
+    _fft_responses,
+    read_flowrates,
+    rudnicki_pressure,
+)
+
+from os import PathLike as _PathLike
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import numpy.typing as npt
+from numpy.typing import ArrayLike
+from tdsr.types import Number, PathLike
+from tdsr.exceptions import InvalidParameter, MissingParameter
+
+
+if TYPE_CHECKING:
+    from tdsr.config import Config
+
+Flow = Union[PathLike, Tuple[ArrayLike, ArrayLike]]
+
+
+def _flows(
+    flows: Sequence[Flow], nwells: int
+) -> List[Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]]:
+    """flow rate changes ``(tq, dq)`` per well, read from files if paths"""
+    if len(flows) != nwells:
+        raise InvalidParameter("one flow rate history per well required")
+    result = []
+    for flow in flows:
+        if isinstance(flow, (str, _PathLike)):
+            flow = read_flowrates(flow)
+        tq, dq = flow
+        result.append((np.asarray(tq, dtype=float), np.asarray(dq, dtype=float)))
+    return result
+
+
+def _distances(
+    targets: npt.NDArray[np.float64],
+    wells: npt.NDArray[np.float64],
+    radius: Number,
+) -> npt.NDArray[np.float64]:
+    """distances (targets x wells), at least the well ``radius``"""
+    d = targets[:, None, :] - wells[None, :, :]
+    r: npt.NDArray[np.float64] = np.maximum(np.sqrt(np.sum(d * d, axis=-1)), radius)
+    return r
+
+
+def well_pressure(
+    t: ArrayLike,
+    wells: ArrayLike,
+    flows: Sequence[Flow],
+    targets: ArrayLike,
+    diffusivity: Number,
+    nu_drained: Number = 0.25,
+    nu_undrained: Number = 0.30,
+    shear_modulus: Number = 1.0e9,
+    biot: Number = 0.1,
+    time_unit: Number = 86400.0,
+    method: str = "direct",
+    ndistances: int = 256,
+    radius: Number = 0.1,
+    blocklength: Optional[int] = None,
+    blocksize: int = 1 << 22,
+) -> npt.NDArray[np.float64]:
+    """
+    Pore pressure [Pa] (targets x times) of several injection and
+    production wells at the coordinates ``wells`` (wells x dimensions, [m])
+    at the points ``targets`` (targets x dimensions), the superposition of
+    the point sources of :func:`rudnicki_pressure`. ``flows`` holds the
+    flow rate changes ``(tq, dq)`` of every well (negative for production)
+    or the file of its flow rates (see :func:`read_flowrates`). Distances
+    below the well ``radius`` [m] are set to it.
+
+    The targets are processed in blocks of about ``blocksize`` values per
+    time sample. With ``method="direct"`` the step responses are superposed
+    exactly per target. With ``method="fft"`` (equidistant times) the
+    pressure of every well is computed by FFT convolution
+    (:func:`fft_pressure`) at ``ndistances`` distances spaced
+    logarithmically over the range of the target distances, with one step
+    response shared by all wells, and interpolated (cubic in log-distance,
+    of distance times pressure) to the targets, so the cost of the
+    convolutions does not grow with the number of targets. If there are
+    not more (target, well) pairs than ``ndistances``, their distances are
+    used and the result is exact.
+    """
+    t = np.asarray(t, dtype=float)
+    wells = np.asarray(wells, dtype=float)
+    targets = np.asarray(targets, dtype=float)
+    if wells.ndim != 2 or targets.ndim != 2 or wells.shape[1] != targets.shape[1]:
+        raise InvalidParameter("wells and targets must be points x dimensions")
+    if radius <= 0:
+        raise InvalidParameter("radius must be positive")
+    if method not in ("direct", "fft"):
+        raise InvalidParameter("method must be 'direct' or 'fft'")
+    nw = len(wells)
+    histories = [
+        _check_inputs(t, [radius], tq, dq, diffusivity)[2:]
+        for tq, dq in _flows(flows, nw)
+    ]
+    poroelastic = (nu_drained, nu_undrained, shear_modulus, biot)
+    ntarget = len(targets)
+    nb = max(1, blocksize // max(len(t), 1))
+    P = np.zeros((ntarget, len(t)))
+
+    if method == "direct":
+        for b0 in range(0, ntarget, nb):
+            r = _distances(targets[b0 : b0 + nb], wells, radius)
+            for w, (tq, dq) in enumerate(histories):
+                P[b0 : b0 + nb] += rudnicki_pressure(
+                    t, r[:, w], tq, dq, diffusivity, *poroelastic, time_unit,
+                    blocksize,
+                )
+        return P
+
+    # distance table covering all (target, well) pairs
+    if ntarget * nw <= ndistances:
+        rho = np.unique(_distances(targets, wells, radius))
+    else:
+        rmin, rmax = np.inf, 0.0
+        for b0 in range(0, ntarget, nb):
+            r = _distances(targets[b0 : b0 + nb], wells, radius)
+            rmin, rmax = min(rmin, float(np.min(r))), max(rmax, float(np.max(r)))
+        rho = np.geomspace(rmin, rmax, max(int(ndistances), 2))
+    while len(rho) < 4:
+        rho = np.append(rho, 2.0 * rho[-1])
+    G = _fft_responses(
+        t, rho, histories, diffusivity, poroelastic, time_unit, blocklength, blocksize
+    )
+    G *= rho[:, None]
+    logrho = np.log(rho)
+
+    for b0 in range(0, ntarget, nb):
+        r = _distances(targets[b0 : b0 + nb], wells, radius)
+        u = np.log(r)
+        # cubic Lagrange interpolation on the nodes j-1 .. j+2 (exact at nodes)
+        j = np.clip(np.searchsorted(logrho, u, side="right") - 2, 0, len(rho) - 4)
+        x = logrho[j[..., None] + np.arange(4)]
+        weights = []
+        for k in range(4):
+            weight = np.ones_like(u)
+            for m in range(4):
+                if m != k:
+                    weight *= (u - x[..., m]) / (x[..., k] - x[..., m])
+            weights.append(weight)
+        for w in range(nw):
+            block = np.zeros((len(r), len(t)))
+            for k, weight in enumerate(weights):
+                block += weight[:, w, None] * G[w, j[:, w] + k]
+            P[b0 : b0 + nb] += block / r[:, w, None]
+    return P
+
+
+class WellsLoading(_InjectionLoading):
+    """
+    WellsLoading (short name "wells") is the Coulomb stress (normalised by friction) of the pore pressure of several injection and production ``wells`` (coordinates [m], wells x dimensions) at the ``targets`` (points x dimensions) plus the tectonic trend ``strend``, one history per target as in :class:`MatrixLoading`. ``flows`` holds the flow rate changes ``(tq, dq)`` [m^3/s] of every well (negative for production) or the file of its flow rates (see :func:`tdsr.loading.pressure.read_flowrates`). The pressures of the wells are superposed at every target (see :func:`well_pressure`), in blocks of targets; ``method="fft"`` uses FFT convolutions shared by all targets, for many targets on an equidistant time axis. Scaling and time axis are as for :class:`PressureLoading`.
+    """
+
+    __name__: str = "Wells"
+
+    def __init__(
+        self,
+        wells: Optional[ArrayLike] = None,
+        flows: Optional[Sequence[Flow]] = None,
+        targets: Optional[ArrayLike] = None,
+        diffusivity: Number = 0.033,
+        strend: Number = 7.0e-5,
+        nu_drained: Number = 0.25,
+        nu_undrained: Number = 0.30,
+        shear_modulus: Number = 1.0e9,
+        biot: Number = 0.1,
+        scal_cf: Number = 1.0e-6,
+        time_unit: Number = 86400.0,
+        tstart: Optional[Number] = None,
+        tend: Optional[Number] = None,
+        deltat: Optional[Number] = None,
+        taxis_log: Optional[bool] = None,
+        ntlog: Optional[Number] = None,
+        weights: Optional[ArrayLike] = None,
+        method: str = "direct",
+        ndistances: int = 256,
+        radius: Number = 0.1,
+        blocklength: Optional[int] = None,
+        blocksize: int = 1 << 22,
+        config: Optional["Config"] = None,
+    ):
+        if wells is None or flows is None or targets is None:
+            raise MissingParameter("wells loading needs wells, flows and targets")
+        self.config = config
+        self.method = method
+        t = self._time_axis(tstart, tend, deltat, taxis_log, ntlog)
+        if method == "fft" and self.taxis_log:
+            raise InvalidParameter("FFT pressure needs a linear time axis")
+        self.wells = np.atleast_2d(np.asarray(wells, dtype=float))
+        self.targets = np.atleast_2d(np.asarray(targets, dtype=float))
+        data = well_pressure(
+            t,
+            self.wells,
+            flows,
+            self.targets,
+            diffusivity,
+            nu_drained,
+            nu_undrained,
+            shear_modulus,
+            biot,
+            time_unit,
+            method,
+            ndistances,
+            radius,
+            blocklength,
+            blocksize,
+        )
+        # scaled in place, the matrix of many targets is large
+        data *= scal_cf
+        data += strend * (t - t[0])
+        super().__init__(data=data, weights=weights, strend=strend, config=config)
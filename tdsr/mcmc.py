@@ -0,0 +1,388 @@
+################################
+# Time Dependent Seismicity Model - Posterior sampling
+################################
+
+"""
+Posterior sampling of model parameters with the catalog likelihood of
+:mod:`tdsr.calibration`. :class:`EnsembleSampler` implements the
+affine-invariant stretch move of Goodman & Weare (2010): the walkers are
+split into two halves, and the proposals of one half are evaluated
+together in one batched model run (``model.ensemble``), optionally split
+over a process pool. The chain is written to disk row by row as it
+grows and a run is continued from its files.
+"""
+
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from typing import Any, Dict, Optional, Tuple, Type
+
+import numpy as np
+import numpy.typing as npt
+from numpy.lib.format import open_memmap
+from numpy.typing import ArrayLike
+
+from tdsr.calibration import SCALE_PARAMETERS, log_likelihood
+from tdsr.config import Config
+from tdsr.exceptions import InvalidParameter, MissingParameter
+from tdsr.loading import Loading
+from tdsr.sweep import SharedLoading
+from tdsr.types import PathLike
+from tdsr.utils import gridrange, gridrange_log, load_checkpoint, save_checkpoint
+
+
+class EnsembleLikelihood(object):
+    """
+    Catalog log-likelihood (see :func:`tdsr.calibration.log_likelihood`)
+    of many parameter sets, evaluated with one ``model.ensemble`` run.
+    The loading is evaluated once. For a 2-D loading (cells x nt), e.g.
+    :class:`tdsr.loading.PressureLoading` at several distances, the
+    catalog is compared with the rate summed over all cells.
+    """
+
+    def __init__(
+        self,
+        model_cls: Type[Any],
+        events: ArrayLike,
+        loading: Optional[Loading] = None,
+        config: Optional[Config] = None,
+        tmin: Optional[float] = None,
+        tmax: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
+        if not hasattr(model_cls, "ensemble"):
+            raise InvalidParameter("%s has no ensemble run" % model_cls.__name__)
+        self.accepted = inspect.signature(model_cls.ensemble).parameters
+        config = deepcopy(config or Config())
+        # all but the explicit ensemble parameters must be config options
+        config.merge(
+            {k: v for k, v in kwargs.items() if k not in self.accepted}, strict=True
+        )
+        if loading is not None:
+            config.loading = loading
+        if config.taxis_log:
+            _, _, nt, self.t, _ = gridrange_log(
+                config.tstart, config.tend, config.ntlog
+            )
+        else:
+            _, _, nt, self.t, _ = gridrange(config.tstart, config.tend, config.deltat)
+        if config.loading is None:
+            raise MissingParameter("missing loading function")
+        cf = np.asarray(config.loading.values(length=nt), dtype=float)
+        config.loading = SharedLoading(config.loading, cf)
+        self.model = model_cls(config=config)
+        self.events = np.sort(np.asarray(events, dtype=float))
+        self.tmin = tmin
+        self.tmax = tmax
+        self.kwargs = kwargs
+
+    def __call__(
+        self, params: Dict[str, npt.NDArray[np.float64]]
+    ) -> npt.NDArray[np.float64]:
+        """log-likelihood of each member of ``params`` (name -> values)"""
+        _, _, _, ratez, _ = self.model.ensemble(**params, **self.kwargs)
+        ratez = np.asarray(ratez, dtype=float)
+        ratez = ratez.reshape(ratez.shape[0], -1, ratez.shape[-1]).sum(axis=1)
+        loglike = log_likelihood(self.t, ratez, self.events, self.tmin, self.tmax)
+        loglike[np.isnan(loglike)] = -np.inf
+        return loglike
+
+
+# likelihood of a worker process, set by _init_worker
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(likelihood: EnsembleLikelihood) -> None:
+    _WORKER["likelihood"] = likelihood
+
+
+def _evaluate_worker(
+    params: Dict[str, npt.NDArray[np.float64]]
+) -> npt.NDArray[np.float64]:
+    loglike: npt.NDArray[np.float64] = _WORKER["likelihood"](params)
+    return loglike
+
+
+def _chain_files(filename: PathLike) -> Tuple[str, str]:
+    """files of the chain and its log-posterior next to the checkpoint"""
+    root = os.path.splitext(str(filename))[0]
+    return root + "_chain.npy", root + "_logp.npy"
+
+
+def _memmap(
+    filename: str, mode: str, shape: Optional[Tuple[int, ...]] = None
+) -> "np.memmap[Any, np.dtype[np.float64]]":
+    """memory-mapped ``.npy`` file, created with ``shape`` for mode ``w+``"""
+    rows: "np.memmap[Any, np.dtype[np.float64]]"
+    if shape is None:
+        rows = open_memmap(filename, mode=mode)  # type: ignore
+    else:
+        rows = open_memmap(  # type: ignore
+            filename, mode=mode, dtype=np.float64, shape=shape
+        )
+    return rows
+
+
+def _open_rows(
+    filename: str, values: npt.NDArray[np.float64], nrows: int
+) -> npt.NDArray[np.float64]:
+    """
+    ``.npy`` file (memory-mapped) with room for ``nrows`` rows, starting
+    with ``values``; a smaller file is copied into a larger one once.
+    """
+    shape = (max(nrows, len(values)),) + values.shape[1:]
+    if os.path.exists(filename):
+        rows = _memmap(filename, "r+")
+        if rows.shape[0] >= shape[0] and rows.shape[1:] == shape[1:]:
+            rows[: len(values)] = values
+            return rows
+        tmp = filename + ".tmp"
+        grown = _memmap(tmp, "w+", shape)
+        grown[: len(values)] = values
+        grown.flush()
+        del grown, rows
+        os.replace(tmp, filename)
+        return _memmap(filename, "r+")
+    rows = _memmap(filename, "w+", shape)
+    rows[: len(values)] = values
+    return rows
+
+
+class EnsembleSampler(object):
+    """
+    Affine-invariant ensemble MCMC sampler (stretch move with scale
+    ``stretch``) of the posterior of the parameters in ``bounds`` (name ->
+    (lower, upper)) given the event times ``events``. The prior is uniform
+    within the bounds, in log magnitude for ``SCALE_PARAMETERS``
+    (log-uniform; their bounds must not include zero). ``nwalkers`` (even,
+    at least twice the number of parameters) walkers are advanced per
+    step; each half of them is evaluated with one batched model run,
+    split over ``workers`` processes if ``workers > 1``. All other keyword
+    arguments are fixed model parameters (see :class:`EnsembleLikelihood`).
+
+    After :meth:`run` the chain (steps x walkers x parameters, in
+    parameter units), its log-posterior (steps x walkers) and the
+    acceptance fraction per walker are in ``self.chain``, ``self.logp``
+    and ``self.acceptance_fraction``.
+    """
+
+    def __init__(
+        self,
+        model_cls: Type[Any],
+        events: ArrayLike,
+        bounds: Dict[str, Tuple[float, float]],
+        loading: Optional[Loading] = None,
+        config: Optional[Config] = None,
+        tmin: Optional[float] = None,
+        tmax: Optional[float] = None,
+        nwalkers: int = 32,
+        stretch: float = 2.0,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
+        if not bounds:
+            raise MissingParameter("no parameters to sample")
+        self.likelihood = EnsembleLikelihood(
+            model_cls, events, loading, config, tmin, tmax, **kwargs
+        )
+        for name in bounds:
+            if name not in self.likelihood.accepted or name == "loading":
+                raise InvalidParameter(
+                    "%s is not an ensemble parameter of %s"
+                    % (name, model_cls.__name__)
+                )
+        self.names = list(bounds)
+        self.bounds = np.array(
+            [sorted(bounds[name]) for name in self.names], dtype=float
+        )
+        self.scale = np.array([name in SCALE_PARAMETERS for name in self.names])
+        self.sign = np.where(self.scale, np.sign(self.bounds[:, 1]), 1.0)
+        if np.any(self.scale & (self.bounds[:, 0] * self.bounds[:, 1] <= 0)):
+            raise InvalidParameter(
+                "bounds of %s must not include zero" % list(SCALE_PARAMETERS)
+            )
+        if nwalkers % 2 or nwalkers < 2 * len(self.names):
+            raise InvalidParameter(
+                "nwalkers must be even and at least twice the number of parameters"
+            )
+        self.nwalkers = nwalkers
+        self.stretch = float(stretch)
+        self.workers = int(workers)
+        self.rng = np.random.default_rng(seed)
+        self.lower, self.upper = np.sort(self.transform(self.bounds.T), axis=0)
+        self.chain = np.zeros((0, nwalkers, len(self.names)))
+        self.logp = np.zeros((0, nwalkers))
+        self.accepted = np.zeros(nwalkers)
+        # last positions in the sampling space (exact for continuing a run)
+        self.position = np.zeros((nwalkers, len(self.names)))
+
+    @property
+    def acceptance_fraction(self) -> npt.NDArray[np.float64]:
+        return self.accepted / max(len(self.chain) - 1, 1)
+
+    def transform(self, values: ArrayLike) -> npt.NDArray[np.float64]:
+        """parameter values (..., nparams) to the sampling space"""
+        values = np.asarray(values, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.scale, np.log(np.abs(values)), values)
+
+    def untransform(self, x: ArrayLike) -> npt.NDArray[np.float64]:
+        """sampling space (..., nparams) to parameter values"""
+        x = np.asarray(x, dtype=float)
+        return np.where(self.scale, self.sign * np.exp(x), x)
+
+    def log_probability(
+        self, x: npt.NDArray[np.float64], pool: Optional[ProcessPoolExecutor] = None
+    ) -> npt.NDArray[np.float64]:
+        """log-posterior of the positions ``x`` (walkers x nparams)"""
+        logp = np.full(len(x), -np.inf)
+        inside = np.all((x >= self.lower) & (x <= self.upper), axis=1)
+        if not np.any(inside):
+            return logp
+        values = self.untransform(x[inside])
+        if pool is None:
+            logp[inside] = self.likelihood(
+                {name: values[:, k] for k, name in enumerate(self.names)}
+            )
+            return logp
+        parts = np.array_split(values, min(self.workers, len(values)))
+        results = pool.map(
+            _evaluate_worker,
+            [{name: p[:, k] for k, name in enumerate(self.names)} for p in parts],
+        )
+        logp[inside] = np.concatenate(list(results))
+        return logp
+
+    def _save(self, filename: PathLike) -> None:
+        """flush the chain files and write the resume state"""
+        for values in (self.chain, self.logp):
+            if isinstance(values, np.memmap):
+                values.flush()
+        save_checkpoint(
+            dict(
+                names=np.array(self.names),
+                bounds=self.bounds,
+                nsteps=len(self.chain),
+                accepted=self.accepted,
+                position=self.position,
+                rng=np.array(json.dumps(self.rng.bit_generator.state)),
+            ),
+            filename,
+        )
+
+    def _load(self, filename: PathLike) -> None:
+        state = load_checkpoint(filename)
+        if list(state["names"]) != self.names or not np.array_equal(
+            state["bounds"], self.bounds
+        ):
+            raise InvalidParameter("chain file %s has other parameters" % filename)
+        if state["position"].shape[0] != self.nwalkers:
+            raise InvalidParameter("chain file %s has other walkers" % filename)
+        n = int(state["nsteps"])
+        chain_file, logp_file = _chain_files(filename)
+        self.chain = _memmap(chain_file, "r")[:n]
+        self.logp = _memmap(logp_file, "r")[:n]
+        self.accepted = state["accepted"]
+        self.position = state["position"]
+        self.rng.bit_generator.state = json.loads(str(state["rng"]))
+
+    def _step(
+        self,
+        x: npt.NDArray[np.float64],
+        logp: npt.NDArray[np.float64],
+        pool: Optional[ProcessPoolExecutor],
+    ) -> npt.NDArray[np.bool_]:
+        """one stretch move of both halves of the walkers, in place"""
+        n = self.nwalkers // 2
+        ndim = x.shape[1]
+        accepted = np.zeros(self.nwalkers, dtype=bool)
+        halves = ((slice(0, n), slice(n, None)), (slice(n, None), slice(0, n)))
+        for active, other in halves:
+            a = self.stretch
+            z = ((a - 1.0) * self.rng.random(n) + 1.0) ** 2 / a
+            partners = x[other][self.rng.integers(0, n, n)]
+            proposal = partners + z[:, None] * (x[active] - partners)
+            logp_new = self.log_probability(proposal, pool)
+            with np.errstate(invalid="ignore"):
+                log_ratio = (ndim - 1) * np.log(z) + logp_new - logp[active]
+            accept = np.log(self.rng.random(n)) < log_ratio
+            x[active][accept] = proposal[accept]
+            logp[active][accept] = logp_new[accept]
+            accepted[active] = accept
+        return accepted
+
+    def run(
+        self,
+        nsteps: int,
+        filename: Optional[PathLike] = None,
+        initial: Optional[ArrayLike] = None,
+        save_every: int = 10,
+    ) -> npt.NDArray[np.float64]:
+        """
+        Extend the chain to ``nsteps`` steps (including the initial
+        positions). With ``filename`` the chain and its log-posterior are
+        written to the memory-mapped files ``<root>_chain.npy`` and
+        ``<root>_logp.npy`` as they grow; every ``save_every`` steps and at
+        the end they are flushed and the small resume state (number of
+        steps, positions, acceptance counts, random state) is written
+        atomically to ``filename``. If ``filename`` exists the run continues
+        from it (same parameters, bounds and walkers) with the saved random
+        state. ``initial`` positions (walkers x nparams, in
+        parameter units) default to random draws from the prior. Returns
+        ``self.chain``.
+        """
+        if filename is not None and os.path.exists(filename):
+            self._load(filename)
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.likelihood,),
+            )
+        try:
+            if len(self.chain) == 0:
+                if initial is None:
+                    x = self.lower + (self.upper - self.lower) * self.rng.random(
+                        (self.nwalkers, len(self.names))
+                    )
+                else:
+                    x = self.transform(initial)
+                    if x.shape != (self.nwalkers, len(self.names)):
+                        raise InvalidParameter(
+                            "initial must have shape (nwalkers, nparams)"
+                        )
+                logp = self.log_probability(x, pool)
+                if not np.all(np.isfinite(logp)):
+                    raise InvalidParameter("initial positions have zero posterior")
+                self.chain = self.untransform(x)[None]
+                self.logp = logp[None]
+                self.position = x
+            n = len(self.chain)
+            total = max(nsteps, n)
+            if filename is None:
+                chain = np.zeros((total,) + self.chain.shape[1:])
+                logps = np.zeros((total, self.nwalkers))
+                chain[:n], logps[:n] = self.chain, self.logp
+            else:
+                chain_file, logp_file = _chain_files(filename)
+                chain = _open_rows(chain_file, self.chain, total)[:total]
+                logps = _open_rows(logp_file, self.logp, total)[:total]
+            x, logp = self.position.copy(), logps[n - 1].copy()
+            for i in range(n, nsteps):
+                self.accepted += self._step(x, logp, pool)
+                chain[i], logps[i] = self.untransform(x), logp
+                self.chain, self.logp = chain[: i + 1], logps[: i + 1]
+                self.position = x.copy()
+                if filename is not None and (i + 1) % save_every == 0:
+                    self._save(filename)
+            self.chain, self.logp = chain, logps
+            if filename is not None:
+                self._save(filename)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.chain
@@ -0,0 +1,283 @@
+################################
+# Time Dependent Seismicity Model - Parameter sweeps
+################################
+
+"""
+Parameter sweeps of the seismicity models. The stress loading is
+evaluated once and placed in shared memory
+(:mod:`multiprocessing.shared_memory`); worker processes attach to it
+instead of receiving a copy per task. The parameter combinations of the
+grid are run in chunks by a process pool and collected into preallocated
+output arrays in grid order, independent of the completion order.
+"""
+
+import inspect
+import itertools
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from copy import copy, deepcopy
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+import numpy.typing as npt
+
+from tdsr.config import Config
+from tdsr.exceptions import InvalidParameter, MissingParameter
+from tdsr.loading import Loading
+from tdsr.utils import gridrange, gridrange_log
+
+# parameters defining the time axis (and thereby the loading samples)
+TIME_AXIS_PARAMETERS = ("deltat", "tstart", "tend", "taxis_log", "ntlog")
+
+TaskResult = Tuple[int, Optional[npt.NDArray[Any]], Optional[npt.NDArray[Any]], str]
+
+
+class SharedLoading(Loading):
+    """
+    Loading returning precomputed stress values (e.g. a view of shared
+    memory). All other attributes (``strend``, ``sstep``, ``weights``,
+    ...) are taken from the original ``loading``; attributes in ``arrays``
+    refer to the values.
+    """
+
+    def __init__(
+        self,
+        loading: Loading,
+        values: npt.NDArray[np.float64],
+        arrays: Sequence[str] = (),
+    ) -> None:
+        self.loading = loading
+        self.cf = values
+        self.arrays = tuple(arrays)
+        self.__name__ = loading.name
+
+    def __getattr__(self, name: str) -> Any:
+        if name in ("loading", "cf", "arrays"):
+            raise AttributeError(name)
+        if name in self.arrays:
+            return self.cf
+        return getattr(self.loading, name)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "SharedLoading":
+        # the models copy their config per call, the values are read-only
+        return self
+
+    @property
+    def stress_rate(self) -> float:
+        return self.loading.stress_rate
+
+    def values(self, length: int) -> npt.NDArray[np.float64]:
+        if self.cf.shape[-1] != length:
+            raise InvalidParameter(
+                "shared loading has %d samples, but the time axis has %d"
+                % (self.cf.shape[-1], length)
+            )
+        return self.cf
+
+
+class SweepResult(object):
+    """
+    Results of :func:`sweep`. ``ratez`` and ``neqz`` have the shape of the
+    grid followed by the shape of a single result; entries of failed
+    combinations are NaN and their tracebacks are in ``errors`` (keyed by
+    grid index).
+    """
+
+    def __init__(
+        self,
+        params: Dict[str, npt.NDArray[Any]],
+        t: npt.NDArray[np.float64],
+        cf: npt.NDArray[np.float64],
+        ratez: npt.NDArray[np.float64],
+        neqz: npt.NDArray[np.float64],
+        errors: Dict[Tuple[int, ...], str],
+    ) -> None:
+        self.params = params
+        self.t = t
+        self.cf = cf
+        self.ratez = ratez
+        self.neqz = neqz
+        self.errors = errors
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(len(v) for v in self.params.values())
+
+    @property
+    def failed(self) -> npt.NDArray[np.bool_]:
+        """mask of the failed parameter combinations"""
+        failed = np.zeros(self.shape, dtype=bool)
+        for index in self.errors:
+            failed[index] = True
+        return failed
+
+
+# state of a worker process, set by _init_worker
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(
+    model_cls: Type[Any],
+    config: Config,
+    loading: Loading,
+    arrays: Sequence[str],
+    shm_name: str,
+    shape: Tuple[int, ...],
+    combinations: List[Dict[str, Any]],
+    kwargs: Dict[str, Any],
+) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    cf: npt.NDArray[np.float64] = np.ndarray(
+        shape, dtype=np.float64, buffer=shm.buf
+    )
+    cf.flags.writeable = False
+    config.loading = SharedLoading(loading, cf, arrays)
+    _WORKER.update(
+        shm=shm,
+        model=model_cls(config=config),
+        combinations=combinations,
+        kwargs=kwargs,
+    )
+
+
+def _run(
+    model: Any,
+    combinations: List[Dict[str, Any]],
+    kwargs: Dict[str, Any],
+    indices: Sequence[int],
+) -> List[TaskResult]:
+    """run the combinations ``indices``, capturing errors per combination"""
+    results: List[TaskResult] = []
+    for index in indices:
+        try:
+            _, _, _, ratez, neqz = model(**{**kwargs, **combinations[index]})
+            results.append((index, np.asarray(ratez), np.asarray(neqz), ""))
+        except Exception:
+            results.append((index, None, None, traceback.format_exc()))
+    return results
+
+
+def _run_worker(indices: Sequence[int]) -> List[TaskResult]:
+    return _run(_WORKER["model"], _WORKER["combinations"], _WORKER["kwargs"], indices)
+
+
+def sweep(
+    model_cls: Type[Any],
+    loading: Loading,
+    grid: Dict[str, Sequence[Any]],
+    config: Optional[Config] = None,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    **kwargs: Any,
+) -> SweepResult:
+    """
+    Run ``model_cls`` (e.g. :class:`tdsr.TDSR1`) with ``loading`` for all
+    combinations of the parameter ``grid`` (name -> sequence of values,
+    e.g. ``dict(depthS=[-0.5, -1.0], t0=[...])``). ``kwargs`` are passed
+    to every model call. The time axis (and thereby the loading) is the
+    same for all combinations, so the parameters in
+    ``TIME_AXIS_PARAMETERS`` cannot be part of the grid.
+
+    ``workers`` processes (default ``os.cpu_count()``) run chunks of
+    ``chunksize`` combinations (default about four chunks per worker);
+    with ``workers=1`` the sweep runs in the calling process. Errors are
+    captured per combination (see :class:`SweepResult`).
+    """
+    config = deepcopy(config or Config())
+    config.merge(kwargs)
+    config.loading = loading
+    if not grid:
+        raise MissingParameter("empty parameter grid")
+    accepted = inspect.signature(model_cls.__call__).parameters
+    for name in grid:
+        if name in TIME_AXIS_PARAMETERS or name == "loading":
+            raise InvalidParameter("%s cannot be swept" % name)
+        if name not in accepted:
+            raise InvalidParameter(
+                "%s is not a parameter of %s" % (name, model_cls.__name__)
+            )
+    for name in kwargs:
+        if name not in accepted:
+            raise InvalidParameter(
+                "%s is not a parameter of %s" % (name, model_cls.__name__)
+            )
+    for name in TIME_AXIS_PARAMETERS:
+        kwargs.pop(name, None)
+    params = {name: np.asarray(values) for name, values in grid.items()}
+    shape = tuple(len(values) for values in params.values())
+    combinations = [
+        dict(zip(params, values))
+        for values in itertools.product(*(list(v) for v in grid.values()))
+    ]
+
+    if config.taxis_log:
+        _, _, nt, t, _ = gridrange_log(config.tstart, config.tend, config.ntlog)
+    else:
+        _, _, nt, t, _ = gridrange(config.tstart, config.tend, config.deltat)
+    cf = np.asarray(loading.values(length=nt), dtype=float)
+
+    workers = workers or os.cpu_count() or 1
+    n = len(combinations)
+    chunksize = chunksize or max(1, -(-n // (4 * workers)))
+    chunks = [range(a, min(a + chunksize, n)) for a in range(0, n, chunksize)]
+
+    # rates per sample of the loading, cumulative numbers with nt - 1 entries
+    # (see tdsr.utils.cumulative_events)
+    ratez_out = np.full(shape + cf.shape, np.nan)
+    neqz_out = np.full(shape + cf.shape[:-1] + (max(nt - 1, 0),), np.nan)
+    errors: Dict[Tuple[int, ...], str] = {}
+
+    def collect(results: List[TaskResult]) -> None:
+        """write the results of a chunk into the output arrays"""
+        for index, ratez, neqz, error in results:
+            grid_index = tuple(int(i) for i in np.unravel_index(index, shape))
+            if ratez is None or neqz is None:
+                errors[grid_index] = error
+                continue
+            ratez_out[grid_index] = ratez
+            neqz_out[grid_index] = neqz
+
+    if workers == 1:
+        model = model_cls(config=config)
+        for chunk in chunks:
+            collect(_run(model, combinations, kwargs, chunk))
+    else:
+        # the worker copy of the loading refers to the shared values instead
+        # of its own arrays (and the config holding the original loading)
+        arrays = [k for k, v in vars(loading).items() if v is cf]
+        stripped = copy(loading)
+        for name in arrays:
+            setattr(stripped, name, None)
+        if hasattr(stripped, "config"):
+            stripped.config = None
+        worker_config = copy(config)
+        worker_config.loading = None
+        shm = shared_memory.SharedMemory(create=True, size=max(cf.nbytes, 1))
+        try:
+            np.ndarray(cf.shape, dtype=np.float64, buffer=shm.buf)[...] = cf
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(
+                    model_cls,
+                    worker_config,
+                    stripped,
+                    arrays,
+                    shm.name,
+                    cf.shape,
+                    combinations,
+                    kwargs,
+                ),
+            ) as pool:
+                futures = {pool.submit(_run_worker, chunk) for chunk in chunks}
+                for future in as_completed(futures):
+                    # release each chunk once it is in the output arrays
+                    futures.discard(future)
+                    collect(future.result())
+        finally:
+            shm.close()
+            shm.unlink()
+
+    return SweepResult(params, t, cf, ratez_out, neqz_out, errors)
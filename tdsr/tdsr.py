@@ -57,35 +57,500 @@ Please send us your suggestions or addings and contribute to the
 git project if interested.
 """
 
-from copy import deepcopy
-from typing import Optional, Tuple
+import warnings
+from copy import copy, deepcopy
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import numpy.typing as npt
+from numpy.typing import ArrayLike
 
 from tdsr.config import Config
 from tdsr.loading import Loading
-from tdsr.exceptions import MissingParameter
+from tdsr.exceptions import InvalidParameter, MissingParameter
+from tdsr.types import PathLike
 from tdsr.utils import (
     DEBUG,
     X0gaussian,
     X0steady,
     X0uniform,
     Zvalues,
+    Zvalues_stretched,
     gridrange,
     gridrange_log,
+    LazyCumulative,
+    RingBuffer,
+    cumulative_events,
+    load_checkpoint,
     pf,
+    save_checkpoint,
     shifted,
 )
 
+# t, chiz, cf, ratez, neqz
 Result = Tuple[
     npt.NDArray[np.float64],
     npt.NDArray[np.float64],
     npt.NDArray[np.float64],
     npt.NDArray[np.float64],
+    Union[npt.NDArray[np.float64], LazyCumulative],
 ]
 
 
+def _march(
+    X: npt.NDArray[np.float64],
+    Z: npt.NDArray[np.float64],
+    dZ: npt.NDArray[np.float64],
+    dS: npt.NDArray[np.float64],
+    dt: npt.NDArray[np.float64],
+    t0: Union[float, npt.NDArray[np.float64]],
+    dsig: Union[float, npt.NDArray[np.float64]],
+    ratez: npt.NDArray[np.float64],
+    incremental: bool = False,
+    renorm: int = 100,
+    band: bool = False,
+    band_tol: float = 1e-15,
+    integrator: str = "euler",
+    pf_average: bool = False,
+    pstate: Optional[npt.NDArray[np.float64]] = None,
+    offset: int = 0,
+) -> float:
+    """
+    Time march of the source distribution ``X`` on the stress axis ``Z``
+    (forward Euler, Dahm & Hainzl 2022). ``X``, ``Z`` and ``ratez`` are
+    updated in place. Before step ``i`` the stress axis is shifted by
+    ``dS[i]``.
+
+    If ``incremental==True`` the trigger probability ``pf(Z)`` is kept as
+    state and updated by the scalar factor ``exp(dS[i]/dsig)`` instead of
+    evaluating ``exp(-Z/dsig)`` on the full grid every step. It is
+    re-evaluated exactly every ``renorm`` steps, which bounds the rounding
+    drift to a few ``renorm`` machine epsilons. Rates agree with the direct
+    evaluation to a relative tolerance of about 1e-10. The saving is modest
+    as the depletion update dominates a step:
+    ``benchmarks/benchmark_pf_incremental.py`` measures 1.06x to 1.8x,
+    e.g. 1.06x for ``nt=5000, NZ=1000``. To continue a march
+    over several calls, pass the trigger probability as ``pstate`` (updated
+    in place) and the number of steps done before as ``offset``.
+
+    With ``integrator=="exponential"`` the exact solution of
+    ``dX/dt = -pf X`` over the step, ``dX = X (1 - exp(-pf dt))``, replaces
+    the clipped Euler update, so coarse time steps stay accurate. If
+    ``pf_average==True`` pf is in addition averaged analytically over the
+    linear stress change within the step (see :func:`_depletion`).
+
+    If ``band==True`` only the active window of the stress axis is
+    updated (see :func:`_march_band`). Returns the average fraction of
+    stress nodes that have been updated per time step.
+    """
+    exponential = _check_integrator(integrator)
+    if band:
+        return _march_band(
+            X,
+            Z,
+            dZ,
+            dS,
+            dt,
+            t0,
+            dsig,
+            ratez,
+            tol=band_tol,
+            exponential=exponential,
+            pf_average=pf_average,
+        )
+    if incremental and pstate is None:
+        pstate = np.empty_like(Z)
+    for i in range(len(dt)):
+        Z -= dS[..., i, None]
+        if not incremental:
+            ptrigger = pf(Z, t0, dsig)
+        else:
+            assert pstate is not None
+            ptrigger = pstate
+            if (offset + i) % renorm == 0:
+                ptrigger[...] = pf(Z, t0, dsig)
+            else:
+                ptrigger *= np.exp(dS[..., i, None] / dsig)
+        dX = _depletion(X, ptrigger, dS, dt, i, dsig, exponential, pf_average)
+        ratez[..., i] = np.sum(dX * dZ, axis=-1) / dt[i]
+        X -= dX
+    return 1.0
+
+
+#: parameters of the initial state and the trigger probability for which
+#: TDSR1 can propagate tangent-linear sensitivities of the rates
+SENSITIVITY_PARAMETERS = ("chi0", "t0", "depthS", "Sshadow", "Zmean", "Zstd")
+
+
+def _log_expm1_ratio_slope(x: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """derivative of ``log((exp(x) - 1) / x)``, 1/2 for ``x == 0``"""
+    small = np.abs(x) < 1e-4
+    xs = np.where(small, 1.0, x)
+    with np.errstate(divide="ignore", over="ignore"):
+        slope = -1.0 / np.expm1(-xs) - 1.0 / xs
+    return np.where(small, 0.5 + x / 12.0, slope)
+
+
+def _march_tangent(
+    X: npt.NDArray[np.float64],
+    dX: npt.NDArray[np.float64],
+    Z: npt.NDArray[np.float64],
+    dZ: npt.NDArray[np.float64],
+    dS: npt.NDArray[np.float64],
+    dt: npt.NDArray[np.float64],
+    t0: float,
+    dsig: float,
+    dlogt0: npt.NDArray[np.float64],
+    ddsig: npt.NDArray[np.float64],
+    ratez: npt.NDArray[np.float64],
+    dratez: npt.NDArray[np.float64],
+    integrator: str = "euler",
+    pf_average: bool = False,
+) -> None:
+    """
+    :func:`_march` of a single stress history together with the
+    tangent-linear (forward mode) derivatives ``dX`` (nparams x NZ) of
+    ``X`` with respect to the model parameters. ``dlogt0`` and ``ddsig``
+    (nparams) are the derivatives of ``log(t0)`` and ``dsig`` with
+    respect to the parameters, through which the trigger probability
+    ``pf = exp(-Z/dsig)/t0`` depends on them. The rates and their
+    derivatives (nparams x nt) are written to ``ratez`` and ``dratez``;
+    the rates are the same as those of :func:`_march`. The stress axis is
+    held fixed, i.e. the derivatives are those of the continuous model.
+    """
+    exponential = _check_integrator(integrator)
+    dlogt0 = dlogt0[:, None]
+    ddsig = ddsig[:, None]
+    for i in range(len(dt)):
+        Z -= dS[i]
+        ptrigger = pf(Z, t0, dsig)
+        dlogp = -dlogt0 + ddsig * (Z / dsig**2)
+        depleted = _depletion(X, ptrigger, dS, dt, i, dsig, exponential, pf_average)
+        if not exponential:
+            # the clipped sources (pf dt >= 1) are all triggered
+            q = ptrigger * dt[i]
+            ddepleted = np.where(q < 1.0, (dX + X * dlogp) * q, dX)
+        else:
+            q = ptrigger * dt[i]
+            if pf_average:
+                x = dS[min(i + 1, len(dS) - 1)] / dsig
+                q = q * _expm1_ratio(x)
+                dlogp = dlogp - _log_expm1_ratio_slope(x) * x / dsig * ddsig
+            ddepleted = -dX * np.expm1(-q) + X * np.exp(-q) * q * dlogp
+        ratez[i] = np.sum(depleted * dZ) / dt[i]
+        dratez[:, i] = np.sum(ddepleted * dZ, axis=-1) / dt[i]
+        X -= depleted
+        dX -= ddepleted
+
+
+def _check_integrator(integrator: str) -> bool:
+    """True for the exponential integrator, False for forward Euler"""
+    if integrator.lower() not in ("euler", "exponential"):
+        raise InvalidParameter(
+            'integrator must be one of "euler", "exponential" '
+            '(or "segments" for a single 1-D loading), '
+            "but got %s" % integrator.lower()
+        )
+    return integrator.lower() == "exponential"
+
+
+def _depletion(
+    X: npt.NDArray[np.float64],
+    ptrigger: npt.NDArray[np.float64],
+    dS: npt.NDArray[np.float64],
+    dt: npt.NDArray[np.float64],
+    i: int,
+    dsig: Union[float, npt.NDArray[np.float64]],
+    exponential: bool,
+    pf_average: bool,
+) -> npt.NDArray[np.float64]:
+    """
+    Number of sources ``dX`` triggered during step ``i``. For the
+    exponential integrator with ``pf_average==True``, pf is averaged over
+    the linear stress change ``dS[i+1]`` within the step:
+    ``<pf> = pf * (exp(x) - 1) / x`` with ``x = dS[i+1] / dsig``.
+    """
+    if not exponential:
+        dX: npt.NDArray[np.float64] = X * ptrigger * dt[i]
+        # wenn diese Zeile entfaellt, dann muss nicht mit dt multipliziert werden
+        np.minimum(dX, X, out=dX)
+        return dX
+    if pf_average:
+        x = dS[..., min(i + 1, dS.shape[-1] - 1), None] / dsig
+        with np.errstate(invalid="ignore", divide="ignore"):
+            factor = np.where(x == 0.0, 1.0, np.expm1(x) / x)
+        dX = -X * np.expm1(-ptrigger * factor * dt[i])
+    else:
+        dX = -X * np.expm1(-ptrigger * dt[i])
+    return dX
+
+
+def _searchsorted_rows(
+    a: npt.NDArray[np.float64], v: npt.NDArray[np.float64]
+) -> npt.NDArray[np.int_]:
+    """
+    ``np.searchsorted(a[k], v[k])`` for all rows ``k`` of the ascending
+    rows ``a`` (rows x n) and the queries ``v`` (rows x m) in one call.
+    The rows are shifted to start at zero and stacked with offsets larger
+    than their ranges, so the concatenated rows are sorted.
+    """
+    n = a.shape[-1]
+    rel = a - a[:, :1]
+    span = np.max(rel[:, -1]) + 1.0
+    offset = span * np.arange(len(a))[:, None]
+    query = np.clip(v - a[:, :1], 0.0, rel[:, -1:] + 0.5) + offset
+    index: npt.NDArray[np.int_] = np.searchsorted((rel + offset).ravel(), query)
+    return index - n * np.arange(len(a))[:, None]
+
+
+def _march_band(
+    X: npt.NDArray[np.float64],
+    Z: npt.NDArray[np.float64],
+    dZ: npt.NDArray[np.float64],
+    dS: npt.NDArray[np.float64],
+    dt: npt.NDArray[np.float64],
+    t0: Union[float, npt.NDArray[np.float64]],
+    dsig: Union[float, npt.NDArray[np.float64]],
+    ratez: npt.NDArray[np.float64],
+    tol: float = 1e-15,
+    exponential: bool = False,
+    pf_average: bool = False,
+) -> float:
+    """
+    Time march of ``X`` restricted to the active index window [lo, hi) of
+    the (ascending) stress axis ``Z``. Below ``lo`` the sources are
+    exhausted (``X <= tol * max(X)`` for all rows); as ``X`` never
+    increases, ``lo`` only moves to larger indices. At and above ``hi``
+    the trigger probability is negligible (``pf * dt <= tol``). The shift
+    of ``Z`` is accumulated as a scalar per row and only applied inside
+    the window, so the cost per step is proportional to the window size.
+    The upper window edges of all steps are found together before the
+    march (see :func:`_searchsorted_rows`), the lower edge from the
+    window of the previous step.
+    Returns the average active fraction of the stress axis.
+    """
+    nz = Z.shape[-1]
+    nt = len(dt)
+    Z0 = Z.reshape(-1, nz)
+    dsig_rows = np.broadcast_to(np.ravel(dsig), Z0.shape[:1])[:, None]
+    t0_rows = np.broadcast_to(np.ravel(t0), Z0.shape[:1])[:, None]
+    # shift of each row after each step
+    shifts = np.cumsum(
+        np.broadcast_to(dS[..., :nt], Z.shape[:-1] + (nt,)).reshape(-1, nt), axis=-1
+    )
+    # pf(Z) * dt <= tol  for  Z >= Zc
+    Zc = shifts - dsig_rows * np.log(tol * t0_rows / dt)
+    his = np.max(_searchsorted_rows(Z0, Zc), axis=0)
+    Xrows = X.reshape(-1, nz)
+    Xtol = tol * np.max(X)
+    lo = 0
+    active = 0
+    for i in range(nt):
+        hi = int(his[i])
+        if hi > lo:
+            alive = np.any(Xrows[:, lo:hi] > Xtol, axis=0)
+            lo += int(np.argmax(alive)) if alive.any() else hi - lo
+        if hi <= lo:
+            ratez[..., i] = 0.0
+            continue
+        active += hi - lo
+        Zw = Z[..., lo:hi] - shifts[:, i].reshape(Z.shape[:-1] + (1,))
+        Xw = X[..., lo:hi]
+        ptrigger = pf(Zw, t0, dsig)
+        dX = _depletion(Xw, ptrigger, dS, dt, i, dsig, exponential, pf_average)
+        ratez[..., i] = np.sum(dX * dZ[..., lo:hi], axis=-1) / dt[i]
+        Xw -= dX
+    if nt > 0:
+        Z -= shifts[:, -1].reshape(Z.shape[:-1] + (1,))
+    return active / (nz * max(nt, 1))
+
+
+def _expm1_ratio(x: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """``(exp(x) - 1) / x``, 1 for ``x == 0``"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(x == 0.0, 1.0, np.expm1(x) / x)
+
+
+def _march_segments(
+    X: npt.NDArray[np.float64],
+    Z: npt.NDArray[np.float64],
+    dZ: npt.NDArray[np.float64],
+    cf: npt.NDArray[np.float64],
+    t: npt.NDArray[np.float64],
+    dt: npt.NDArray[np.float64],
+    breaks: npt.NDArray[np.int_],
+    t0: float,
+    dsig: float,
+    ratez: npt.NDArray[np.float64],
+    chunksize: int = 64,
+) -> float:
+    """
+    Closed-form propagation of ``X`` for a piecewise-linear loading with
+    breakpoints ``breaks`` (sample indices). Within a segment of constant
+    stress rate ``r`` the trigger probability grows as
+    ``pf(Z_a) exp(r (t - ta) / dsig)`` from the reference time ``ta``, so
+    ``X(t) = X_a exp(-pf(Z_a) (t - ta) (exp(x) - 1) / x)`` with
+    ``x = r (t - ta) / dsig``. The rates follow from the number of triggered
+    sources at the samples, evaluated ``chunksize`` samples at a time
+    (each chunk starts a new reference time). They agree with
+    :func:`_march` using the exponential integrator and
+    ``pf_average==True``, independent of the sampling interval.
+    ``X`` and ``Z`` are updated in place. Returns 1.0 (the full stress
+    axis is used).
+    """
+    nt = len(cf)
+    # the last step extends the last segment by one sampling interval
+    T = np.append(t, t[-1] + dt[-1])
+    S = np.append(cf, 2 * cf[-1] - cf[-2]) - cf[0]
+    breaks = np.unique(np.clip(breaks, 0, nt - 1))
+    breaks = np.append(breaks[breaks < nt - 1], nt)
+    Z0 = Z.copy()
+    for a, b in zip(breaks[:-1], breaks[1:]):
+        rate = (S[b] - S[a]) / (T[b] - T[a])
+        for start in range(a, b, chunksize):
+            stop = min(start + chunksize, b)
+            # trigger integrals from T[start] to T[start], ..., T[stop]
+            tau = T[start : stop + 1] - T[start]
+            A = tau * _expm1_ratio(rate * tau / dsig)
+            ptrigger = pf(Z0 - S[start], t0, dsig)
+            # cumulative number of triggered sources since T[start]
+            survival = np.expm1(-np.outer(A, ptrigger))
+            counts = -(survival @ (X * dZ))
+            ratez[start:stop] = np.diff(counts) / dt[start:stop]
+            X *= np.exp(-A[-1] * ptrigger)
+    Z -= cf[-1] - cf[0]
+    return 1.0
+
+
+def _march_adaptive(
+    X: npt.NDArray[np.float64],
+    Z: npt.NDArray[np.float64],
+    dZ: npt.NDArray[np.float64],
+    cf: npt.NDArray[np.float64],
+    t: npt.NDArray[np.float64],
+    dt: npt.NDArray[np.float64],
+    t0: float,
+    dsig: float,
+    ratez: npt.NDArray[np.float64],
+    tol: float = 1e-2,
+) -> Tuple[int, int]:
+    """
+    Time march of ``X`` with adaptive steps spanning ``m`` sampling
+    intervals. Each step is done as two exact exponential half steps with
+    pf averaged over the linear stress change (as in :func:`_march` with
+    ``pf_average==True``), which is exact for ``m == 1``. A step with
+    ``m > 1`` is rejected (and ``m`` halved) if the stress deviates from
+    linear within a half step by more than ``tol * dsig``, or if the rates
+    of the two halves differ by more than ``tol`` relative to the larger
+    one. After a step well within the tolerance ``m`` is doubled.
+    The cumulative number of events is interpolated linearly in time from
+    the step boundaries and half steps onto the sampling, so ``ratez``
+    holds the rates of the requested output grid. ``X`` and ``Z`` are
+    updated in place. Returns the number of accepted and rejected steps.
+    """
+    nt = len(cf)
+    # the last step extends the loading by one sampling interval
+    T = np.append(t, t[-1] + dt[-1])
+    S = np.append(cf, 2 * cf[-1] - cf[-2]) - cf[0]
+    Z0 = Z.copy()
+
+    def step(
+        X: npt.NDArray[np.float64], a: int, b: int
+    ) -> Tuple[npt.NDArray[np.float64], float]:
+        x = (S[b] - S[a]) / dsig
+        ptrigger = pf(Z0 - S[a], t0, dsig)
+        dX = -X * np.expm1(-ptrigger * (T[b] - T[a]) * _expm1_ratio(x))
+        return X - dX, float(np.sum(dX * dZ) / (T[b] - T[a]))
+
+    def nonlinearity(a: int, b: int) -> float:
+        Slin = np.interp(T[a : b + 1], T[[a, b]], S[[a, b]])
+        return float(np.max(np.abs(S[a : b + 1] - Slin)) / dsig)
+
+    counts = np.full(nt + 1, np.nan)
+    counts[0] = 0.0
+    accepted = rejected = 0
+    a, m = 0, 1
+    while a < nt:
+        m = min(m, nt - a)
+        b = a + m
+        if m == 1:
+            X1, r1 = step(X, a, b)
+            X[:] = X1
+            counts[b] = counts[a] + r1 * (T[b] - T[a])
+            accepted += 1
+            a, m = b, 2
+            continue
+        c = a + m // 2
+        error = max(nonlinearity(a, c), nonlinearity(c, b))
+        if error <= tol:
+            X1, r1 = step(X, a, c)
+            X2, r2 = step(X1, c, b)
+            if max(r1, r2) > 0:
+                error = max(error, abs(r1 - r2) / max(r1, r2))
+        if error > tol:
+            rejected += 1
+            m //= 2
+            continue
+        X[:] = X2
+        counts[c] = counts[a] + r1 * (T[c] - T[a])
+        counts[b] = counts[c] + r2 * (T[b] - T[c])
+        accepted += 1
+        a = b
+        if error <= 0.25 * tol:
+            m *= 2
+    known = ~np.isnan(counts)
+    counts = np.interp(T, T[known], counts[known])
+    ratez[:] = np.diff(counts) / dt
+    Z -= cf[-1] - cf[0]
+    return accepted, rejected
+
+
+def _neqz(
+    ratez: npt.NDArray[np.float64], t: npt.NDArray[np.float64], config: Config
+) -> Union[npt.NDArray[np.float64], LazyCumulative]:
+    """
+    Cumulative number of events, integrated over the time axis ``t`` if
+    ``config.neqz_dt`` and computed on first access if ``config.neqz_lazy``
+    (see :func:`tdsr.utils.cumulative_events`)
+    """
+    taxis = t if config.neqz_dt else None
+    if config.neqz_lazy:
+        return LazyCumulative(ratez, taxis)
+    return cumulative_events(ratez, taxis)
+
+
+def _check_checkpoint(
+    state: Dict[str, Any],
+    model: str,
+    t: npt.NDArray[np.float64],
+    cf: npt.NDArray[np.float64],
+) -> None:
+    """Raise if ``state`` was not saved by a run of ``model`` with ``t`` and ``cf``"""
+    if (
+        str(state["model"]) != model
+        or not np.array_equal(state["t"], t)
+        or not np.array_equal(state["cf"], cf)
+    ):
+        raise InvalidParameter(
+            "checkpoint does not match the model %s, its time axis or loading"
+            % model
+        )
+
+
+def _check_checkpoint_options(config: Config) -> None:
+    """Raise if checkpoints are requested without a file to write them to"""
+    if config.checkpoint_every > 0 and not config.checkpoint_file:
+        raise MissingParameter("checkpoint_every > 0 requires checkpoint_file")
+
+
+def _check_pf_renorm(config: Config) -> None:
+    """Raise if the incremental trigger probability is never re-evaluated"""
+    if config.pf_renorm < 1:
+        raise InvalidParameter(
+            "pf_renorm must be at least 1, but got %s" % config.pf_renorm
+        )
+
+
 class LCM(object):
     """
     Class of the Linear Coulomb Failure Model (LCM) used as base
@@ -93,8 +558,18 @@ class LCM(object):
     Note that TDSR is outdated and was replaced by TDSR1.
     For simulations with the linear Coulomb Failure model use
     classes "CFM" or "Traditional".
+    If ``checkpoint_every > 0`` the model state (``chiz``, the stress
+    residual ``resid``, the time index and the rates so far) is written to
+    ``checkpoint_file`` every ``checkpoint_every`` time steps; an
+    interrupted run is continued with :meth:`resume`.
+    The cumulative number of events ``neqz`` is integrated with unit
+    sample spacing, or over the time axis if ``neqz_dt==True``; with
+    ``neqz_lazy==True`` it is computed only when accessed (see
+    :func:`tdsr.utils.cumulative_events`).
     """
 
+    _resume_state: Optional[Dict[str, Any]] = None
+
     def __init__(self, config: Optional[Config] = None) -> None:
         """
         Add description here
@@ -110,7 +585,7 @@ class LCM(object):
         self,
         chi0: Optional[float] = None,
         t0: Optional[float] = None,
-        chiz: Optional[float] = None,
+        chiz: Optional[npt.NDArray[np.float64]] = None,
         depthS: Optional[float] = None,
         Sshadow: Optional[float] = None,
         iX0: Optional[str] = None,
@@ -125,6 +600,10 @@ class LCM(object):
         deltaS: Optional[float] = None,
         sigma_max: Optional[int] = None,
         precision: Optional[int] = None,
+        checkpoint_file: Optional[str] = None,
+        checkpoint_every: Optional[int] = None,
+        neqz_dt: Optional[bool] = None,
+        neqz_lazy: Optional[bool] = None,
         loading: Optional[Loading] = None,
     ) -> Result:
         config = deepcopy(self.config)
@@ -146,10 +625,15 @@ class LCM(object):
                 deltaS=deltaS,
                 sigma_max=sigma_max,
                 precision=precision,
+                checkpoint_file=checkpoint_file,
+                checkpoint_every=checkpoint_every,
+                neqz_dt=neqz_dt,
+                neqz_lazy=neqz_lazy,
             )
         )
         if loading is not None:
             config.loading = loading
+        _check_checkpoint_options(config)
         # if config.equilibrium:
         if chiz is not None:
             self._prepare(config)
@@ -161,6 +645,18 @@ class LCM(object):
             self._prepare(config)
         return self._compute(config)
 
+    def resume(self, filename: PathLike, **kwargs: Any) -> Result:
+        """
+        Continue the run saved in the checkpoint ``filename``. The keyword
+        arguments (see :meth:`__call__`) must define the same model and
+        loading as the interrupted run.
+        """
+        self._resume_state = load_checkpoint(filename)
+        try:
+            return self(**kwargs)
+        finally:
+            self._resume_state = None
+
     def _prepare(self, config: Config) -> None:
         (self.smin, self.smax, self.nsigma, self.sigma, self.dZ) = gridrange(
             -config.sigma_max, +config.sigma_max, config.deltaS
@@ -198,29 +694,50 @@ class LCM(object):
         ratez = np.zeros(self.nt)
         ratez[0] = 0.0
         resid = 0.0
-        for i in range(1, self.nt):
+        start = 1
+        model = type(self).__name__
+        if self._resume_state is not None:
+            state = self._resume_state
+            _check_checkpoint(state, model, self.t, self.cf)
+            self.chiz = state["chiz"].copy()
+            resid = float(state["resid"])
+            ratez[:] = state["ratez"]
+            start = int(state["index"])
+        # chiz is shifted as ring buffer, the cut-off factor is precomputed
+        chiz = RingBuffer(self.chiz)
+        qz = 1.0 - self.pz
+        for i in range(start, self.nt):
             # optional to be changed: config.deltaS may be replaced by self.dZ[i] if sigma axis not discretized with equal sampling (see gridrange output)
             deltacf = self.cf[i] - (self.cf[i - 1] - resid)
             nshift = np.around(deltacf / config.deltaS, 0).astype(int)
             resid = deltacf - nshift * config.deltaS
             # shift chiz (memory effect)
-            self.chiz = shifted(self.chiz, nshift)
+            chiz.shift(nshift)
 
             # ratez[i] = np.trapz(self.chiz * self.pz) * config.deltaS
-            ratez[i] = (
-                np.trapz(config.chi0 * self.chiz * self.pz * config.deltaS) / self.dt[i]
-            )
+            trapz = chiz.dot(self.pz)
+            trapz -= 0.5 * (chiz.first * self.pz[0] + chiz.last * self.pz[-1])
+            ratez[i] = config.chi0 * config.deltaS * trapz / self.dt[i]
             # cut off chiz
-            self.chiz = self.chiz * (1.0 - self.pz)
+            chiz.multiply(qz)
+            if config.checkpoint_every > 0 and i % config.checkpoint_every == 0:
+                save_checkpoint(
+                    dict(
+                        model=model,
+                        index=i + 1,
+                        chiz=chiz.values(),
+                        resid=resid,
+                        ratez=ratez,
+                        t=self.t,
+                        cf=self.cf,
+                    ),
+                    config.checkpoint_file,
+                )
+        self.chiz = chiz.values()
 
         # ratez = ratez * config.chi0 / config.deltat
         # ratez = ratez
-        neqz = np.zeros(self.nt - 1)
-        # neqz[0] = 0.0
-        # replace loop by numpy.cumsum to directly calculate  the cumulative sum
-        for i in range(1, self.nt - 2):
-            neqz[i] = np.trapz(ratez[0 : i + 1])  # type: ignore
-            # neqz[i] = np.trapz(ratez[0 : i + 1] , self.t[0:i+1])  # 24 july 2022: beruecksichtigt, dass zeitreihe nicht gelichabstaendig sein kann
+        neqz = _neqz(ratez, self.t, config)
         return self.t, self.chiz, self.cf, ratez, neqz
 
 
@@ -263,8 +780,58 @@ class TDSR1(object):
     ``Sshadow`` on the stress axis to simulate a subcritical stress state.
     If ``taxis_log==False`` an equally space time sampling is assumed
     with interval ``deltat``.
+
+    The stress axis is sampled with ``NZ`` points. If ``NZ_auto==True``
+    the smallest grid (by doubling) meeting the relative rate tolerance
+    ``NZ_tol`` is chosen, and reported with its error estimate in
+    ``self.NZ`` and ``self.NZ_error``. With ``Zgrid=="stretched"`` the
+    nodes are concentrated (by the factor ``Zstretch``) where sources pass
+    the failure front and around the edges of the initial distribution
+    (see :func:`tdsr.utils.Zvalues_stretched`). If ``pf_incremental==True``
+    the trigger probability is updated incrementally between time steps
+    and re-evaluated exactly every ``pf_renorm`` (at least 1) steps, only
+    1.06x to 1.8x faster in the benchmark (see :func:`_march`).
+    The source depletion is integrated with forward Euler steps
+    (``integrator=="euler"``) or exactly per step
+    (``integrator=="exponential"``), optionally with pf averaged over the
+    stress change within a step (``pf_average==True``). For a single 1-D
+    loading ``integrator=="segments"`` propagates the sources in closed
+    form over the linear segments of the loading (see
+    :meth:`tdsr.loading.Loading.segments` and :func:`_march_segments`),
+    so the sampling interval only defines the output times.
+    With ``adaptive==True`` a single 1-D loading is marched with steps of
+    multiple sampling intervals, refined where the stress or the rate
+    change within a step exceeds ``adaptive_tol`` (see
+    :func:`_march_adaptive`); the numbers of accepted and rejected steps
+    are stored in ``self.steps_accepted`` and ``self.steps_rejected``.
+    If ``checkpoint_every > 0`` the state of a 1-D run (``Z``, ``X``, the
+    time index and the rates so far) is written to ``checkpoint_file``
+    every ``checkpoint_every`` time steps; an interrupted run is continued
+    with :meth:`resume` and gives the same result as an uninterrupted run.
+    ``neqz_dt`` and ``neqz_lazy`` control the cumulative number of events
+    as for :class:`LCM`.
+    For a 1-D loading, the derivatives of ``ratez`` with respect to the
+    parameters listed in ``sensitivities`` (any of
+    ``SENSITIVITY_PARAMETERS``) are propagated alongside ``X`` in the same
+    run (see :func:`_march_tangent`) and stored in ``self.dratez``; the
+    ``depthS`` derivative holds the stress axis fixed.
+    If ``band==True`` only the active window of the stress axis, where
+    sources are not exhausted and ``pf*dt > band_tol``, is updated, e.g.
+    1.7x faster than the full march at an active fraction of 14%. The
+    average active fraction is reported in ``self.active_fraction``.
+    Ensembles of parameter settings are simulated in one batched run with
+    :meth:`TDSR1.ensemble`. Loadings returning a 2-D stress matrix
+    (cells x nt), e.g. :class:`tdsr.loading.MatrixLoading`, are simulated
+    for all cells together and return stacked rates.
     """
 
+    #: number of ensemble members or cells marched together
+    chunksize: int = 64
+    #: initial number of stress nodes if ``NZ_auto==True``
+    NZ_start: int = 250
+
+    _resume_state: Optional[Dict[str, Any]] = None
+
     def __init__(self, config: Optional[Config] = None) -> None:
         """
         Add description here
@@ -280,7 +847,7 @@ class TDSR1(object):
         self,
         chi0: Optional[float] = None,
         t0: Optional[float] = None,
-        chiz: Optional[float] = None,
+        chiz: Optional[npt.NDArray[np.float64]] = None,
         depthS: Optional[float] = None,
         Sshadow: Optional[float] = None,
         iX0: Optional[str] = None,
@@ -295,6 +862,25 @@ class TDSR1(object):
         deltaS: Optional[float] = None,
         sigma_max: Optional[int] = None,
         precision: Optional[int] = None,
+        NZ: Optional[int] = None,
+        NZ_auto: Optional[bool] = None,
+        NZ_tol: Optional[float] = None,
+        NZ_max: Optional[int] = None,
+        Zgrid: Optional[str] = None,
+        Zstretch: Optional[float] = None,
+        pf_incremental: Optional[bool] = None,
+        pf_renorm: Optional[int] = None,
+        band: Optional[bool] = None,
+        band_tol: Optional[float] = None,
+        integrator: Optional[str] = None,
+        pf_average: Optional[bool] = None,
+        adaptive: Optional[bool] = None,
+        adaptive_tol: Optional[float] = None,
+        sensitivities: Optional[Sequence[str]] = None,
+        checkpoint_file: Optional[str] = None,
+        checkpoint_every: Optional[int] = None,
+        neqz_dt: Optional[bool] = None,
+        neqz_lazy: Optional[bool] = None,
         loading: Optional[Loading] = None,
     ) -> Result:
         config = deepcopy(self.config)
@@ -316,10 +902,31 @@ class TDSR1(object):
                 deltaS=deltaS,
                 sigma_max=sigma_max,
                 precision=precision,
+                NZ=NZ,
+                NZ_auto=NZ_auto,
+                NZ_tol=NZ_tol,
+                NZ_max=NZ_max,
+                Zgrid=Zgrid,
+                Zstretch=Zstretch,
+                pf_incremental=pf_incremental,
+                pf_renorm=pf_renorm,
+                band=band,
+                band_tol=band_tol,
+                integrator=integrator,
+                pf_average=pf_average,
+                adaptive=adaptive,
+                adaptive_tol=adaptive_tol,
+                sensitivities=sensitivities,
+                checkpoint_file=checkpoint_file,
+                checkpoint_every=checkpoint_every,
+                neqz_dt=neqz_dt,
+                neqz_lazy=neqz_lazy,
             )
         )
         if loading is not None:
             config.loading = loading
+        _check_checkpoint_options(config)
+        _check_pf_renorm(config)
         # if config.equilibrium:
         if chiz is not None:
             self._prepare(config)
@@ -331,6 +938,18 @@ class TDSR1(object):
             self._prepare(config)
         return self._compute(config)
 
+    def resume(self, filename: PathLike, **kwargs: Any) -> Result:
+        """
+        Continue the run saved in the checkpoint ``filename``. The keyword
+        arguments (see :meth:`__call__`) must define the same model and
+        loading as the interrupted run.
+        """
+        self._resume_state = load_checkpoint(filename)
+        try:
+            return self(**kwargs)
+        finally:
+            self._resume_state = None
+
     def _prepare(self, config: Config) -> None:
         (self.smin, self.smax, self.nsigma, self.sigma, self.dZ) = gridrange(
             -config.sigma_max, +config.sigma_max, config.deltaS
@@ -351,9 +970,12 @@ class TDSR1(object):
             raise MissingParameter("missing loading function")
         self.cf = loading.values(length=self.nt)
 
-    def _compute(self, config: Config) -> Result:
-        ratez = np.zeros(self.nt)
-        # ratez[0] = 0.0
+    def _initial(
+        self, config: Config, cf: npt.NDArray[np.float64]
+    ) -> Tuple[
+        npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]
+    ]:
+        """stress axis ``Z``, integration weights ``dZ`` and initial ``X``"""
         dsig = -config.depthS
         t0 = config.t0
         X0 = config.chi0
@@ -370,13 +992,43 @@ class TDSR1(object):
         # dt = np.ediff1d(self.t, to_end=self.t[-1]-self.t[-2])  # wird bereits in  gridrange berechnet
         # Z = functions.Zvalues(self.cf, 0, t0, dsig) # t0 kann  raus, da nicht benutzt
         # Z = Zvalues(self.cf, 0.0, 0.0, dsig)
-        Z = Zvalues(self.cf, Zmin, 0.0, dsig)
+        if config.Zgrid.lower() == "uniform":
+            Z = Zvalues(cf, Zmin, 0.0, dsig, NZ=config.NZ)
+        elif config.Zgrid.lower() == "stretched":
+            if config.iX0.lower() == "uniform":
+                Zedges = [config.Sshadow]
+            elif config.iX0.lower() == "gaussian":
+                Zedges = [config.Zmean - Zmin + k * config.Zstd for k in (-2, 0, 2)]
+            else:
+                Zedges = []
+            Z = Zvalues_stretched(
+                cf,
+                Zmin,
+                0.0,
+                dsig,
+                NZ=config.NZ,
+                Zedges=Zedges,
+                stretch=config.Zstretch,
+            )
+        else:
+            raise InvalidParameter(
+                'Zgrid must be one of "uniform", "stretched", '
+                "but got %s" % config.Zgrid.lower()
+            )
         # Z = 0.04*Z  # falls es mit dem zu grossen Range und der groben Diskretisierung der zeta Achse zu Problemen kommt
         dZ = np.ediff1d(Z, to_end=Z[-1] - Z[-2])
+        if config.Zgrid.lower() == "stretched":
+            # trapezoidal cell widths keep the integral second order
+            # accurate on the non-uniform axis
+            dZ = 0.5 * (np.ediff1d(Z, to_begin=0.0) + np.ediff1d(Z, to_end=0.0))
+            if config.iX0.lower() == "uniform":
+                # the step at Sshadow is on a node, integrate from there
+                j = int(np.searchsorted(Z, config.Sshadow))
+                if 0 < j < len(Z) - 1 and Z[j] == config.Sshadow:
+                    dZ[j] = 0.5 * (Z[j + 1] - Z[j])
         # print('smin=',np.amin(self.cf),' smax=',np.amax(self.cf),' ns=',len(self.cf))
         # print('zmin=',np.amin(Z),' zmax=',np.amax(Z),' nz=',len(Z))
         # print('zvalues ',Z)
-        dS = np.ediff1d(self.cf, to_end=self.cf[-1] - self.cf[-2])
 
         if config.iX0.lower() == "equilibrium":
             # steady state equilibrium before loading starts
@@ -400,154 +1052,858 @@ class TDSR1(object):
 
         else:
             raise InvalidParameter(
-                'iX0 must be of of "equilibrium", "uniform", "gaussian", ',
-                "but got ",
-                config.iX0.lower(),
+                'iX0 must be of of "equilibrium", "uniform", "gaussian", '
+                "but got %s" % config.iX0.lower()
+            )
+        return Z, dZ, X
+
+    def _initial_tangent(
+        self,
+        config: Config,
+        Z: npt.NDArray[np.float64],
+        dZ: npt.NDArray[np.float64],
+        X: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        """
+        Derivatives of the initial ``X`` (see :meth:`_initial`) with
+        respect to ``config.sensitivities`` (nparams x NZ). The step of the
+        uniform distribution at ``Sshadow`` is differentiated as a delta
+        function, distributed linearly over the two neighbouring nodes.
+        """
+        dX = np.zeros((len(config.sensitivities), len(Z)))
+        dsig = -config.depthS
+        Zmin = config.loading.sstep if config.taxis_log else 0.0
+        iX0 = config.iX0.lower()
+        for k, name in enumerate(config.sensitivities):
+            if name == "chi0":
+                dX[k] = X / config.chi0
+            elif iX0 == "equilibrium" and name in ("t0", "depthS"):
+                E = np.exp(-(Z + Zmin) / dsig) * dsig
+                E /= config.t0 * config.loading.strend
+                if name == "t0":
+                    dX[k] = X * E / config.t0
+                else:
+                    # d/d depthS = -d/d dsig
+                    dX[k] = X * E * ((Z + Zmin) / dsig + 1.0) / dsig
+            elif iX0 == "uniform" and name == "Sshadow":
+                j = int(np.clip(np.searchsorted(Z, config.Sshadow) - 1, 0, len(Z) - 2))
+                w = (config.Sshadow - Z[j]) / (Z[j + 1] - Z[j])
+                if 0.0 <= w <= 1.0:
+                    dX[k, j] = -config.chi0 * (1.0 - w) / dZ[j]
+                    dX[k, j + 1] = -config.chi0 * w / dZ[j + 1]
+            elif iX0 == "gaussian" and name in ("Zmean", "Zstd"):
+                y = (Z + Zmin - config.Zmean) / config.Zstd
+                if name == "Zmean":
+                    dX[k] = X * y / config.Zstd
+                else:
+                    dX[k] = X * (y**2 - 1.0) / config.Zstd
+        return dX
+
+    def _compute_tangent(
+        self,
+        config: Config,
+        Z: npt.NDArray[np.float64],
+        dZ: npt.NDArray[np.float64],
+        X: npt.NDArray[np.float64],
+        dS: npt.NDArray[np.float64],
+        ratez: npt.NDArray[np.float64],
+    ) -> None:
+        """
+        March with the sensitivities of the rates to the parameters
+        ``config.sensitivities`` (see :func:`_march_tangent`), stored in
+        ``self.dratez`` (name -> derivative of ``ratez``). The derivative
+        with respect to ``depthS`` holds the stress axis ``Z`` fixed,
+        although :func:`tdsr.utils.Zvalues` sizes it from ``depthS``.
+        """
+        names = tuple(config.sensitivities)
+        unknown = [name for name in names if name not in SENSITIVITY_PARAMETERS]
+        if unknown:
+            raise InvalidParameter(
+                "sensitivities must be in %s, but got %s"
+                % (SENSITIVITY_PARAMETERS, unknown)
+            )
+        if (
+            config.band
+            or config.pf_incremental
+            or config.integrator.lower() == "segments"
+        ):
+            raise InvalidParameter(
+                "sensitivities are not supported with band, pf_incremental "
+                "or the segments integrator"
+            )
+        dX = self._initial_tangent(config, Z, dZ, X)
+        dratez = np.zeros((len(names), self.nt))
+        _march_tangent(
+            X,
+            dX,
+            Z,
+            dZ,
+            dS,
+            self.dt,
+            config.t0,
+            -config.depthS,
+            np.array([1.0 / config.t0 if n == "t0" else 0.0 for n in names]),
+            np.array([-1.0 if n == "depthS" else 0.0 for n in names]),
+            ratez,
+            dratez,
+            integrator=config.integrator,
+            pf_average=config.pf_average,
+        )
+        self.dratez = dict(zip(names, dratez))
+
+    def _compute_auto(self, config: Config) -> Result:
+        """
+        Run with increasing ``NZ`` (doubling, starting at ``NZ_start``)
+        until the maximum rate difference to the run with ``NZ/2``,
+        relative to the maximum rate, is below ``config.NZ_tol``. For the
+        first order accurate integration over the stress axis this
+        difference estimates the discretisation error of the finer run.
+        The chosen grid size and error estimate are stored in ``self.NZ``
+        and ``self.NZ_error``; a warning is issued if ``config.NZ_max`` is
+        reached before the tolerance. ``config.NZ_max`` must allow at least
+        one refinement, i.e. be at least ``2 * NZ_start``.
+        """
+        if config.NZ_max < 2 * self.NZ_start:
+            raise InvalidParameter(
+                "NZ_max must be at least %d for NZ_auto, but got %d"
+                % (2 * self.NZ_start, config.NZ_max)
+            )
+        config = copy(config)
+        config.NZ_auto = False
+        config.NZ = self.NZ_start
+        result = self._compute(config)
+        error = np.inf
+        while config.NZ < config.NZ_max:
+            config.NZ = min(2 * config.NZ, config.NZ_max)
+            previous = result
+            result = self._compute(config)
+            ratez, ratez_previous = result[3], previous[3]
+            scale = np.max(np.abs(ratez))
+            error = 0.0
+            if scale > 0:
+                error = np.max(np.abs(ratez - ratez_previous)) / scale
+            if error <= config.NZ_tol:
+                break
+        self.NZ = config.NZ
+        self.NZ_error = error
+        if error > config.NZ_tol:
+            warnings.warn(
+                "NZ_auto reached NZ_max=%d with a relative rate error estimate "
+                "of %.3g above NZ_tol=%g" % (config.NZ_max, error, config.NZ_tol)
             )
+        return result
 
+    def _compute(self, config: Config) -> Result:
+        if config.NZ_auto:
+            return self._compute_auto(config)
+        if self.cf.ndim == 2:
+            return self._compute_cells(config)
+        ratez = np.zeros(self.nt)
+        # ratez[0] = 0.0
+        Z, dZ, X = self._initial(config, self.cf)
         self.chiz = X
-        # print('xmin=',np.amin(X),' xmax=',np.amax(X),' nx=',len(X))
-        # print('i=0 1/pf=',1./pf(Z, config.t0, -config.depthS)[0:3],' ... ',1./pf(Z, config.t0, -config.depthS)[-3:-1])
-        # for i in range(self.nt):
-        # for i in range(1, self.nt):
-        for i in range(self.nt):
-            # dX = self.chiz/ tf(Z, t0, config.deltaS) * self.dt[i]
-            # dX = X / tf(Z, t0, -config.depthS) * self.dt[i]
-            # dX = X / tf(Z, config.t0, -config.depthS) * self.dt[i]
-            dX = X * pf(Z, config.t0, -config.depthS) * self.dt[i]
-            dX[(dX > X)] = X[
-                (dX > X)
-            ]  # wenn diese Zeile entfaellt, dann muss nicht mit dt multipliziert werden
-            ratez[i] = (
-                np.sum(dX * dZ) / self.dt[i]
-            )  # oben wird dX mit dt multipliziert, hier dividiert.
-            # ratez[i] = np.trapz(dX * dZ) / self.dt[i]  # oben wird dX mit dt multipliziert, hier dividiert.
-            # print('len(Z)=',len(Z),' len(dS)=',len(dS),' nt=',self.nt)
-            Z -= dS[i]
-            X -= dX
+        # Z is shifted before each step, i.e. dS[i] = cf[i] - cf[i-1]
+        dS = np.ediff1d(self.cf, to_begin=0.0)
+        if config.sensitivities:
+            if (
+                config.adaptive
+                or config.checkpoint_every > 0
+                or self._resume_state is not None
+            ):
+                raise InvalidParameter(
+                    "sensitivities are not supported with adaptive or checkpoints"
+                )
+            self._compute_tangent(config, Z, dZ, X, dS, ratez)
+            self.active_fraction = 1.0
+        elif config.checkpoint_every > 0 or self._resume_state is not None:
+            self.active_fraction = self._march_checkpointed(
+                config, Z, dZ, X, dS, ratez
+            )
+        elif config.adaptive:
+            self.steps_accepted, self.steps_rejected = _march_adaptive(
+                X,
+                Z,
+                dZ,
+                self.cf,
+                self.t,
+                self.dt,
+                config.t0,
+                -config.depthS,
+                ratez,
+                tol=config.adaptive_tol,
+            )
+            self.active_fraction = 1.0
+        elif config.integrator.lower() == "segments":
+            assert config.loading is not None  # checked in _prepare
+            self.active_fraction = _march_segments(
+                X,
+                Z,
+                dZ,
+                self.cf,
+                self.t,
+                self.dt,
+                config.loading.segments(self.nt),
+                config.t0,
+                -config.depthS,
+                ratez,
+                chunksize=self.chunksize,
+            )
+        else:
+            self.active_fraction = _march(
+                X,
+                Z,
+                dZ,
+                dS,
+                self.dt,
+                config.t0,
+                -config.depthS,
+                ratez,
+                incremental=config.pf_incremental,
+                renorm=config.pf_renorm,
+                band=config.band,
+                band_tol=config.band_tol,
+                integrator=config.integrator,
+                pf_average=config.pf_average,
+            )
 
         # print('i=nt-1 1/pf=',1./pf(Z, config.t0, -config.depthS)[0:3],' ... ',1./pf(Z, config.t0, -config.depthS)[-3:-1])
         # print('rmin=',np.amin(ratez),' rmax=',np.amax(ratez),' nx=',len(ratez))
-        neqz = np.zeros(self.nt - 1)
-        for i in range(1, self.nt - 2):
-            neqz[i] = np.trapz(ratez[0 : i + 1])  # type: ignore
+        neqz = _neqz(ratez, self.t, config)
+        return self.t, self.chiz, self.cf, ratez, neqz
+
+    def _march_checkpointed(
+        self,
+        config: Config,
+        Z: npt.NDArray[np.float64],
+        dZ: npt.NDArray[np.float64],
+        X: npt.NDArray[np.float64],
+        dS: npt.NDArray[np.float64],
+        ratez: npt.NDArray[np.float64],
+    ) -> float:
+        """
+        :func:`_march` in blocks of ``config.checkpoint_every`` steps,
+        saving the state after each block. A state loaded by :meth:`resume`
+        is restored first. Blocks continue the incremental trigger
+        probability and see the stress change of the following step, so
+        the result is the same as of a single march.
+        """
+        if config.band or config.adaptive or config.integrator.lower() == "segments":
+            raise InvalidParameter(
+                "checkpoints are not supported with band, adaptive "
+                "or the segments integrator"
+            )
+        model = type(self).__name__
+        pstate = np.zeros_like(Z)
+        start = 0
+        if self._resume_state is not None:
+            state = self._resume_state
+            _check_checkpoint(state, model, self.t, self.cf)
+            if state["Z"].shape != Z.shape:
+                raise InvalidParameter("checkpoint has a different stress axis")
+            Z[:], X[:], ratez[:] = state["Z"], state["X"], state["ratez"]
+            pstate[:] = state["pstate"]
+            start = int(state["index"])
+        every = config.checkpoint_every if config.checkpoint_every > 0 else self.nt
+        for a in range(start, self.nt, every):
+            b = min(a + every, self.nt)
+            _march(
+                X,
+                Z,
+                dZ,
+                dS[a : b + 1],
+                self.dt[a:b],
+                config.t0,
+                -config.depthS,
+                ratez[a:b],
+                incremental=config.pf_incremental,
+                renorm=config.pf_renorm,
+                integrator=config.integrator,
+                pf_average=config.pf_average,
+                pstate=pstate,
+                offset=a,
+            )
+            if config.checkpoint_every > 0:
+                save_checkpoint(
+                    dict(
+                        model=model,
+                        index=b,
+                        Z=Z,
+                        X=X,
+                        pstate=pstate,
+                        ratez=ratez,
+                        t=self.t,
+                        cf=self.cf,
+                    ),
+                    config.checkpoint_file,
+                )
+        return 1.0
+
+    def _compute_cells(self, config: Config) -> Result:
+        """
+        Multi-cell simulation for a 2-D stress matrix (cells x nt) sharing
+        one time axis. Cells are marched together, ``self.chunksize`` at a
+        time. If the loading defines ``weights``, the weighted average rate
+        over all cells is stored in ``self.ratez_aggregate``.
+        """
+        if config.adaptive or config.checkpoint_every > 0 or config.sensitivities:
+            raise InvalidParameter(
+                "adaptive, checkpoints and sensitivities are not supported "
+                "for 2-D loadings"
+            )
+        ncells = self.cf.shape[0]
+        ratez = np.zeros((ncells, self.nt))
+        chiz = np.zeros((ncells, config.NZ))
+        dS = np.diff(self.cf, axis=-1, prepend=self.cf[:, :1])
+        active = np.zeros(ncells)
+        for start in range(0, ncells, self.chunksize):
+            stop = min(start + self.chunksize, ncells)
+            Z = np.zeros((stop - start, config.NZ))
+            dZ = np.zeros_like(Z)
+            X = np.zeros_like(Z)
+            for k in range(start, stop):
+                Z[k - start], dZ[k - start], X[k - start] = self._initial(
+                    config, self.cf[k]
+                )
+            active[start:stop] = _march(
+                X,
+                Z,
+                dZ,
+                dS[start:stop],
+                self.dt,
+                config.t0,
+                -config.depthS,
+                ratez[start:stop],
+                incremental=config.pf_incremental,
+                renorm=config.pf_renorm,
+                band=config.band,
+                band_tol=config.band_tol,
+                integrator=config.integrator,
+                pf_average=config.pf_average,
+            )
+            chiz[start:stop] = X
+
+        self.active_fraction = float(np.mean(active))
+        weights = getattr(config.loading, "weights", None)
+        if weights is not None:
+            self.ratez_aggregate = np.average(ratez, axis=0, weights=weights)
+        neqz = _neqz(ratez, self.t, config)
+        self.chiz = chiz
+        return self.t, self.chiz, self.cf, ratez, neqz
+
+    def ensemble(
+        self,
+        chi0: Optional[ArrayLike] = None,
+        t0: Optional[ArrayLike] = None,
+        depthS: Optional[ArrayLike] = None,
+        Sshadow: Optional[ArrayLike] = None,
+        iX0: Optional[Union[str, Sequence[str]]] = None,
+        Zmean: Optional[ArrayLike] = None,
+        Zstd: Optional[ArrayLike] = None,
+        chunksize: Optional[int] = None,
+        loading: Optional[Loading] = None,
+        **kwargs: Any,
+    ) -> Result:
+        """
+        Batched TDSR1 simulation for an ensemble of parameter settings
+        sharing one loading and time axis.
+
+        ``chi0``, ``t0``, ``depthS``, ``Sshadow``, ``iX0``, ``Zmean`` and
+        ``Zstd`` can be given as scalars or as sequences of equal length
+        (one value per ensemble member). All other keyword arguments are
+        the same as for :meth:`__call__`. The loading and the time axis are
+        prepared once and the members are marched together as a
+        2-D (member x Z) state, ``chunksize`` members at a time to bound
+        memory. For a 2-D loading (cells x nt) every member is marched for
+        every cell, as in :meth:`_compute_cells`.
+
+        Returns ``t``, ``chiz``, ``cf``, ``ratez`` and ``neqz`` where
+        ``chiz``, ``ratez`` and ``neqz`` are stacked along the first axis
+        (members, or members x cells for a 2-D loading).
+        """
+        config = deepcopy(self.config)
+        config.merge(kwargs, strict=True)
+        if loading is not None:
+            config.loading = loading
+        ne, members = _ensemble_members(
+            dict(
+                chi0=chi0,
+                t0=t0,
+                depthS=depthS,
+                Sshadow=Sshadow,
+                iX0=iX0,
+                Zmean=Zmean,
+                Zstd=Zstd,
+            )
+        )
+        if config.NZ_auto:
+            raise InvalidParameter("NZ_auto is not supported for ensembles")
+        if config.adaptive:
+            raise InvalidParameter("adaptive is not supported for ensembles")
+        if config.sensitivities:
+            raise InvalidParameter("sensitivities are not supported for ensembles")
+        _check_pf_renorm(config)
+        chunksize = chunksize or self.chunksize
+        self._prepare(config)
+
+        # one row per member and cell, the cells of a member are adjacent
+        cells = self.cf.reshape(-1, self.nt)
+        ncells = cells.shape[0]
+        nrows = ne * ncells
+        ratez = np.zeros((nrows, self.nt))
+        chiz = np.zeros((nrows, config.NZ))
+        dS = np.diff(cells, axis=-1, prepend=cells[:, :1])
+        active = np.zeros(nrows)
+        for start in range(0, nrows, chunksize):
+            stop = min(start + chunksize, nrows)
+            Z = np.zeros((stop - start, config.NZ))
+            dZ = np.zeros_like(Z)
+            X = np.zeros_like(Z)
+            t0s = np.zeros((stop - start, 1))
+            dsig = np.zeros((stop - start, 1))
+            for k in range(start, stop):
+                m, c = divmod(k, ncells)
+                member = copy(config)
+                for key, values in members.items():
+                    setattr(member, key, values[m % len(values)])
+                Z[k - start], dZ[k - start], X[k - start] = self._initial(
+                    member, cells[c]
+                )
+                t0s[k - start] = member.t0
+                dsig[k - start] = -member.depthS
+            active[start:stop] = _march(
+                X,
+                Z,
+                dZ,
+                dS[np.arange(start, stop) % ncells],
+                self.dt,
+                t0s,
+                dsig,
+                ratez[start:stop],
+                incremental=config.pf_incremental,
+                renorm=config.pf_renorm,
+                band=config.band,
+                band_tol=config.band_tol,
+                integrator=config.integrator,
+                pf_average=config.pf_average,
+            )
+            chiz[start:stop] = X
+
+        self.active_fraction = float(np.mean(active))
+        shape = (ne,) + self.cf.shape[:-1]
+        ratez = ratez.reshape(shape + (self.nt,))
+        neqz = _neqz(ratez, self.t, config)
+        self.chiz = chiz.reshape(shape + (config.NZ,))
         return self.t, self.chiz, self.cf, ratez, neqz
 
 
+class TDSR1Stream(object):
+    """
+    Stateful TDSR1 simulator for stress samples arriving one at a time or
+    in chunks, e.g. for operational forecasting. The simulator holds the
+    stress axis ``Z``, the source distribution ``X`` and the cumulative
+    number of events ``neq``, so the cost of :meth:`advance` is
+    proportional to the number of new samples.
+
+    The stress axis is sized as in a batch run of :class:`TDSR1` with the
+    loading of ``config``, or from the stress samples ``Srange`` covering
+    the expected range of the loading. The rate of the interval between
+    two samples is returned when the later sample arrives. Fed with the
+    same series and stress axis, the rates agree bit for bit with
+    ``ratez[:-1]`` of the batch run (the batch run extrapolates the last
+    interval). Band updates, ``NZ_auto``, adaptive stepping and the
+    segment integrator are not available for streaming.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        Srange: Optional[ArrayLike] = None,
+        S0: float = 0.0,
+        loading: Optional[Loading] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Parameters
+        ---------
+        config
+            Optional config to use, updated by the keyword arguments
+            (the options of :meth:`TDSR1.__call__`)
+        Srange
+            Optional stress samples to size the stress axis
+        S0
+            Stress at ``config.tstart``
+        loading
+            Optional loading to size the stress axis if ``Srange`` is None
+        """
+        config = deepcopy(config or Config())
+        config.merge(kwargs, strict=True)
+        if loading is not None:
+            config.loading = loading
+        if config.band or config.NZ_auto or config.adaptive or config.sensitivities:
+            raise InvalidParameter(
+                "band, NZ_auto, adaptive and sensitivities are not supported "
+                "for streaming"
+            )
+        _check_integrator(config.integrator)
+        _check_pf_renorm(config)
+        self.config = config
+        model = TDSR1(config=config)
+        if Srange is None:
+            model._prepare(config)
+            Srange = model.cf
+        self.Z, self.dZ, self.X = model._initial(
+            config, np.asarray(Srange, dtype=float)
+        )
+        self.t = config.tstart
+        self.S = float(S0)
+        self.neq = 0.0
+        self.nstep = 0
+        self._dS = 0.0
+        self._pstate = np.empty_like(self.Z)
+
+    @property
+    def chiz(self) -> npt.NDArray[np.float64]:
+        """the current source distribution on the stress axis"""
+        return self.X
+
+    def advance(self, S: ArrayLike, t: ArrayLike) -> npt.NDArray[np.float64]:
+        """
+        Add the stress samples ``S`` at times ``t`` (increasing, after the
+        last sample) and return the earthquake rates of the intervals
+        ending at ``t``.
+        """
+        Snew = np.atleast_1d(np.asarray(S, dtype=float))
+        tnew = np.atleast_1d(np.asarray(t, dtype=float))
+        if Snew.shape != tnew.shape or Snew.ndim != 1:
+            raise InvalidParameter("S and t must be scalars or 1-D of equal length")
+        Sall = np.concatenate(([self.S], Snew))
+        tall = np.concatenate(([self.t], tnew))
+        dt = np.diff(tall)
+        if np.any(dt <= 0):
+            raise InvalidParameter("sample times must be increasing")
+        # stress change before each step and the change over the last one
+        dS = np.concatenate(([self._dS], np.diff(Sall)))
+        ratez = np.zeros(len(tnew))
+        config = self.config
+        _march(
+            self.X,
+            self.Z,
+            self.dZ,
+            dS,
+            dt,
+            config.t0,
+            -config.depthS,
+            ratez,
+            incremental=config.pf_incremental,
+            renorm=config.pf_renorm,
+            integrator=config.integrator,
+            pf_average=config.pf_average,
+            pstate=self._pstate,
+            offset=self.nstep,
+        )
+        self.neq += float(np.sum(ratez * dt))
+        self.S, self.t, self._dS = Sall[-1], tall[-1], dS[-1]
+        self.nstep += len(tnew)
+        return ratez
+
+    def step(self, S: float, t: float) -> float:
+        """
+        Add a single stress sample ``S`` at time ``t`` and return the
+        earthquake rate of the interval ending at ``t``.
+        """
+        return float(self.advance(S, t)[0])
+
+
+def _ensemble_members(
+    members: Dict[str, Any]
+) -> Tuple[int, Dict[str, npt.NDArray[Any]]]:
+    """
+    Ensemble size and member parameters from scalars or sequences of
+    equal length (one value per member), ignoring ``None``
+    """
+    members = {k: np.atleast_1d(v) for k, v in members.items() if v is not None}
+    sizes = {len(v) for v in members.values() if len(v) > 1}
+    if len(sizes) > 1:
+        raise InvalidParameter(
+            "ensemble parameters must have equal length, got %s"
+            % {k: len(v) for k, v in members.items()}
+        )
+    return (sizes.pop() if sizes else 1), members
+
+
+def _cfm(
+    cf: npt.NDArray[np.float64],
+    Sshadow: ArrayLike,
+    chi0: ArrayLike,
+    deltat: float,
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Coulomb failure model for stress histories ``cf`` (..., nt) without
+    a loop over time. A sample ``i`` (``0 < i < nt-1``) triggers events
+    if the stress rises and reaches the running maximum ``S0`` of all
+    previous triggering samples (starting at ``Sshadow``). As ``S0`` is
+    the maximum of ``Sshadow`` and all rising samples so far, it follows
+    from ``np.maximum.accumulate``. ``Sshadow`` and ``chi0`` broadcast
+    against ``cf.shape[:-1]``. Returns the running maximum ``cf_shad``
+    and the rates, both of the broadcast shape.
+    """
+    cf = np.asarray(cf, dtype=float)
+    Sshadow = np.asarray(Sshadow, dtype=float)[..., None]
+    chi0 = np.asarray(chi0, dtype=float)[..., None]
+    shape = np.broadcast_shapes(cf.shape, Sshadow.shape, chi0.shape)
+    nt = cf.shape[-1]
+    inner = cf[..., 1 : nt - 1]
+    rising = inner >= cf[..., : nt - 2]
+    S0 = np.maximum(
+        Sshadow,
+        np.maximum.accumulate(np.where(rising, inner, -np.inf), axis=-1),
+    )
+    S0_start = np.broadcast_to(Sshadow, S0.shape[:-1] + (1,))
+    S0_before = np.concatenate((S0_start, S0), axis=-1)[..., :-1]
+    triggered = rising & (inner >= S0_before)
+    ratez = np.zeros(shape)
+    ratez[..., 1 : nt - 1] = np.where(triggered, inner - cf[..., : nt - 2], 0.0)
+    ratez = ratez * chi0 / deltat
+    cf_shad = np.zeros(shape)
+    cf_shad[..., 0] = (cf[..., :1] - Sshadow)[..., 0]
+    cf_shad[..., 1 : nt - 1] = S0
+    return cf_shad, ratez
+
+
 class Traditional(LCM):
-    """Linear Coulomb Failure Model (LCM) realisation using a simple (traditional) approach."""
+    """
+    Linear Coulomb Failure Model (LCM) realisation using a simple (traditional) approach.
+    The rates are computed with running-maximum scans (see :func:`_cfm`),
+    so loadings returning a 2-D stress matrix (cells x nt) are simulated
+    for all cells together, and :meth:`ensemble` evaluates a batch of
+    ``Sshadow`` and ``chi0`` values at once.
+    """
 
     def _compute(self, config: Config) -> Result:
-        ratez = np.zeros(self.nt)
-        cf_shad = np.zeros(self.nt)
-        S0 = +config.Sshadow
-        cf_shad[0] = self.cf[0] - config.Sshadow
-        for i in range(1, self.nt - 1):
-            if self.cf[i] >= self.cf[i - 1] and self.cf[i] >= S0:
-                S0 = self.cf[i]
-                ratez[i] = self.cf[i] - self.cf[i - 1]
-            else:
-                ratez[i] = 0.0
-            cf_shad[i] = S0
-        ratez = ratez * config.chi0 / config.deltat
-        neqz = np.zeros(self.nt - 1)
-        for i in range(1, self.nt - 2):
-            neqz[i] = np.trapz(ratez[0 : i + 1])  # type: ignore
+        cf_shad, ratez = _cfm(self.cf, config.Sshadow, config.chi0, config.deltat)
+        neqz = _neqz(ratez, self.t, config)
+        return self.t, cf_shad, self.cf, ratez, neqz
+
+    def ensemble(
+        self,
+        Sshadow: Optional[ArrayLike] = None,
+        chi0: Optional[ArrayLike] = None,
+        loading: Optional[Loading] = None,
+        **kwargs: Any,
+    ) -> Result:
+        """
+        Batched simulation for ``Sshadow`` and ``chi0`` given as scalars or
+        sequences of equal length (one value per ensemble member). All
+        other keyword arguments are the same as for :meth:`__call__`.
+        Returns ``t``, ``cf_shad``, ``cf``, ``ratez`` and ``neqz`` where
+        ``cf_shad``, ``ratez`` and ``neqz`` are stacked along a new first
+        axis (members x [cells x] nt).
+        """
+        config = deepcopy(self.config)
+        config.merge(kwargs, strict=True)
+        if loading is not None:
+            config.loading = loading
+        _, members = _ensemble_members(
+            dict(
+                Sshadow=config.Sshadow if Sshadow is None else Sshadow,
+                chi0=config.chi0 if chi0 is None else chi0,
+            )
+        )
+        self._prepare(config)
+        shape = (-1,) + (1,) * (self.cf.ndim - 1)
+        cf_shad, ratez = _cfm(
+            self.cf,
+            members["Sshadow"].astype(float).reshape(shape),
+            members["chi0"].astype(float).reshape(shape),
+            config.deltat,
+        )
+        neqz = _neqz(ratez, self.t, config)
         return self.t, cf_shad, self.cf, ratez, neqz
 
 
-class CFM(LCM):
+class CFM(Traditional):
     """The class Coulomb Failure Model (CFM ) is ismilar to Traditional but coded different."""
 
-    def _compute(self, config: Config) -> Result:
-        ratez = np.zeros(self.nt)
-        cf_shad = np.zeros(self.nt)
-        S0 = +config.Sshadow
-        cf_shad[0] = self.cf[0] - config.Sshadow
-        for i in range(1, self.nt - 1):
-            if self.cf[i] >= self.cf[i - 1] and self.cf[i] >= S0:
-                S0 = self.cf[i]
-                ratez[i] = self.cf[i] - self.cf[i - 1]
-            else:
-                ratez[i] = 0.0
-            cf_shad[i] = S0
-        ratez = ratez * config.chi0 / config.deltat
-        neqz = np.zeros(self.nt - 1)
-        for i in range(1, self.nt - 2):
-            neqz[i] = np.trapz(ratez[0 : i + 1])  # type: ignore
-        return self.t, cf_shad, self.cf, ratez, neqz
+
+def _log_expm1_ratio(x: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """``log((exp(x) - 1) / x)`` without overflow, 0 for ``x == 0``"""
+    ax = np.where(x == 0.0, 1.0, np.abs(x))
+    with np.errstate(divide="ignore"):
+        value = np.maximum(x, 0.0) + np.log(-np.expm1(-ax)) - np.log(ax)
+    return np.where(x == 0.0, 0.0, value)
+
+
+def _rate_state(
+    cf: npt.NDArray[np.float64],
+    strend: ArrayLike,
+    deltat: float,
+    Asig: ArrayLike,
+    chi0: ArrayLike,
+) -> npt.NDArray[np.float64]:
+    """
+    Rate and state response (Dieterich 1994, Eq. 17; Cattania, PhD
+    Eq. 6.2) for stress histories ``cf`` (..., nt) sampled with
+    ``deltat``. The state recurrence is affine,
+    ``gamma_i = a_i gamma_(i-1) + b_i`` with ``a_i = exp(-x_i)``,
+    ``x_i = dS_i / Asig`` and ``b_i = strend deltat (1 - a_i) / dS_i``,
+    and ``prod a_i = exp(-(cf_i - cf_0) / Asig)``. It is solved as a
+    prefix sum in log space (``np.logaddexp.accumulate``), so large
+    stress changes cannot overflow, and ``dS == 0`` is regular.
+    ``strend``, ``Asig`` and ``chi0`` broadcast against
+    ``cf.shape[:-1]``. Returns the rates of the broadcast shape.
+    """
+    cf = np.asarray(cf, dtype=float)
+    strend = np.asarray(strend, dtype=float)[..., None]
+    Asig = np.asarray(Asig, dtype=float)[..., None]
+    chi0 = np.asarray(chi0, dtype=float)[..., None]
+    if np.any(strend <= 0) or np.any(Asig <= 0):
+        raise InvalidParameter(
+            "rate and state models need strend > 0 and depthS < 0"
+        )
+    S = (cf - cf[..., :1]) / Asig
+    x = np.diff(cf, axis=-1) / Asig
+    # log b_i + S_i / Asig, with log(gamma_0) = 0 for the first sample
+    logb = np.log(strend * deltat / Asig) + _log_expm1_ratio(-x)
+    terms = logb + S[..., 1:]
+    terms = np.concatenate(
+        (np.zeros(terms.shape[:-1] + (1,)), terms), axis=-1
+    )
+    loggamma = np.logaddexp.accumulate(terms, axis=-1) - S
+    ratez: npt.NDArray[np.float64] = chi0 * strend * np.exp(-loggamma)
+    return ratez
 
 
 class RSM(LCM):
     """Rate and State Model (RCM) class documentation.
     RSM estimates the time dependent seimicity response for a given stress loading scenario.
     Theory is described in Dietrich (1994), JGR.
+    The state recurrence is solved as a vectorised scan (see
+    :func:`_rate_state`), so loadings returning a 2-D stress matrix
+    (cells x nt) are simulated for all cells together, and
+    :meth:`ensemble` evaluates a batch of ``depthS``, ``strend`` and
+    ``chi0`` values at once.
     """
 
+    def _cf_shad(self, config: Config) -> npt.NDArray[np.float64]:
+        """shadow stress returned with the rates"""
+        cf_shad = np.full(self.cf.shape, -config.Sshadow)
+        cf_shad[..., 0] = self.cf[..., 0] - config.Sshadow
+        return cf_shad
+
     def _compute(self, config: Config) -> Result:
-        cf_shad = np.zeros(self.nt)
-        S0 = -config.Sshadow
-        # self.chiz[0] = self.cf[0] - config.Sshadow
-        cf_shad[0] = self.cf[0] - config.Sshadow
-        ratez = np.zeros(self.nt)
-        dS = np.ediff1d(self.cf, to_end=config.loading.strend)
-        rinfty = config.chi0 * config.loading.strend
-        Asig = -config.depthS
-        #print("Asig", Asig)
-        gamma = 1.0
-        ratez[0] = 1.0
-        for i in range(1, self.nt):
-            dum = gamma / config.loading.strend
-            # Cattania, PhD Eq.(6.2), Dieterich JGR 1994, Eq.(17):
-            gamma = (dum - config.deltat / dS[i - 1]) * np.exp(
-                -dS[i - 1] / Asig
-            ) + config.deltat / dS[i - 1]
-            gamma *= config.loading.strend
-            ratez[i] = 1.0 / gamma
-            cf_shad[i] = S0
-            # self.chiz[i] = S0
-        ratez = rinfty * ratez
-        neqz = np.zeros(self.nt - 1)
-        for i in range(1, self.nt - 2):
-            neqz[i] = np.trapz(ratez[0 : i + 1])  # type: ignore
-        return self.t, cf_shad, self.cf, ratez, neqz
+        ratez = _rate_state(
+            self.cf,
+            config.loading.strend,
+            config.deltat,
+            -config.depthS,
+            config.chi0,
+        )
+        neqz = _neqz(ratez, self.t, config)
+        return self.t, self._cf_shad(config), self.cf, ratez, neqz
+
+    def ensemble(
+        self,
+        depthS: Optional[ArrayLike] = None,
+        strend: Optional[ArrayLike] = None,
+        chi0: Optional[ArrayLike] = None,
+        loading: Optional[Loading] = None,
+        **kwargs: Any,
+    ) -> Result:
+        """
+        Batched simulation for ``depthS``, ``strend`` (by default
+        ``loading.strend``) and ``chi0`` given as scalars or sequences of
+        equal length (one value per ensemble member). All other keyword
+        arguments are the same as for :meth:`__call__`. Returns ``t``,
+        ``cf_shad``, ``cf``, ``ratez`` and ``neqz`` where ``ratez`` and
+        ``neqz`` are stacked along a new first axis
+        (members x [cells x] nt).
+        """
+        config = deepcopy(self.config)
+        config.merge(kwargs, strict=True)
+        if loading is not None:
+            config.loading = loading
+        _, members = _ensemble_members(
+            dict(
+                depthS=config.depthS if depthS is None else depthS,
+                strend=config.loading.strend if strend is None else strend,
+                chi0=config.chi0 if chi0 is None else chi0,
+            )
+        )
+        self._prepare(config)
+        shape = (-1,) + (1,) * (self.cf.ndim - 1)
+        ratez = _rate_state(
+            self.cf,
+            members["strend"].astype(float).reshape(shape),
+            config.deltat,
+            -members["depthS"].astype(float).reshape(shape),
+            members["chi0"].astype(float).reshape(shape),
+        )
+        neqz = _neqz(ratez, self.t, config)
+        return self.t, self._cf_shad(config), self.cf, ratez, neqz
 
 
-class RSD(LCM):
+class RSD(RSM):
     """Rate and State Model a la Dietrich (RSrate_Dietrich) class documentation.
     RSrate_Dietrich estimates the time dependent seimicity response for a given stress loading scenario.
     Theory is described in Dietrich (1994), JGR.
+    RSD solves the same recurrence as :class:`RSM` and only differs in the
+    returned (zero) shadow stress.
     """
 
-    def _compute(self, config: Config) -> Result:
-        cf_shad = np.zeros(self.nt)
-        ratez = np.zeros(self.nt)  # nt = len(S)
-        gamma = 1.0
-        ratez[0] = 1.0
-
-        # dt = np.ediff1d(t, to_end=t[-1]-t[-2])
-        # dS = np.ediff1d(S, to_end=S[-1]-S[-2])
-        dt = np.ediff1d(self.t, to_end=config.loading.strend)
-        dS = np.ediff1d(self.cf, to_end=config.loading.strend)
-
-        rinfty = config.chi0 * config.loading.strend
-        Asig = -config.depthS
-        #print("Asig", Asig)
-        gamma = 1.0
-        ratez[0] = 1.0
-        for i in range(1, self.nt):
-            dum = gamma / config.loading.strend
-            # Cattania, PhD Eq.(6.2), Dieterich JGR 1994, Eq.(17):
-            gamma = (dum - config.deltat / dS[i - 1]) * np.exp(
-                (-dS[i - 1] + Asig * np.log(config.loading.strend)) / Asig
-            ) + config.loading.strend * config.deltat / dS[i - 1]
-            ratez[i] = 1.0 / gamma
-            # cf_shad[i] = S0
-        ratez = rinfty * ratez
-        neqz = np.zeros(self.nt - 1)
-        for i in range(1, self.nt - 2):
-            neqz[i] = np.trapz(ratez[0 : i + 1])  # type: ignore
-        return self.t, cf_shad, self.cf, ratez, neqz
+    def _cf_shad(self, config: Config) -> npt.NDArray[np.float64]:
+        return np.zeros(self.cf.shape)
+
+
+def _rsd1(
+    t: npt.NDArray[np.float64],
+    cf: npt.NDArray[np.float64],
+    Sshadow: ArrayLike,
+    Asig: ArrayLike,
+    strend: float,
+    chi0: float,
+    chunksize: int = 16,
+) -> npt.NDArray[np.float64]:
+    """
+    Heimisson & Segall (2018) rates for the 1-D stress history ``cf`` on
+    the grid of ``Sshadow`` x ``Asig`` values, shape (nS x nA x nt).
+    The onset (first sample with ``cf > Sshadow``) of all ``Sshadow``
+    values is found with one ``searchsorted`` on the running maximum of
+    ``cf``. ``exp(cf / Asig)`` and its cumulative integral are computed
+    once per ``Asig`` (referenced to ``max(cf)`` against overflow), a
+    ``Sshadow`` only scales them and shifts the start of the integral.
+    ``chunksize`` ``Sshadow`` values are evaluated at once to bound the
+    memory of temporaries. Rates are zero before the onset.
+    """
+    shadows = np.atleast_1d(np.asarray(Sshadow, dtype=float))
+    asig = np.atleast_1d(np.asarray(Asig, dtype=float))
+    nt = len(t)
+    dt = np.ediff1d(t, to_end=t[-1] - t[-2])
+    j1 = np.searchsorted(np.maximum.accumulate(cf), shadows, side="right")
+    # onset time interpolated between the samples j1 - 1 and j1 (as np.interp)
+    i0 = np.clip(j1 - 1, 0, nt - 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (t[i0 + 1] - t[i0]) / (cf[i0 + 1] - cf[i0])
+        tb = np.where(j1 == 0, t[0], slope * (shadows - cf[i0]) + t[i0])
+    k0 = np.where(j1 == nt, nt, np.searchsorted(t, tb, side="left"))
+
+    cfmax = np.max(cf)
+    K = np.exp((cf - cfmax) / asig[:, None])
+    C = np.zeros((len(asig), nt + 1))
+    np.cumsum(K * dt, axis=-1, out=C[:, 1:])
+    ta = asig[:, None] / strend
+    r0 = chi0 * strend
+
+    ratez = np.zeros((len(shadows), len(asig), nt))
+    active = np.arange(nt)
+    for a in range(0, len(shadows), chunksize):
+        chunk = slice(a, a + chunksize)
+        # inverse of the scaling exp((cfmax - Sshadow) / Asig)
+        finv = np.exp((shadows[chunk, None] - cfmax) / asig)[..., None]
+        integK = C[:, 1:] - C[:, k0[chunk]].T[..., None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = r0 * K / (finv + integK / ta)
+        ratez[chunk] = np.where(active >= k0[chunk, None, None], rate, 0.0)
+    return ratez
 
 
 class RSD1(LCM):
@@ -558,26 +1914,55 @@ class RSD1(LCM):
 
     def _compute(self, config: Config) -> Result:
         cf_shad = np.zeros(self.nt)
-        S0 = +config.Sshadow
         cf_shad[0] = self.cf[0] - config.Sshadow
-        t1 = np.min(self.t[(self.cf > config.Sshadow)])
-        if t1 > self.t[0]:
-            i0 = np.argmax(self.t[(self.t < t1)])
-            tb = np.interp(config.Sshadow, self.cf[i0 : i0 + 2], self.t[i0 : i0 + 2])
-        else:
-            tb = self.t[0]
-        ti = self.t[(self.t >= tb)] - tb
-        Si = self.cf[(self.t >= tb)] - config.Sshadow
-        dt = np.ediff1d(ti, to_end=ti[-1] - ti[-2])
-        Asig = -config.depthS
-        ta = Asig / config.loading.strend
-        r0 = config.chi0 * config.loading.strend
-        K = np.exp(Si / Asig)
-        integK = np.cumsum(K * dt)
-        ratez = np.zeros(len(self.t))
-        ratez[(self.t >= tb)] = r0 * K / (1.0 + integK / ta)
-
-        neqz = np.zeros(self.nt - 1)
-        for i in range(1, self.nt - 2):
-            neqz[i] = np.trapz(ratez[0 : i + 1])  # type: ignore
+        ratez = _rsd1(
+            self.t,
+            self.cf,
+            config.Sshadow,
+            -config.depthS,
+            config.loading.strend,
+            config.chi0,
+        )[0, 0]
+        neqz = _neqz(ratez, self.t, config)
+        return self.t, cf_shad, self.cf, ratez, neqz
+
+    def grid(
+        self,
+        Sshadow: Optional[ArrayLike] = None,
+        depthS: Optional[ArrayLike] = None,
+        loading: Optional[Loading] = None,
+        chunksize: int = 16,
+        **kwargs: Any,
+    ) -> Result:
+        """
+        Rates for all combinations of the 1-D arrays ``Sshadow`` and
+        ``depthS`` (by default the configured scalars). All other keyword
+        arguments are the same as for :meth:`__call__`. Returns ``t``,
+        ``cf_shad`` (nS x 1 x nt), ``cf``, ``ratez`` (nS x nA x nt) and
+        ``neqz`` (nS x nA x nt-1). ``chunksize`` bounds the number of
+        ``Sshadow`` values evaluated at once.
+        """
+        config = deepcopy(self.config)
+        config.merge(kwargs, strict=True)
+        if loading is not None:
+            config.loading = loading
+        Sshadow = np.atleast_1d(config.Sshadow if Sshadow is None else Sshadow)
+        depthS = np.atleast_1d(config.depthS if depthS is None else depthS)
+        if Sshadow.ndim != 1 or depthS.ndim != 1:
+            raise InvalidParameter("Sshadow and depthS must be 1-D arrays")
+        self._prepare(config)
+        if self.cf.ndim != 1:
+            raise InvalidParameter("RSD1 grids need a single stress history")
+        ratez = _rsd1(
+            self.t,
+            self.cf,
+            Sshadow.astype(float),
+            -depthS.astype(float),
+            config.loading.strend,
+            config.chi0,
+            chunksize=chunksize,
+        )
+        cf_shad = np.zeros((len(Sshadow), 1, self.nt))
+        cf_shad[:, 0, 0] = self.cf[0] - Sshadow
+        neqz = _neqz(ratez, self.t, config)
         return self.t, cf_shad, self.cf, ratez, neqz
@@ -5,10 +5,20 @@
 
 import os
 import pickle as pkl
-from typing import TYPE_CHECKING, Callable, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import numpy.typing as npt
+from numpy.lib.mixins import NDArrayOperatorsMixin
 
 from tdsr.types import Number, PathLike
 
@@ -30,6 +40,116 @@ def load(filename: PathLike) -> "Result":
         return result
 
 
+def save_checkpoint(state: Dict[str, Any], filename: PathLike) -> None:
+    """
+    Save a model state as compressed ``.npz``. The file is written to a
+    temporary file first and then renamed, so an interrupted write never
+    replaces the previous checkpoint.
+    """
+    tmp = str(filename) + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, **state)
+    os.replace(tmp, filename)
+
+
+def load_checkpoint(filename: PathLike) -> Dict[str, npt.NDArray[Any]]:
+    """Load a model state saved with :func:`save_checkpoint`"""
+    with np.load(filename) as data:
+        return {key: data[key] for key in data.files}
+
+
+##### Cumulative number of events ##############################
+
+
+def cumulative_events(
+    ratez: npt.NDArray[np.float64],
+    t: Optional[npt.NDArray[np.float64]] = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Cumulative number of events ``neqz`` from the rates ``ratez`` (along
+    the last axis) by the trapezoidal rule in O(nt). Without ``t`` unit
+    sample spacing is used, otherwise the (possibly non-uniform or
+    logarithmic) time axis ``t``. As in the original per-sample loop,
+    ``neqz`` has ``nt - 1`` entries, ``neqz[i]`` integrates
+    ``ratez[0:i+1]`` and the first and last entries are zero.
+    """
+    ratez = np.asarray(ratez, dtype=float)
+    nt = ratez.shape[-1]
+    neqz = np.zeros(ratez.shape[:-1] + (max(nt - 1, 0),))
+    if nt < 4:
+        return neqz
+    neqz[..., 1 : nt - 2] = cumulative_integral(ratez, t)[..., 1 : nt - 2]
+    return neqz
+
+
+def cumulative_integral(
+    ratez: npt.NDArray[np.float64],
+    t: Optional[npt.NDArray[np.float64]] = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Expected number of events from the first sample to every sample, the
+    trapezoidal integral of ``ratez`` along the last axis with ``nt``
+    entries starting at zero. Without ``t`` unit sample spacing is used,
+    as in :func:`cumulative_events`.
+    """
+    ratez = np.asarray(ratez, dtype=float)
+    cumulative = np.zeros(ratez.shape)
+    increments = 0.5 * (ratez[..., 1:] + ratez[..., :-1])
+    if t is not None:
+        increments *= np.diff(t)
+    np.cumsum(increments, axis=-1, out=cumulative[..., 1:])
+    return cumulative
+
+
+class LazyCumulative(NDArrayOperatorsMixin):
+    """
+    ``neqz`` computed with :func:`cumulative_events` on first access, e.g.
+    by indexing, ``np.asarray`` or arithmetic. The rates are referenced,
+    not copied.
+    """
+
+    def __init__(
+        self,
+        ratez: npt.NDArray[np.float64],
+        t: Optional[npt.NDArray[np.float64]] = None,
+    ) -> None:
+        self._ratez = ratez
+        self._t = t
+        self._values: Optional[npt.NDArray[np.float64]] = None
+
+    @property
+    def values(self) -> npt.NDArray[np.float64]:
+        if self._values is None:
+            self._values = cumulative_events(self._ratez, self._t)
+        return self._values
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self._ratez.shape[:-1] + (max(self._ratez.shape[-1] - 1, 0),)
+
+    @property
+    def computed(self) -> bool:
+        return self._values is not None
+
+    def __array__(self, dtype: Any = None) -> npt.NDArray[Any]:
+        return np.asarray(self.values, dtype=dtype)
+
+    def __array_ufunc__(self, ufunc: Any, method: str, *inputs: Any, **kwargs: Any) -> Any:
+        inputs = tuple(
+            x.values if isinstance(x, LazyCumulative) else x for x in inputs
+        )
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.values[key]
+
+    def __repr__(self) -> str:
+        return "LazyCumulative(%s)" % (repr(self.values) if self.computed else "...")
+
+
 ##### Discretization ##############################
 
 
@@ -67,18 +187,63 @@ def gridrange_log(
     return amin, amax, na, a, da
 
 
-def Zvalues(S, Sstep, t0, dsig):
-    # NZ = 1000
-    NZ = 10000
-    # NZ = 50000
-    # NZ = 100000
+def Zvalues(
+    S: npt.NDArray[np.float64],
+    Sstep: Number,
+    t0: Number,
+    dsig: Number,
+    NZ: int = 10000,
+) -> npt.NDArray[np.float64]:
+    # NZ = 1000, 10000, 50000 or 100000 have been tested
     dS = np.ediff1d(S, to_end=S[-1] - S[-2])
     Smax = np.maximum(0, Sstep + np.max(np.cumsum(dS)))
     Z1 = -Smax - 20 * dsig
     Z2 = Smax + 20 * dsig
     # Z1 = -Smax - 20 * dsig
     # Z2 = Smax + 20 * dsig
-    Z = np.linspace(Z1, Z2, NZ)
+    Z: npt.NDArray[np.float64] = np.linspace(Z1, Z2, NZ)
+    return Z
+
+
+def Zvalues_stretched(
+    S: npt.NDArray[np.float64],
+    Sstep: Number,
+    t0: Number,
+    dsig: Number,
+    NZ: int = 10000,
+    Zedges: Sequence[Number] = (),
+    stretch: Number = 4.0,
+) -> npt.NDArray[np.float64]:
+    """
+    Non-uniform stress axis over the same range as :func:`Zvalues`.
+    The node density is higher by the factor ``stretch`` where sources
+    pass the failure front during loading, i.e. for initial stress states
+    between ``min(S) - 5 dsig`` and ``max(S) + 5 dsig`` relative to the
+    first sample, and within a few ``dsig`` around the ``Zedges`` of the
+    initial distribution (e.g. ``Sshadow`` or the flanks of a Gaussian).
+    Transitions are smooth (tanh and Gaussian), so the ``np.ediff1d(Z)``
+    integration weights vary slowly along the axis. The interior node
+    nearest to each edge is moved onto it, so a step of the initial
+    distribution lies exactly on a node.
+    """
+    Zu = Zvalues(S, Sstep, t0, dsig, NZ=NZ)
+    Z1, Z2 = Zu[0], Zu[-1]
+    Srel = S - S[0]
+    Za = np.min(Srel) - 5 * dsig
+    Zb = np.max(Srel) + 5 * dsig
+    Zfine = np.linspace(Z1, Z2, 20 * NZ)
+    weight = 0.5 * (np.tanh((Zfine - Za) / dsig) - np.tanh((Zfine - Zb) / dsig))
+    for Ze in Zedges:
+        weight = np.maximum(weight, np.exp(-(((Zfine - Ze) / (3 * dsig)) ** 2)))
+    density = 1.0 + (stretch - 1.0) * weight
+    G = np.concatenate(
+        ([0.0], np.cumsum(0.5 * (density[1:] + density[:-1]) * np.diff(Zfine)))
+    )
+    Z = np.interp(np.linspace(0.0, G[-1], NZ), G, Zfine)
+    for Ze in Zedges:
+        j = int(np.argmin(np.abs(Z - Ze)))
+        if 0 < j < NZ - 1:
+            Z[j] = Ze
     return Z
 
 
@@ -92,6 +257,70 @@ def shifted(x: npt.NDArray[np.float64], nshift: int) -> npt.NDArray[np.float64]:
     return x
 
 
+class RingBuffer(object):
+    """
+    Fixed-length array stored with a moving offset. :meth:`shift` gives
+    the same result as :func:`shifted`, but only moves the offset and
+    fills the newly exposed cells. Products and cut-offs with arrays in
+    the logical (unshifted) order are done without copies.
+    """
+
+    def __init__(self, x: npt.NDArray[np.float64]) -> None:
+        self.data = np.array(x, dtype=float)
+        self.offset = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def first(self) -> float:
+        return float(self.data[self.offset])
+
+    @property
+    def last(self) -> float:
+        return float(self.data[self.offset - 1])
+
+    def values(self) -> npt.NDArray[np.float64]:
+        """copy of the array in logical order"""
+        return np.concatenate((self.data[self.offset :], self.data[: self.offset]))
+
+    def _fill(self, start: int, stop: int, value: float) -> None:
+        """set the logical cells ``start:stop`` to ``value``"""
+        n = len(self.data)
+        p = (self.offset + start) % n
+        if p + stop - start <= n:
+            self.data[p : p + stop - start] = value
+        else:
+            self.data[p:] = value
+            self.data[: p + stop - start - n] = value
+
+    def shift(self, nshift: int) -> None:
+        """shift by ``nshift`` cells, filling with 1 (nshift > 0) or 0"""
+        n = len(self.data)
+        if nshift == 0:
+            return
+        if abs(nshift) >= n:
+            self.data[:] = 1.0 if nshift > 0 else 0.0
+            return
+        self.offset = (self.offset - nshift) % n
+        if nshift > 0:
+            self._fill(0, nshift, 1.0)
+        else:
+            self._fill(n + nshift, n, 0.0)
+
+    def dot(self, w: npt.NDArray[np.float64]) -> float:
+        """sum of the product with ``w`` (logical order)"""
+        k = len(self.data) - self.offset
+        head = np.dot(self.data[self.offset :], w[:k])
+        return float(head + np.dot(self.data[: self.offset], w[k:]))
+
+    def multiply(self, w: npt.NDArray[np.float64]) -> None:
+        """multiply in place by ``w`` (logical order)"""
+        k = len(self.data) - self.offset
+        self.data[self.offset :] *= w[:k]
+        self.data[: self.offset] *= w[k:]
+
+
 def tf(Z, t0, dsig):
     arg = Z / dsig
     # good = arg <= 30
@@ -103,12 +332,16 @@ def tf(Z, t0, dsig):
     return failuretime
 
 
-def pf(Z, t0, dsig):
+def pf(
+    Z: npt.NDArray[np.float64],
+    t0: Union[float, npt.NDArray[np.float64]],
+    dsig: Union[float, npt.NDArray[np.float64]],
+) -> npt.NDArray[np.float64]:
     argmax = 0  # if the argument in exp() becomes > argmax,
     arg = -Z / dsig
     n = len(arg)
     # ptrigger = np.exp(arg, out=t0*np.ones(n), where= (arg < argmax) ) / t0
-    ptrigger = np.exp(arg) / t0
+    ptrigger: npt.NDArray[np.float64] = np.exp(arg) / t0
     return ptrigger
 
 
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test adaptive time stepping of TDSR1"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import CustomLoading, MatrixLoading
+
+
+def injection_loading(deltat):
+    # background trend, injection pulse and a smooth step at shut-in
+    t = np.linspace(0.0, 100.0, 2001)
+    S = 0.01 * t + 2.0 * np.exp(-(((t - 40.0) / 2.0) ** 2))
+    S += 1.0 / (1.0 + np.exp(-(t - 70.0) / 0.5))
+    return CustomLoading(
+        data=np.column_stack([t, S]),
+        scal_t=1.0,
+        scal_cf=1.0,
+        strend=0.01,
+        tstart=0.0,
+        tend=100.0,
+        deltat=deltat,
+    )
+
+
+def test_adaptive_tolerance():
+    deltat = 0.02
+    config = Config(deltat=deltat, tend=100.0, depthS=-0.5, t0=0.1, chi0=1.0)
+    loading = injection_loading(deltat)
+    tdsr = TDSR1(config=config)
+    _, chiz, _, r_ref, _ = tdsr(
+        loading=loading, NZ=1000, integrator="exponential", pf_average=True
+    )
+    nt = len(r_ref)
+    for tol in [1e-2, 1e-3]:
+        _, chiz_ad, _, r_ad, _ = tdsr(
+            loading=loading, NZ=1000, adaptive=True, adaptive_tol=tol
+        )
+        assert r_ad.shape == r_ref.shape
+        assert tdsr.steps_rejected > 0
+        assert tdsr.steps_accepted < nt / 2
+        assert np.max(np.abs(r_ad - r_ref)) < 2 * tol * np.max(r_ref)
+        n_ref, n_ad = np.cumsum(r_ref * deltat), np.cumsum(r_ad * deltat)
+        assert np.max(np.abs(n_ad - n_ref)) < tol * n_ref[-1]
+        assert np.allclose(chiz_ad, chiz, rtol=0.0, atol=tol * np.max(chiz))
+
+
+def test_adaptive_2d_loading():
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    tdsr = TDSR1(config=config)
+    data = np.cumsum(np.full((2, 240), 7.0e-5 * 360.0), axis=1)
+    with pytest.raises(InvalidParameter):
+        tdsr(loading=MatrixLoading(data=data), NZ=500, adaptive=True)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test active-band pruning of the stress axis in TDSR1"""
+
+import numpy as np
+
+from tdsr import TDSR1, Config
+from tdsr.loading import BackgroundLoading, StepLoading
+
+
+def test_band_step_loading():
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    loading = StepLoading(strend=7.0e-5, sstep=0.5, deltat=360.0, config=config)
+    tdsr = TDSR1(config=config)
+    for iX0 in ["equilibrium", "uniform", "gaussian"]:
+        _, chiz, _, r_full, _ = tdsr(loading=loading, iX0=iX0, Sshadow=0.3)
+        assert tdsr.active_fraction == 1.0
+        _, chiz_band, _, r_band, _ = tdsr(
+            loading=loading, iX0=iX0, Sshadow=0.3, band=True
+        )
+        assert 0.0 < tdsr.active_fraction < 1.0
+        assert np.allclose(r_band, r_full, rtol=1e-10, atol=1e-12 * r_full.max())
+        assert np.allclose(chiz_band, chiz, rtol=1e-10, atol=1e-8)
+
+
+def test_band_ensemble_and_tolerance():
+    tdsr = TDSR1()
+    loading = BackgroundLoading(strend=1.0, deltat=0.1, tstart=0.0, tend=50.0)
+    common = dict(
+        loading=loading,
+        chi0=1.0,
+        t0=1.0,
+        deltat=0.1,
+        tstart=0.0,
+        tend=50.0,
+        iX0="uniform",
+        NZ=4000,
+    )
+    depthS = [-2.0, -5.0]
+    Sshadow = [0.0, 30.0]
+    _, _, _, r_full, _ = tdsr.ensemble(depthS=depthS, Sshadow=Sshadow, **common)
+    _, _, _, r_band, _ = tdsr.ensemble(
+        depthS=depthS, Sshadow=Sshadow, band=True, **common
+    )
+    fraction = tdsr.active_fraction
+    assert fraction < 0.5
+    assert np.allclose(r_band, r_full, rtol=1e-10, atol=1e-12)
+
+    # a looser tolerance shrinks the window
+    _, _, _, r_loose, _ = tdsr.ensemble(
+        depthS=depthS, Sshadow=Sshadow, band=True, band_tol=1e-6, **common
+    )
+    assert tdsr.active_fraction < fraction
+    assert np.allclose(r_loose, r_full, rtol=1e-3, atol=1e-4)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the catalog likelihood calibration"""
+
+import numpy as np
+import pytest
+
+from tdsr import RSD1, Config
+from tdsr.calibration import (
+    Calibration,
+    expected_events,
+    log_likelihood,
+    nelder_mead,
+    rates_at,
+)
+from tdsr.exceptions import InvalidParameter, MissingParameter
+
+from .utils import quantile_catalog, step_setup
+
+
+def test_log_likelihood_constant_rate():
+    t = np.linspace(0.0, 10.0, 11)
+    events = np.array([0.5, 2.0, 7.25, 11.0])
+    ratez = np.full((2, len(t)), 3.0)
+    ll = log_likelihood(t, ratez, events, tmin=0.0, tmax=8.0)
+    np.testing.assert_allclose(ll, 3 * np.log(3.0) - 3.0 * 8.0)
+
+
+def test_rates_and_expected_events():
+    t = np.linspace(0.0, 5.0, 21)
+    ratez = 1.0 + t**2
+    events = np.array([0.0, 0.3, 2.71, 5.0])
+    np.testing.assert_allclose(rates_at(t, ratez, events), np.interp(events, t, ratez))
+    tmin, tmax = 0.4, 3.3
+    fine = np.linspace(tmin, tmax, 200001)
+    expected = np.trapz(np.interp(fine, t, ratez), fine)
+    np.testing.assert_allclose(expected_events(t, ratez, tmin, tmax), expected)
+
+
+def test_nelder_mead_rosenbrock():
+    def rosenbrock(x):
+        return (1 - x[0]) ** 2 + 100 * (x[1] - x[0] ** 2) ** 2
+
+    x, value, nit, nfev = nelder_mead(rosenbrock, [-1.2, 1.0], tol=1e-10, maxiter=5000)
+    np.testing.assert_allclose(x, [1.0, 1.0], atol=1e-4)
+    assert value < 1e-8
+
+
+def calibration(params, **kwargs):
+    config, loading = step_setup()
+    t, _, _, ratez, _ = RSD1(config=config)(
+        loading=loading, chi0=1.0, depthS=-0.3, Sshadow=0.0
+    )
+    events, _ = quantile_catalog(t, ratez, 200)
+    return (
+        Calibration(
+            RSD1, events, params, loading=loading, config=config, Sshadow=0.0, **kwargs
+        ),
+        t,
+        ratez,
+        events,
+    )
+
+
+def test_calibration_chi0_closed_form():
+    cal, t, ratez, events = calibration(dict(chi0=1.0), depthS=-0.3)
+    result = cal.fit(tol=1e-10)
+    # the rate is proportional to chi0: chi0 = n / expected events(chi0=1)
+    expected = len(events) / expected_events(t, ratez, t[0], t[-1])
+    np.testing.assert_allclose(result.params["chi0"], expected, rtol=1e-6)
+    assert result.loglike >= cal(chi0=expected) - 1e-6
+
+
+def test_calibration_recovers_depthS():
+    cal, _, _, _ = calibration(dict(chi0=1.0, depthS=-0.6))
+    result = cal.fit(tol=1e-8)
+    np.testing.assert_allclose(result.params["depthS"], -0.3, rtol=0.05)
+    assert result.loglike > cal(chi0=1.0, depthS=-0.6)
+
+
+def test_calibration_invalid_parameter():
+    with pytest.raises(InvalidParameter):
+        calibration(dict(bogus=1.0))
+    config = Config()
+    config.loading = None
+    with pytest.raises(MissingParameter):
+        Calibration(RSD1, [1.0], dict(chi0=1.0), config=config)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for synthetic catalogs"""
+
+import numpy as np
+import pytest
+
+from tdsr import RSD1, Config
+from tdsr.catalog import gutenberg_richter, synthetic_catalogs
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import StepLoading
+from tdsr.utils import cumulative_integral
+
+
+def model_result():
+    config = Config(deltat=720.0, tstart=0.0, tend=86400.0)
+    loading = StepLoading(strend=7e-5, sstep=1.0, tstep=43200.0, config=config)
+    return RSD1(config=config)(loading=loading, chi0=10.0, depthS=-0.3, Sshadow=0.0)
+
+
+def test_catalog_counts_and_times():
+    result = model_result()
+    t, ratez = result[0], result[3]
+    tmin, tmax = 20000.0, 70000.0
+    catalog = synthetic_catalogs(
+        t, ratez, nrealisations=2000, tmin=tmin, tmax=tmax, seed=1
+    )
+    assert catalog.times.dtype == float and catalog.realisation.dtype.kind == "i"
+    assert np.all((catalog.times >= tmin) & (catalog.times <= tmax))
+    assert len(catalog) == catalog.counts.sum()
+
+    fine = np.linspace(tmin, tmax, 100001)
+    expected = np.trapz(np.interp(fine, t, ratez), fine)
+    counts = catalog.counts
+    np.testing.assert_allclose(counts.mean(), expected, rtol=0.02)
+    np.testing.assert_allclose(counts.var(), expected, rtol=0.1)
+
+    # the event times follow the rate: compare binned counts
+    edges = np.linspace(tmin, tmax, 11)
+    observed = np.histogram(catalog.times, edges)[0] / catalog.nrealisations
+    grid = np.linspace(tmin, tmax, 100001)
+    cumulative = cumulative_integral(np.interp(grid, t, ratez), grid)
+    predicted = np.diff(np.interp(edges, grid, cumulative))
+    np.testing.assert_allclose(observed, predicted, rtol=0.05, atol=0.05)
+
+
+def test_catalog_sorted_and_reproducible():
+    result = model_result()
+    a = synthetic_catalogs(result[0], result[3], nrealisations=50, seed=7)
+    b = synthetic_catalogs(result[0], result[3], nrealisations=50, seed=7)
+    np.testing.assert_array_equal(a.times, b.times)
+    np.testing.assert_array_equal(a.magnitudes, b.magnitudes)
+    assert np.all(np.diff(a.realisation) >= 0)
+    for i in range(a.nrealisations):
+        times, magnitudes = a.get(i)
+        assert len(times) == a.counts[i] == len(magnitudes)
+        assert np.all(np.diff(times) >= 0)
+
+
+def test_gutenberg_richter():
+    rng = np.random.default_rng(3)
+    m = gutenberg_richter(rng, 200000, mmin=1.0, b=1.2)
+    assert m.min() >= 1.0
+    # Aki (1965) maximum likelihood b-value
+    np.testing.assert_allclose(np.log10(np.e) / (m.mean() - 1.0), 1.2, rtol=0.02)
+    m = gutenberg_richter(rng, 10000, mmin=1.0, b=1.0, mmax=3.0)
+    assert m.max() <= 3.0
+    with pytest.raises(InvalidParameter):
+        gutenberg_richter(rng, 10, mmin=1.0, mmax=0.5)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the vectorised Coulomb failure models CFM and Traditional"""
+
+import numpy as np
+
+from tdsr import CFM, Config, Traditional
+from tdsr.loading import CyclicLoading, MatrixLoading
+
+
+def reference(cf, Sshadow, chi0, deltat):
+    # the scalar loop of CFM._compute before vectorisation
+    nt = len(cf)
+    ratez = np.zeros(nt)
+    cf_shad = np.zeros(nt)
+    S0 = +Sshadow
+    cf_shad[0] = cf[0] - Sshadow
+    for i in range(1, nt - 1):
+        if cf[i] >= cf[i - 1] and cf[i] >= S0:
+            S0 = cf[i]
+            ratez[i] = cf[i] - cf[i - 1]
+        else:
+            ratez[i] = 0.0
+        cf_shad[i] = S0
+    ratez = ratez * chi0 / deltat
+    return cf_shad, ratez
+
+
+def test_cfm_reference():
+    config = Config(deltat=720.0, tend=86400.0)
+    loading = CyclicLoading(ampsin=0.5, Tsin=7200.0, deltat=720.0, config=config)
+    for model in [CFM(config=config), Traditional(config=config)]:
+        for Sshadow in [0.0, 0.3, 1.0]:
+            _, cf_shad, cf, ratez, _ = model(loading=loading, Sshadow=Sshadow)
+            cf_shad_ref, ratez_ref = reference(cf, Sshadow, config.chi0, 720.0)
+            assert np.array_equal(cf_shad, cf_shad_ref)
+            assert np.array_equal(ratez, ratez_ref)
+
+
+def test_cfm_batch():
+    rng = np.random.default_rng(3)
+    data = np.cumsum(rng.normal(0.01, 0.1, (5, 300)), axis=1)
+    config = Config(deltat=720.0, tend=216000.0)
+    model = CFM(config=config)
+    Sshadow = [0.0, 0.5, 2.0]
+    chi0 = [1.0, 10.0, 100.0]
+    t, cf_shad, cf, ratez, neqz = model.ensemble(
+        Sshadow=Sshadow, chi0=chi0, loading=MatrixLoading(data=data)
+    )
+    assert ratez.shape == cf_shad.shape == (3, 5, 300)
+    assert neqz.shape == (3, 5, 299)
+    for k in range(3):
+        for c in range(5):
+            cf_shad_ref, ratez_ref = reference(data[c], Sshadow[k], chi0[k], 720.0)
+            assert np.array_equal(cf_shad[k, c], cf_shad_ref)
+            assert np.array_equal(ratez[k, c], ratez_ref)
+    # a 2-D loading without ensemble gives stacked results per cell
+    _, cf_shad, _, ratez, _ = model(loading=MatrixLoading(data=data), Sshadow=0.5)
+    assert np.array_equal(ratez, ratez_ref_all(data, 0.5, config.chi0))
+
+
+def ratez_ref_all(data, Sshadow, chi0):
+    return np.array([reference(row, Sshadow, chi0, 720.0)[1] for row in data])
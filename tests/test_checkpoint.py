@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test checkpoint and resume of model runs"""
+
+import numpy as np
+import pytest
+
+import tdsr.tdsr
+from tdsr import LCM, TDSR1, Config
+from tdsr.exceptions import InvalidParameter, MissingParameter
+from tdsr.loading import CyclicLoading
+from tdsr.utils import save_checkpoint
+
+
+class Killed(Exception):
+    pass
+
+
+def kill_after(monkeypatch, nsaves):
+    """let the run die after ``nsaves`` checkpoints have been written"""
+    calls = []
+
+    def save(state, filename):
+        save_checkpoint(state, filename)
+        calls.append(filename)
+        if len(calls) == nsaves:
+            raise Killed
+
+    monkeypatch.setattr(tdsr.tdsr, "save_checkpoint", save)
+
+
+def cyclic_config():
+    config = Config(deltat=60.0, tend=43200.0, depthS=-0.2, t0=720.0)
+    config.loading = CyclicLoading(
+        ampsin=0.5, Tsin=7200.0, deltat=60.0, config=config
+    )
+    return config
+
+
+def test_checkpoint_resume_tdsr1(tmp_path, monkeypatch):
+    model = TDSR1(config=cyclic_config())
+    filename = str(tmp_path / "tdsr1.npz")
+    for kwargs in [
+        dict(NZ=1000),
+        dict(NZ=1000, pf_incremental=True, pf_renorm=7),
+        dict(NZ=1000, integrator="exponential", pf_average=True),
+    ]:
+        t, chiz, cf, ratez, neqz = model(**kwargs)
+        with monkeypatch.context() as m:
+            kill_after(m, 3)
+            with pytest.raises(Killed):
+                model(checkpoint_file=filename, checkpoint_every=100, **kwargs)
+        _, chiz_r, _, ratez_r, neqz_r = model.resume(
+            filename, checkpoint_file=filename, checkpoint_every=100, **kwargs
+        )
+        assert np.array_equal(ratez_r, ratez)
+        assert np.array_equal(chiz_r, chiz)
+        assert np.array_equal(neqz_r, neqz)
+
+
+def test_checkpoint_resume_lcm(tmp_path, monkeypatch):
+    config = cyclic_config()
+    model = LCM(config=config)
+    filename = str(tmp_path / "lcm.npz")
+    t, chiz, cf, ratez, neqz = model(Sshadow=0.1)
+    with monkeypatch.context() as m:
+        kill_after(m, 2)
+        with pytest.raises(Killed):
+            model(Sshadow=0.1, checkpoint_file=filename, checkpoint_every=150)
+    _, chiz_r, _, ratez_r, neqz_r = model.resume(filename, Sshadow=0.1)
+    assert np.array_equal(ratez_r, ratez)
+    assert np.array_equal(chiz_r, chiz)
+    assert np.array_equal(neqz_r, neqz)
+
+
+def test_checkpoint_mismatch(tmp_path):
+    model = TDSR1(config=cyclic_config())
+    filename = str(tmp_path / "tdsr1.npz")
+    model(NZ=500, checkpoint_file=filename, checkpoint_every=100)
+    with pytest.raises(InvalidParameter):
+        model.resume(filename, NZ=500, tend=21600.0)
+    with pytest.raises(InvalidParameter):
+        LCM(config=cyclic_config()).resume(filename)
+    for integrator in ["segments", "Segments"]:
+        with pytest.raises(InvalidParameter):
+            model(
+                NZ=500,
+                integrator=integrator,
+                checkpoint_every=100,
+                checkpoint_file=filename,
+            )
+
+
+def test_checkpoint_every_requires_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for model in (TDSR1(config=cyclic_config()), LCM(config=cyclic_config())):
+        with pytest.raises(MissingParameter):
+            model(checkpoint_every=10)
+    assert list(tmp_path.iterdir()) == []
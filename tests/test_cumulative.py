@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the cumulative number of events shared by all models"""
+
+import numpy as np
+
+from tdsr import CFM, RSD, TDSR1, Config
+from tdsr.loading import StepLoading
+from tdsr.utils import LazyCumulative, cumulative_events, cumulative_integral
+
+
+def reference(ratez, t=None):
+    # the per-sample loop used before
+    nt = len(ratez)
+    neqz = np.zeros(nt - 1)
+    for i in range(1, nt - 2):
+        if t is None:
+            neqz[i] = np.trapz(ratez[0 : i + 1])
+        else:
+            neqz[i] = np.trapz(ratez[0 : i + 1], t[0 : i + 1])
+    return neqz
+
+
+def test_cumulative_events():
+    rng = np.random.default_rng(1)
+    ratez = rng.random((3, 200))
+    t = np.logspace(0.0, 3.0, 200)
+    for k in range(3):
+        assert np.allclose(cumulative_events(ratez[k]), reference(ratez[k]))
+        assert np.allclose(
+            cumulative_events(ratez[k], t), reference(ratez[k], t), rtol=1e-12
+        )
+    neqz = cumulative_events(ratez, t)
+    assert neqz.shape == (3, 199)
+    for k in range(3):
+        assert np.array_equal(neqz[k], cumulative_events(ratez[k], t))
+    for nt in range(1, 5):
+        assert np.array_equal(cumulative_events(np.ones(nt)), reference(np.ones(nt)))
+
+
+def test_cumulative_integral():
+    rng = np.random.default_rng(2)
+    ratez = rng.random((3, 50))
+    t = np.logspace(0.0, 2.0, 50)
+    cumulative = cumulative_integral(ratez, t)
+    assert cumulative.shape == ratez.shape
+    for k in range(3):
+        expected = [np.trapz(ratez[k, : i + 1], t[: i + 1]) for i in range(50)]
+        assert np.allclose(cumulative[k], expected, rtol=1e-12)
+    # the legacy convention is the same integral without its last entry
+    assert np.array_equal(cumulative_events(ratez, t)[:, 1:-1], cumulative[:, 1:-2])
+
+
+def test_cumulative_lazy():
+    ratez = np.linspace(0.0, 1.0, 100)
+    lazy = LazyCumulative(ratez)
+    assert not lazy.computed
+    assert lazy.shape == (99,) and len(lazy) == 99
+    assert not lazy.computed
+    assert np.isclose(lazy[50], reference(ratez)[50])
+    assert lazy.computed
+    assert np.allclose(2.0 * lazy, 2.0 * reference(ratez))
+
+
+def test_models_neqz():
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    loading = StepLoading(strend=7.0e-5, sstep=0.5, deltat=360.0, config=config)
+    for model in [TDSR1(config=config), CFM(config=config), RSD(config=config)]:
+        t, _, _, ratez, neqz = model(loading=loading)
+        assert np.allclose(neqz, reference(ratez))
+        _, _, _, _, neqz = model(loading=loading, neqz_dt=True, neqz_lazy=True)
+        assert isinstance(neqz, LazyCumulative)
+        assert np.allclose(np.asarray(neqz), reference(ratez, t))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test batched TDSR1 parameter ensembles"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import MatrixLoading, StepLoading
+from tdsr.utils import gridrange
+
+
+def test_ensemble_matches_single_runs():
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    loading = StepLoading(strend=7.0e-5, sstep=0.5, deltat=360.0, config=config)
+    tdsr = TDSR1(config=config)
+
+    depthS = [-0.2, -0.3, -0.5, -0.4]
+    t0 = [100.0, 720.0, 1000.0, 720.0]
+    iX0 = ["uniform", "gaussian", "equilibrium", "uniform"]
+    t, chiz, cf, r, xn = tdsr.ensemble(
+        depthS=depthS,
+        t0=t0,
+        iX0=iX0,
+        Sshadow=0.2,
+        chi0=[1e3, 1e4, 1e4, 2e4],
+        chunksize=3,
+        loading=loading,
+        NZ=2000,
+    )
+    assert r.shape == (4, len(t))
+    assert xn.shape == (4, len(t) - 1)
+    assert chiz.shape == (4, 2000)
+    for k, (d, tt, i) in enumerate(zip(depthS, t0, iX0)):
+        _, chiz_k, _, r_k, xn_k = tdsr(
+            depthS=d,
+            t0=tt,
+            iX0=i,
+            Sshadow=0.2,
+            chi0=[1e3, 1e4, 1e4, 2e4][k],
+            loading=loading,
+            NZ=2000,
+        )
+        assert np.array_equal(r[k], r_k)
+        assert np.array_equal(xn[k], xn_k)
+        assert np.array_equal(chiz[k], chiz_k)
+
+
+def test_ensemble_unequal_length():
+    config = Config(deltat=360.0, tend=86400.0)
+    tdsr = TDSR1(config=config)
+    with pytest.raises(InvalidParameter):
+        tdsr.ensemble(depthS=[-0.2, -0.3], t0=[100.0, 200.0, 300.0])
+    with pytest.raises(InvalidParameter):
+        tdsr.ensemble(depthS=[-0.2, -0.3], pf_renrom=3)
+
+
+def test_ensemble_matrix_loading_matches_single_runs():
+    tstart, tend, deltat = 0.0, 10.0, 0.05
+    _, _, nt, t, _ = gridrange(tstart, tend, deltat)
+    amplitude = np.array([0.5, 1.0, 2.0])
+    S = 0.1 * t + amplitude[:, None] * (1.0 - np.exp(-t / 2.0))
+    loading = MatrixLoading(data=S, strend=0.1)
+    config = Config(chi0=1.0, t0=0.01, deltat=deltat, tstart=tstart, tend=tend)
+    tdsr = TDSR1(config=config)
+
+    depthS = [-0.5, -0.3]
+    _, chiz, _, r, xn = tdsr.ensemble(
+        depthS=depthS, chunksize=4, loading=loading, NZ=1000
+    )
+    assert r.shape == (2, 3, nt)
+    assert xn.shape == (2, 3, nt - 1)
+    assert chiz.shape == (2, 3, 1000)
+    for k, d in enumerate(depthS):
+        _, chiz_k, _, r_k, xn_k = tdsr(depthS=d, loading=loading, NZ=1000)
+        assert np.allclose(r[k], r_k, rtol=1e-12)
+        assert np.allclose(xn[k], xn_k, rtol=1e-12)
+        assert np.allclose(chiz[k], chiz_k, rtol=1e-12)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the comparison of model rates with catalogs"""
+
+import numpy as np
+import pytest
+
+from tdsr import RSD1, TDSR1, Config
+from tdsr.calibration import evaluate_catalog, expected_counts, observed_counts
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import StepLoading
+
+
+def results():
+    config = Config(deltat=720.0, tstart=0.0, tend=86400.0, NZ=1000)
+    loading = StepLoading(strend=7e-5, sstep=1.0, tstep=43200.0, config=config)
+    return [
+        TDSR1(config=config)(loading=loading, chi0=10.0, depthS=-0.3),
+        RSD1(config=config)(loading=loading, chi0=10.0, depthS=-0.3, Sshadow=0.0),
+    ]
+
+
+def test_observed_counts_match_histogram():
+    rng = np.random.default_rng(0)
+    events = rng.uniform(0.0, 10.0, 1000)
+    bins = np.array([0.0, 0.5, 2.0, 2.0, 7.5, 10.0])
+    events[:3] = [2.0, 10.0, 0.0]
+    np.testing.assert_array_equal(
+        observed_counts(events, bins), np.histogram(events, bins)[0]
+    )
+
+
+def test_expected_counts_match_quadrature():
+    t, _, _, ratez, _ = results()[0]
+    bins = np.array([1000.0, 30000.0, 43200.0, 50000.0, 85000.0])
+    fine = np.linspace(bins[0], bins[-1], 400001)
+    rates = np.interp(fine, t, ratez)
+    cumulative = np.concatenate(
+        ([0.0], np.cumsum(np.diff(fine) * 0.5 * (rates[1:] + rates[:-1])))
+    )
+    expected = np.diff(np.interp(bins, fine, cumulative))
+    np.testing.assert_allclose(expected_counts(t, ratez, bins), expected, rtol=1e-6)
+
+
+def test_evaluate_catalog_batched():
+    batch = results()
+    t = batch[0][0]
+    events = np.array([100.0, 43300.0, 43500.0, 60000.0, 86000.0])
+    bins = np.linspace(0.0, 86400.0, 13)
+    rates = [result[3] for result in batch]
+    evaluation = evaluate_catalog(t, rates, events, bins)
+    assert evaluation.rates.shape == (2, len(events))
+    assert evaluation.expected.shape == (2, len(bins) - 1)
+    assert evaluation.observed.sum() == len(events)
+    for k, result in enumerate(batch):
+        single = evaluate_catalog(result[0], result[3], events, bins)
+        np.testing.assert_allclose(single.rates, np.interp(events, t, result[3]))
+        np.testing.assert_allclose(evaluation.rates[k], single.rates)
+        np.testing.assert_allclose(evaluation.expected[k], single.expected)
+        np.testing.assert_allclose(
+            single.expected.sum(), np.trapz(result[3], t), rtol=1e-12
+        )
+
+
+def test_evaluate_catalog_invalid():
+    t, _, _, ratez, _ = results()[0]
+    with pytest.raises(InvalidParameter):
+        evaluate_catalog(t, ratez, [1.0], [2.0, 1.0])
+    with pytest.raises(InvalidParameter):
+        evaluate_catalog(t[1:], ratez, [1.0], [0.0, 1.0])
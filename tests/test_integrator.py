@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the source depletion integrators of TDSR1"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import CustomLoading
+
+# piecewise linear stress history with kinks on every tested time grid
+STRESS = np.array([[0.0, 0.0], [20.0, 0.2], [40.0, 4.2], [100.0, 4.8]])
+
+
+def cumulative_counts(deltat, **kwargs):
+    config = Config(deltat=deltat, tstart=0.0, tend=100.0, depthS=-1.0, t0=0.01)
+    loading = CustomLoading(
+        data=STRESS,
+        scal_t=1.0,
+        scal_cf=1.0,
+        strend=0.01,
+        tstart=0.0,
+        tend=100.0,
+        deltat=deltat,
+    )
+    tdsr = TDSR1(config=config)
+    t, _, _, ratez, _ = tdsr(loading=loading, NZ=2000, **kwargs)
+    return t, np.concatenate(([0.0], np.cumsum(ratez * deltat)[:-1]))
+
+
+def test_exponential_small_steps():
+    _, n_euler = cumulative_counts(0.01)
+    _, n_exp = cumulative_counts(0.01, integrator="exponential")
+    assert np.allclose(n_exp, n_euler, rtol=1e-3, atol=0.0)
+
+
+def test_exponential_pf_average_coarse_steps():
+    t_ref, n_ref = cumulative_counts(0.01, integrator="exponential", pf_average=True)
+    for deltat in [1.0, 4.0]:
+        t, n_euler = cumulative_counts(deltat)
+        _, n_avg = cumulative_counts(deltat, integrator="exponential", pf_average=True)
+        n_true = np.interp(t, t_ref, n_ref)
+        err_euler = np.max(np.abs(n_euler - n_true)) / n_true[-1]
+        err_avg = np.max(np.abs(n_avg - n_true)) / n_true[-1]
+        assert err_euler > 1e-2
+        assert err_avg < 1e-8
+
+
+def test_invalid_integrator():
+    with pytest.raises(InvalidParameter):
+        cumulative_counts(1.0, integrator="rk4")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test multi-cell TDSR1 simulations with a stress matrix"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import CustomLoading, MatrixLoading
+from tdsr.utils import gridrange
+
+
+def test_matrix_loading_matches_single_cells():
+    tstart, tend, deltat = 0.0, 10.0, 0.01
+    strend = 0.1
+    _, _, nt, t, dt = gridrange(tstart, tend, deltat)
+    amplitude = np.array([0.5, 1.0, 2.0])
+    S = strend * t + amplitude[:, None] * (1.0 - np.exp(-t / 2.0))
+
+    config = Config(
+        chi0=1.0, t0=0.01, depthS=-0.5, deltat=deltat, tstart=tstart, tend=tend
+    )
+    tdsr = TDSR1(config=config)
+    tdsr.chunksize = 2
+    weights = np.array([1.0, 2.0, 1.0])
+    loading = MatrixLoading(data=S, weights=weights, strend=strend)
+    _, chiz, cf, r, xn = tdsr(loading=loading, NZ=2000)
+    assert r.shape == (3, nt)
+    assert xn.shape == (3, nt - 1)
+    assert np.allclose(
+        tdsr.ratez_aggregate, np.sum(weights[:, None] * r, axis=0) / np.sum(weights)
+    )
+
+    common_loading = dict(
+        scal_t=1.0, scal_cf=1.0, tstart=tstart, tend=tend, deltat=deltat
+    )
+    for k in range(len(amplitude)):
+        single = CustomLoading(
+            data=np.transpose([t, S[k]]), strend=strend, **common_loading
+        )
+        _, chiz_k, _, r_k, xn_k = tdsr(loading=single, NZ=2000)
+        assert np.allclose(r[k], r_k, rtol=1e-12)
+        assert np.allclose(xn[k], xn_k, rtol=1e-12)
+        assert np.allclose(chiz[k], chiz_k, rtol=1e-12)
+
+
+def test_matrix_loading_length_mismatch():
+    loading = MatrixLoading(data=np.zeros((2, 10)))
+    with pytest.raises(InvalidParameter):
+        loading.values(length=11)
+    with pytest.raises(InvalidParameter):
+        MatrixLoading(data=np.zeros((2, 10)), weights=[1.0, 2.0, 3.0])
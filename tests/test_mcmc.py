@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for ensemble MCMC posterior sampling"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1
+from tdsr.calibration import log_likelihood
+from tdsr.exceptions import InvalidParameter, MissingParameter
+from tdsr.loading import MatrixLoading
+from tdsr.mcmc import EnsembleLikelihood, EnsembleSampler
+from tdsr.utils import load_checkpoint
+
+from .utils import quantile_catalog, step_setup
+
+NEVENTS = 300
+
+
+def setup():
+    config, loading = step_setup(NZ=1000)
+    t, _, _, ratez, _ = TDSR1(config=config)(
+        loading=loading, chi0=1.0, depthS=-0.3, t0=720.0
+    )
+    # deterministic catalog at the quantiles of the rate for chi0_true
+    events, expected = quantile_catalog(t, ratez, NEVENTS)
+    return config, loading, events, NEVENTS / expected
+
+
+def sampler(config, loading, events, **kwargs):
+    return EnsembleSampler(
+        TDSR1,
+        events,
+        dict(chi0=(1.0, 1000.0), depthS=(-1.0, -0.1)),
+        loading=loading,
+        config=config,
+        nwalkers=8,
+        seed=42,
+        t0=720.0,
+        **kwargs,
+    )
+
+
+def test_likelihood_is_batched():
+    config, loading, events, chi0_true = setup()
+    likelihood = EnsembleLikelihood(TDSR1, events, loading=loading, config=config, t0=720.0)
+    chi0 = np.array([0.5, 1.0, 2.0]) * chi0_true
+    loglike = likelihood(dict(chi0=chi0, depthS=np.full(3, -0.3)))
+    assert loglike.shape == (3,)
+    assert np.argmax(loglike) == 1
+
+
+def test_likelihood_sums_cells():
+    config, loading, events, chi0_true = setup()
+    t = TDSR1(config=config)(loading=loading)[0]
+    S = loading.values(length=len(t)) * np.array([[0.5], [1.0], [2.0]])
+    cells = MatrixLoading(data=S, strend=7e-5)
+    likelihood = EnsembleLikelihood(
+        TDSR1, events, loading=cells, config=config, t0=720.0
+    )
+    chi0 = np.array([0.5, 1.0]) * chi0_true
+    loglike = likelihood(dict(chi0=chi0, depthS=np.full(2, -0.3)))
+    for k, c in enumerate(chi0):
+        _, _, _, ratez, _ = TDSR1(config=config)(
+            loading=cells, chi0=c, depthS=-0.3, t0=720.0
+        )
+        expected = log_likelihood(t, ratez.sum(axis=0), events)
+        np.testing.assert_allclose(loglike[k], expected, rtol=1e-10)
+
+
+def test_sampler_posterior():
+    config, loading, events, chi0_true = setup()
+    s = sampler(config, loading, events)
+    chain = s.run(150)
+    assert chain.shape == (150, 8, 2)
+    assert 0.1 < np.mean(s.acceptance_fraction) < 0.9
+    burned = chain[75:].reshape(-1, 2)
+    np.testing.assert_allclose(np.median(burned[:, 0]), chi0_true, rtol=0.2)
+    np.testing.assert_allclose(np.median(burned[:, 1]), -0.3, rtol=0.2)
+    assert np.all(np.isfinite(s.logp))
+
+
+def test_sampler_resume(tmp_path):
+    config, loading, events, _ = setup()
+    filename = tmp_path / "chain.npz"
+    full = sampler(config, loading, events).run(12)
+    sampler(config, loading, events).run(5, filename=filename, save_every=2)
+    resumed = sampler(config, loading, events)
+    chain = resumed.run(12, filename=filename, save_every=2)
+    np.testing.assert_array_equal(chain, full)
+    # the chain is in its own files, the checkpoint only holds the resume state
+    np.testing.assert_array_equal(np.load(tmp_path / "chain_chain.npy"), full)
+    assert "chain" not in load_checkpoint(filename)
+    # a finished run is a no-op, a longer one extends the files
+    np.testing.assert_array_equal(sampler(config, loading, events).run(12, filename), full)
+    longer = sampler(config, loading, events).run(14, filename, save_every=2)
+    np.testing.assert_array_equal(longer[:12], full)
+    np.testing.assert_array_equal(sampler(config, loading, events).run(16)[:14], longer)
+
+
+def test_sampler_workers():
+    config, loading, events, _ = setup()
+    serial = sampler(config, loading, events).run(4)
+    parallel = sampler(config, loading, events, workers=2).run(4)
+    np.testing.assert_array_equal(serial, parallel)
+
+
+def test_sampler_invalid():
+    config, loading, events, _ = setup()
+    with pytest.raises(InvalidParameter):
+        EnsembleSampler(TDSR1, events, dict(chi0=(-1.0, 1.0)), loading=loading)
+    with pytest.raises(InvalidParameter):
+        EnsembleSampler(TDSR1, events, dict(bogus=(0.0, 1.0)), loading=loading)
+    with pytest.raises(InvalidParameter):
+        EnsembleSampler(
+            TDSR1, events, dict(chi0=(1.0, 2.0)), loading=loading, pf_renrom=3
+        )
+    with pytest.raises(InvalidParameter):
+        EnsembleSampler(TDSR1, events, dict(chi0=(1.0, 2.0)), loading=loading, nwalkers=3)
+    config.loading = None
+    with pytest.raises(MissingParameter):
+        EnsembleSampler(TDSR1, events, dict(chi0=(1.0, 2.0)), config=config)
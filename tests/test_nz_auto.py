@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test automatic choice of the stress axis resolution in TDSR1"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import StepLoading
+
+
+def test_nz_auto_meets_tolerance():
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    loading = StepLoading(strend=7.0e-5, sstep=0.5, deltat=360.0, config=config)
+    tdsr = TDSR1(config=config)
+    _, _, _, r_ref, _ = tdsr(loading=loading, iX0="uniform", NZ=100000)
+
+    previous = 0
+    for tol in [1e-2, 1e-3, 1e-4]:
+        _, _, _, r, _ = tdsr(loading=loading, iX0="uniform", NZ_auto=True, NZ_tol=tol)
+        assert tdsr.NZ_error <= tol
+        assert tdsr.NZ >= previous
+        assert np.max(np.abs(r - r_ref)) / np.max(r_ref) <= tol
+        # same result as a fixed grid of the chosen size
+        _, _, _, r_fixed, _ = tdsr(loading=loading, iX0="uniform", NZ=tdsr.NZ)
+        assert np.array_equal(r, r_fixed)
+        previous = tdsr.NZ
+
+
+def test_nz_auto_max():
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    loading = StepLoading(strend=7.0e-5, sstep=0.5, deltat=360.0, config=config)
+    tdsr = TDSR1(config=config)
+    with pytest.warns(UserWarning, match="NZ_max=2000"):
+        tdsr(loading=loading, NZ_auto=True, NZ_tol=1e-12, NZ_max=2000)
+    assert tdsr.NZ == 2000
+    assert tdsr.NZ_error > 1e-12
+    # no refinement below 2 * NZ_start
+    for NZ_max in [100, 2 * TDSR1.NZ_start - 1]:
+        with pytest.raises(InvalidParameter):
+            tdsr(loading=loading, NZ_auto=True, NZ_max=NZ_max)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test incremental update of the trigger probability in TDSR1"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import CyclicLoading, StepLoading
+
+
+def test_pf_incremental_step_loading():
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    loading = StepLoading(strend=7.0e-5, sstep=0.5, deltat=360.0, config=config)
+    tdsr = TDSR1(config=config)
+    for iX0 in ["equilibrium", "uniform", "gaussian"]:
+        _, chiz, _, r_direct, _ = tdsr(loading=loading, iX0=iX0, NZ=2000)
+        _, chiz_inc, _, r_inc, _ = tdsr(
+            loading=loading, iX0=iX0, NZ=2000, pf_incremental=True
+        )
+        assert np.allclose(r_inc, r_direct, rtol=1e-10, atol=0.0)
+        assert np.allclose(chiz_inc, chiz, rtol=1e-10, atol=0.0)
+
+
+def test_pf_incremental_renorm():
+    config = Config(deltat=60.0, tend=86400.0, depthS=-0.2, t0=720.0)
+    loading = CyclicLoading(ampsin=0.5, Tsin=7200.0, deltat=60.0, config=config)
+    tdsr = TDSR1(config=config)
+    _, _, _, r_direct, _ = tdsr(loading=loading, NZ=1000)
+    for renorm in [1, 10, 1000, 10000]:
+        _, _, _, r_inc, _ = tdsr(
+            loading=loading, NZ=1000, pf_incremental=True, pf_renorm=renorm
+        )
+        assert np.allclose(r_inc, r_direct, rtol=1e-10, atol=0.0)
+
+
+def test_pf_incremental_invalid_renorm():
+    tdsr = TDSR1(config=Config(deltat=360.0, tend=86400.0))
+    with pytest.raises(InvalidParameter):
+        tdsr(NZ=500, pf_incremental=True, pf_renorm=0)
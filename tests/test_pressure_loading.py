@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the vectorised pore-pressure loading of injections"""
+
+import math
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter, MissingParameter
+from tdsr.loading import MatrixLoading, PressureLoading
+from tdsr.loading.pressure import (
+    erfc,
+    fft_pressure,
+    hydraulic_factor,
+    read_flowrates,
+    read_pressure,
+    rudnicki_pressure,
+)
+from tdsr.utils import gridrange
+
+from .utils import DATA_DIR
+
+day2sec = 24 * 60 * 60.0
+
+
+def calculateP(Dm2s, tgrid, rdist, tq, dq):
+    """loop over the time samples as in examples/example_fig6def.py"""
+    fac = 1.0 / (4 * np.pi * hydraulic_factor(Dm2s))
+    P = np.zeros(len(tgrid))
+    for i in range(len(tgrid)):
+        t0 = tgrid[i]
+        dqi = dq[(tq < t0)]
+        dti = (t0 - tq[(tq < t0)]) * day2sec
+        psi = rdist / np.sqrt(Dm2s * dti)
+        P[i] = (fac / (Dm2s * rdist)) * np.sum(
+            dqi * np.array([math.erfc(0.5 * p) for p in psi])
+        )
+    return P
+
+
+def test_erfc():
+    x = np.concatenate([np.linspace(-6.0, 26.0, 20001), [2.0, np.inf, -np.inf]])
+    expected = np.array([math.erfc(v) for v in x])
+    assert np.allclose(erfc(x), expected, rtol=1e-12, atol=0.0)
+
+
+def test_rudnicki_pressure_matches_loop():
+    tq, dq = read_flowrates(DATA_DIR / "ktb_flowrates.dat")
+    _, _, _, t, _ = gridrange(tq[0] - 1.0, tq[-1] + 20.0, 0.5)
+    distances = np.array([331.0, 450.0, 607.5, 1490.0])
+    expected = np.array([calculateP(0.033, t, r, tq, dq) for r in distances])
+    P = rudnicki_pressure(t, distances, tq, dq, 0.033)
+    assert P.shape == (len(distances), len(t))
+    assert np.allclose(P, expected, rtol=1e-10, atol=1e-12 * np.max(expected))
+    # small blocks split distances and times
+    blocked = rudnicki_pressure(t, distances, tq, dq, 0.033, blocksize=3 * len(tq))
+    assert np.allclose(blocked, P, rtol=1e-12, atol=1e-12 * np.max(P))
+
+
+def test_pressure_loading_in_tdsr1():
+    tq, dq = read_flowrates(DATA_DIR / "ktb_flowrates.dat")
+    tstart, tend, deltat = tq[0] - 1.0, tq[0] + 60.0, 0.1
+    strend = 1e-6 * 30.0 / 365.25
+    config = Config(
+        chi0=1.0 / strend,
+        t0=0.01,
+        depthS=-1.0,
+        tstart=tstart,
+        tend=tend,
+        deltat=deltat,
+        taxis_log=False,
+        iX0="equilibrium",
+    )
+    distances = np.linspace(331.0, 607.5, 4)
+    loading = PressureLoading(
+        distances=distances,
+        tq=tq,
+        dq=dq,
+        diffusivity=0.033,
+        strend=strend,
+        config=config,
+    )
+    _, _, nt, t, _ = gridrange(tstart, tend, deltat)
+    assert loading.values(length=nt).shape == (len(distances), nt)
+    assert np.allclose(
+        loading.data,
+        1e-6 * rudnicki_pressure(t, distances, tq, dq, 0.033) + strend * (t - t[0]),
+    )
+
+    tdsr = TDSR1(config=config)
+    _, _, _, r, _ = tdsr(loading=loading)
+    matrix = MatrixLoading(data=loading.data, strend=strend)
+    _, _, _, r_matrix, _ = tdsr(loading=matrix)
+    assert r.shape == (len(distances), nt)
+    assert np.array_equal(r, r_matrix)
+
+
+def test_fft_pressure_matches_direct():
+    rng = np.random.default_rng(3)
+    _, _, nt, t, _ = gridrange(0.0, 50.0, 0.05)
+    distances = np.array([200.0, 500.0, 1500.0])
+    # changes on the time axis (and before it), where the sampling is exact
+    tq = np.sort(rng.choice(np.arange(-200, nt + 100), 300, replace=False)) * 0.05
+    dq = rng.normal(0.0, 1e-3, len(tq))
+    expected = rudnicki_pressure(t, distances, tq, dq, 0.033)
+    scale = np.max(np.abs(expected))
+    # few early changes far before t[0] are superposed exactly
+    early = np.concatenate(([-400.0], tq[tq >= 0]))
+    dq_early = np.concatenate(([2e-3], dq[tq >= 0]))
+    expected_early = rudnicki_pressure(t, distances, early, dq_early, 0.033)
+    for blocklength, blocksize in ((None, 1 << 22), (64, 1000)):
+        blocks = dict(blocklength=blocklength, blocksize=blocksize)
+        P = fft_pressure(t, distances, tq, dq, 0.033, **blocks)
+        assert P.shape == (len(distances), nt)
+        assert np.allclose(P, expected, rtol=0.0, atol=1e-10 * scale)
+        P = fft_pressure(t, distances, early, dq_early, 0.033, **blocks)
+        assert np.allclose(P, expected_early, rtol=0.0, atol=1e-10 * scale)
+
+    # changes between samples are split linearly between them
+    tq_off = tq + 0.3 * 0.05
+    P = fft_pressure(t, distances, tq_off, dq, 0.033)
+    expected = rudnicki_pressure(t, distances, tq_off, dq, 0.033)
+    assert np.allclose(P, expected, rtol=0.0, atol=1e-2 * scale)
+
+    with pytest.raises(InvalidParameter):
+        fft_pressure(np.logspace(0, 1, 10), distances, tq, dq, 0.033)
+
+
+def test_pressure_loading_fft_from_file():
+    tstart, tend, deltat = 150.0, 300.0, 0.1
+    common = dict(
+        distances=[331.0, 607.5],
+        diffusivity=0.033,
+        strend=1e-7,
+        tstart=tstart,
+        tend=tend,
+        deltat=deltat,
+    )
+    file = DATA_DIR / "ktb_flowrates.dat"
+    loading = PressureLoading(file=file, method="fft", taxis_log=False, **common)
+    tq, dq = read_flowrates(file)
+    direct = PressureLoading(tq=tq, dq=dq, taxis_log=False, **common)
+    assert np.allclose(loading.data, direct.data, rtol=1e-8, atol=1e-12)
+    with pytest.raises(InvalidParameter):
+        PressureLoading(file=file, method="fft", taxis_log=True, ntlog=100, **common)
+
+    tp, p = read_pressure(DATA_DIR / "ktb_HBpressure.dat")
+    assert len(tp) == len(p) > 0
+
+
+def test_pressure_loading_invalid():
+    with pytest.raises(MissingParameter):
+        PressureLoading(distances=[100.0], tq=[0.0], dq=[1e-3])
+    with pytest.raises(InvalidParameter):
+        rudnicki_pressure([1.0, 2.0], [0.0], [0.0], [1e-3], 0.033)
+    with pytest.raises(InvalidParameter):
+        rudnicki_pressure([1.0, 2.0], [10.0], [0.0, 1.0], [1e-3], 0.033)
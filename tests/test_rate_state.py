@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the vectorised rate and state solver"""
+
+import numpy as np
+import pytest
+
+from tdsr import Config, RSM, RSD
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import RampLoading, StepLoading
+
+
+def rsm_loop(cf, strend, deltat, depthS, chi0):
+    """reference implementation (former RSM._compute loop)"""
+    nt = len(cf)
+    dS = np.ediff1d(cf, to_end=strend)
+    Asig = -depthS
+    ratez = np.zeros(nt)
+    ratez[0] = 1.0
+    gamma = 1.0
+    for i in range(1, nt):
+        dum = gamma / strend
+        gamma = (dum - deltat / dS[i - 1]) * np.exp(-dS[i - 1] / Asig) + deltat / dS[
+            i - 1
+        ]
+        gamma *= strend
+        ratez[i] = 1.0 / gamma
+    return ratez * chi0 * strend
+
+
+def rsd_loop(cf, strend, deltat, depthS, chi0):
+    """reference implementation (former RSD._compute loop)"""
+    nt = len(cf)
+    dS = np.ediff1d(cf, to_end=strend)
+    Asig = -depthS
+    ratez = np.zeros(nt)
+    ratez[0] = 1.0
+    gamma = 1.0
+    for i in range(1, nt):
+        gamma = (gamma / strend - deltat / dS[i - 1]) * np.exp(
+            (-dS[i - 1] + Asig * np.log(strend)) / Asig
+        ) + strend * deltat / dS[i - 1]
+        ratez[i] = 1.0 / gamma
+    return ratez * chi0 * strend
+
+
+def loadings(config):
+    tstep = 0.5 * (config.tend - config.tstart)
+    return [
+        StepLoading(strend=7e-5, sstep=1.0, tstep=tstep, config=config),
+        RampLoading(strend=7e-5, strend2=7e-4, strend3=7e-5, nsample2=20, config=config),
+    ]
+
+
+@pytest.mark.parametrize("model, loop", [(RSM, rsm_loop), (RSD, rsd_loop)])
+@pytest.mark.parametrize("depthS", [-0.5, -0.05])
+def test_rate_state_matches_loop(model, loop, depthS):
+    config = Config(deltat=720.0, tstart=0.0, tend=86400.0)
+    for loading in loadings(config):
+        t, _, cf, ratez, _ = model()(
+            loading=loading, depthS=depthS, chi0=1e4, deltat=720.0, tend=86400.0
+        )
+        expected = loop(cf, loading.strend, 720.0, depthS, 1e4)
+        np.testing.assert_allclose(ratez, expected, rtol=1e-9)
+
+
+def test_rate_state_ensemble():
+    config = Config(deltat=720.0, tstart=0.0, tend=86400.0)
+    loading = loadings(config)[1]
+    depthS = np.array([-0.2, -0.5, -1.0])
+    strend = np.array([7e-5, 1e-4, 3e-5])
+    rsm = RSM()
+    t, cf_shad, cf, ratez, neqz = rsm.ensemble(
+        depthS=depthS, strend=strend, loading=loading, chi0=1e4
+    )
+    assert ratez.shape == (3, len(t))
+    assert neqz.shape == (3, len(t) - 1)
+    for k in range(3):
+        expected = rsm_loop(cf, strend[k], config.deltat, depthS[k], 1e4)
+        np.testing.assert_allclose(ratez[k], expected, rtol=1e-9)
+
+
+def test_rate_state_large_stress_change():
+    # exp(-dS/Asig) underflows in the loop, the log-space scan stays finite
+    config = Config(deltat=720.0, tstart=0.0, tend=86400.0)
+    loading = StepLoading(strend=7e-5, sstep=500.0, tstep=43200.0, config=config)
+    _, _, _, ratez, _ = RSM()(loading=loading, depthS=-0.5, tend=86400.0)
+    assert np.all(np.isfinite(ratez))
+    assert np.all(ratez > 0)
+
+
+def test_rate_state_invalid_strend():
+    config = Config(deltat=720.0, tstart=0.0, tend=86400.0)
+    loading = StepLoading(strend=7e-5, sstep=1.0, tstep=43200.0, config=config)
+    with pytest.raises(InvalidParameter):
+        RSM().ensemble(strend=[7e-5, -1e-5], loading=loading)
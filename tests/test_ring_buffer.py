@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the ring buffer stress state of LCM and TDSR"""
+
+import numpy as np
+
+from tdsr import LCM, TDSR, Config
+from tdsr.loading import CyclicLoading, StepLoading
+from tdsr.utils import RingBuffer, shifted
+
+
+def reference(model, config):
+    # the shift and cut-off loop of LCM._compute before the ring buffer
+    chiz = np.heaviside(-model.sigma, 0)
+    nshift = np.around(-1.0 * config.Sshadow / config.deltaS, 0).astype(int)
+    chiz = shifted(chiz, nshift)
+    ratez = np.zeros(model.nt)
+    resid = 0.0
+    for i in range(1, model.nt):
+        deltacf = model.cf[i] - (model.cf[i - 1] - resid)
+        nshift = np.around(deltacf / config.deltaS, 0).astype(int)
+        resid = deltacf - nshift * config.deltaS
+        chiz = shifted(chiz, nshift)
+        ratez[i] = np.trapz(config.chi0 * chiz * model.pz * config.deltaS)
+        ratez[i] /= model.dt[i]
+        chiz = chiz * (1.0 - model.pz)
+    return chiz, ratez
+
+
+def test_ring_buffer_shift():
+    rng = np.random.default_rng(2)
+    x = rng.random(50)
+    w = rng.random(50)
+    ring = RingBuffer(x)
+    for nshift in rng.integers(-60, 60, 200):
+        x = shifted(x, nshift)
+        ring.shift(nshift)
+        assert np.array_equal(ring.values(), x)
+        assert np.isclose(ring.dot(w), np.dot(x, w))
+        assert ring.first == x[0] and ring.last == x[-1]
+        ring.multiply(w)
+        x = x * w
+        assert np.array_equal(ring.values(), x)
+
+
+def test_lcm_tdsr_reference():
+    config = Config(deltat=720.0, tend=86400.0, depthS=-0.3, Sshadow=0.2)
+    loadings = [
+        StepLoading(strend=7.0e-5, sstep=0.5, deltat=720.0, config=config),
+        CyclicLoading(ampsin=0.5, Tsin=7200.0, deltat=720.0, config=config),
+    ]
+    for model in [LCM(config=config), TDSR(config=config)]:
+        for loading in loadings:
+            _, chiz, _, ratez, _ = model(loading=loading)
+            chiz_ref, ratez_ref = reference(model, model.config)
+            assert np.array_equal(chiz, chiz_ref)
+            assert np.allclose(ratez, ratez_ref, rtol=1e-12, atol=0.0)
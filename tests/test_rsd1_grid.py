@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for batched RSD1 (Heimisson & Segall) grids"""
+
+import numpy as np
+import pytest
+
+from tdsr import Config, RSD1
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import RampLoading, StepLoading
+
+
+def rsd1_reference(t, cf, Sshadow, depthS, strend, chi0):
+    """reference implementation (former RSD1._compute)"""
+    t1 = np.min(t[(cf > Sshadow)])
+    if t1 > t[0]:
+        i0 = np.argmax(t[(t < t1)])
+        tb = np.interp(Sshadow, cf[i0 : i0 + 2], t[i0 : i0 + 2])
+    else:
+        tb = t[0]
+    ti = t[(t >= tb)] - tb
+    Si = cf[(t >= tb)] - Sshadow
+    dt = np.ediff1d(ti, to_end=ti[-1] - ti[-2])
+    Asig = -depthS
+    ta = Asig / strend
+    K = np.exp(Si / Asig)
+    integK = np.cumsum(K * dt)
+    ratez = np.zeros(len(t))
+    ratez[(t >= tb)] = chi0 * strend * K / (1.0 + integK / ta)
+    return ratez
+
+
+def loadings(config):
+    return [
+        StepLoading(strend=7e-5, sstep=1.0, tstep=43200.0, config=config),
+        RampLoading(strend=7e-5, strend2=7e-4, strend3=7e-5, nsample2=20, config=config),
+    ]
+
+
+@pytest.mark.parametrize("index", [0, 1])
+def test_rsd1_grid_matches_reference(index):
+    config = Config(deltat=720.0, tstart=0.0, tend=86400.0)
+    loading = loadings(config)[index]
+    Sshadow = np.array([-0.5, 0.0, 0.5, 1.5, 2.5, 3.0])
+    depthS = np.array([-0.1, -0.5, -1.0])
+    t, cf_shad, cf, ratez, neqz = RSD1().grid(
+        Sshadow=Sshadow, depthS=depthS, loading=loading, chi0=1e4, chunksize=4
+    )
+    assert ratez.shape == (len(Sshadow), len(depthS), len(t))
+    assert neqz.shape == (len(Sshadow), len(depthS), len(t) - 1)
+    assert cf_shad.shape == (len(Sshadow), 1, len(t))
+    for i, S in enumerate(Sshadow):
+        for j, d in enumerate(depthS):
+            expected = rsd1_reference(t, cf, S, d, loading.strend, 1e4)
+            np.testing.assert_allclose(ratez[i, j], expected, rtol=1e-8, atol=0)
+
+
+def test_rsd1_call_uses_grid():
+    config = Config(deltat=720.0, tstart=0.0, tend=86400.0)
+    loading = loadings(config)[0]
+    t, _, cf, ratez, _ = RSD1()(loading=loading, Sshadow=1.2, depthS=-0.3)
+    expected = rsd1_reference(t, cf, 1.2, -0.3, loading.strend, RSD1().config.chi0)
+    np.testing.assert_allclose(ratez, expected, rtol=1e-8)
+
+
+def test_rsd1_grid_no_onset():
+    config = Config(deltat=720.0, tstart=0.0, tend=86400.0)
+    loading = loadings(config)[0]
+    _, _, cf, ratez, _ = RSD1().grid(Sshadow=[0.0, 100.0], depthS=-0.5, loading=loading)
+    assert np.all(ratez[1] == 0)
+    assert np.all(np.isfinite(ratez))
+
+
+def test_rsd1_grid_invalid():
+    with pytest.raises(InvalidParameter):
+        RSD1().grid(Sshadow=[[0.0, 1.0]])
+    with pytest.raises(InvalidParameter):
+        RSD1().grid(Sshadow=[0.0, 1.0], pf_renrom=3)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test closed-form segment propagation for piecewise-linear loadings"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import (
+    BackgroundLoading,
+    CyclicLoading,
+    FourPointLoading,
+    Loading,
+    MatrixLoading,
+    RampLoading,
+    StepLoading,
+    TrendchangeLoading,
+)
+
+
+def loadings(config):
+    deltat = config.deltat
+    return [
+        StepLoading(strend=7.0e-5, sstep=0.5, deltat=deltat, config=config),
+        BackgroundLoading(strend=7.0e-5, deltat=deltat, tend=config.tend),
+        TrendchangeLoading(
+            strend=7.0e-5, strend2=7.0e-4, deltat=deltat, config=config
+        ),
+        RampLoading(strend=7.0e-5, strend2=7.0e-4, deltat=deltat, config=config),
+    ]
+
+
+def test_segments_match_values():
+    config = Config(deltat=360.0, tend=86400.0)
+    nt = 240
+    fourpoint = FourPointLoading(n1=50, n2=51, deltat=360.0, sc2=-1.0)
+    for loading in loadings(config) + [fourpoint]:
+        breaks = loading.segments(nt)
+        # explicit breakpoints agree with the kinks of the sampled loading
+        assert np.array_equal(breaks, Loading.segments(loading, nt))
+        cf = loading.values(nt)
+        for a, b in zip(breaks[:-1], breaks[1:]):
+            assert np.allclose(cf[a : b + 1], np.linspace(cf[a], cf[b], b - a + 1))
+
+
+def test_segments_exact():
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    tdsr = TDSR1(config=config)
+    cyclic = CyclicLoading(deltat=360.0, config=config)
+    for loading in loadings(config) + [cyclic]:
+        for iX0 in ["equilibrium", "uniform", "gaussian"]:
+            _, chiz, _, r_exp, _ = tdsr(
+                loading=loading,
+                iX0=iX0,
+                NZ=2000,
+                integrator="exponential",
+                pf_average=True,
+            )
+            _, chiz_seg, _, r_seg, _ = tdsr(
+                loading=loading, iX0=iX0, NZ=2000, integrator="segments"
+            )
+            atol = 1e-12 * np.max(r_exp)
+            assert np.allclose(r_seg, r_exp, rtol=1e-10, atol=atol)
+            atol = 1e-12 * np.max(chiz)
+            assert np.allclose(chiz_seg, chiz, rtol=1e-10, atol=atol)
+
+
+def test_segments_multi_cell():
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    tdsr = TDSR1(config=config)
+    data = np.cumsum(np.full((2, 240), 7.0e-5 * 360.0), axis=1)
+    with pytest.raises(InvalidParameter):
+        tdsr(loading=MatrixLoading(data=data), NZ=500, integrator="segments")
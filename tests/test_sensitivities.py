@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for tangent-linear sensitivities of TDSR1 rates"""
+
+import numpy as np
+import pytest
+
+import tdsr.tdsr
+from tdsr import TDSR1
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import RampLoading
+
+from .utils import day_config
+
+INTEGRATORS = [("euler", False), ("exponential", False), ("exponential", True)]
+
+
+def setup(**kwargs):
+    config = day_config(NZ=5000)
+    loading = RampLoading(
+        strend=7e-5, strend2=7e-4, strend3=7e-5, nsample2=20, config=config
+    )
+    params = dict(loading=loading, chi0=1e4, t0=720.0, depthS=-0.5, **kwargs)
+    return config, params
+
+
+def central_difference(config, params, name, h):
+    up, down = dict(params), dict(params)
+    up[name] += h
+    down[name] -= h
+    rates_up = TDSR1(config=config)(**up)[3]
+    rates_down = TDSR1(config=config)(**down)[3]
+    return (rates_up - rates_down) / (2 * h)
+
+
+@pytest.fixture
+def fixed_stress_axis(monkeypatch):
+    # the stress axis depends on depthS; dratez["depthS"] holds it fixed, so
+    # the finite differences must not see it move
+    Zvalues = tdsr.tdsr.Zvalues
+    monkeypatch.setattr(
+        tdsr.tdsr,
+        "Zvalues",
+        lambda S, Sstep, t0, dsig, NZ=10000: Zvalues(S, Sstep, t0, 0.5, NZ=NZ),
+    )
+
+
+@pytest.mark.parametrize("integrator, pf_average", INTEGRATORS)
+@pytest.mark.parametrize(
+    "iX0, names, extra",
+    [
+        ("equilibrium", ["chi0", "t0", "depthS"], {}),
+        ("uniform", ["chi0", "t0", "depthS"], dict(Sshadow=0.3)),
+        (
+            "gaussian",
+            ["chi0", "t0", "depthS", "Zmean", "Zstd"],
+            dict(Zmean=1.0, Zstd=0.5),
+        ),
+    ],
+)
+def test_sensitivities_match_finite_differences(
+    fixed_stress_axis, integrator, pf_average, iX0, names, extra
+):
+    config, params = setup(
+        iX0=iX0, integrator=integrator, pf_average=pf_average, **extra
+    )
+    model = TDSR1(config=config)
+    _, _, _, ratez, _ = model(sensitivities=names, **params)
+    np.testing.assert_array_equal(ratez, TDSR1(config=config)(**params)[3])
+    assert list(model.dratez) == names
+    for name in names:
+        fd = central_difference(config, params, name, 1e-6 * abs(params[name]))
+        scale = np.max(np.abs(ratez)) / abs(params[name])
+        np.testing.assert_allclose(model.dratez[name], fd, rtol=0, atol=1e-6 * scale)
+
+
+def test_sensitivity_to_sshadow():
+    # the edge of the uniform distribution is resolved by the stress axis only,
+    # so the finite difference needs a step of several nodes
+    config, params = setup(iX0="uniform", integrator="exponential", Sshadow=0.3)
+    model = TDSR1(config=config)
+    model(sensitivities=["Sshadow"], **params)
+    fd = central_difference(config, params, "Sshadow", 0.05)
+    dratez = model.dratez["Sshadow"]
+    assert np.max(np.abs(dratez - fd)) < 0.05 * np.max(np.abs(fd))
+
+
+def test_sensitivities_invalid():
+    config, params = setup()
+    with pytest.raises(InvalidParameter):
+        TDSR1(config=config)(sensitivities=["bogus"], **params)
+    with pytest.raises(InvalidParameter):
+        TDSR1(config=config)(sensitivities=["t0"], band=True, **params)
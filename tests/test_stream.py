@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the streaming TDSR1 simulator"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, TDSR1Stream, Config
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import CyclicLoading
+
+
+def test_stream_matches_batch():
+    config = Config(deltat=60.0, tend=43200.0, depthS=-0.2, t0=720.0)
+    config.loading = CyclicLoading(
+        ampsin=0.5, Tsin=7200.0, deltat=60.0, config=config
+    )
+    tdsr = TDSR1(config=config)
+    rng = np.random.default_rng(0)
+    for kwargs in [
+        dict(),
+        dict(pf_incremental=True, pf_renorm=7),
+        dict(integrator="exponential", pf_average=True),
+    ]:
+        t, chiz, cf, ratez, _ = tdsr(NZ=1000, **kwargs)
+        stream = TDSR1Stream(config, NZ=1000, S0=cf[0], **kwargs)
+        rates = [stream.step(cf[1], t[1])]
+        i = 2
+        while i < len(t):
+            m = rng.integers(1, 50)
+            rates.append(stream.advance(cf[i : i + m], t[i : i + m]))
+            i += m
+        rates = np.hstack(rates)
+        assert np.array_equal(rates, ratez[:-1])
+        assert stream.nstep == len(t) - 1
+        assert stream.t == t[-1]
+        assert np.isclose(stream.neq, np.sum(ratez[:-1] * np.diff(t)))
+
+
+def test_stream_loading():
+    config = Config(deltat=60.0, tend=43200.0, depthS=-0.2, t0=720.0)
+    loading = CyclicLoading(ampsin=0.5, Tsin=7200.0, deltat=60.0, config=config)
+    t, _, cf, ratez, _ = TDSR1(config=config)(NZ=1000, loading=loading)
+    stream = TDSR1Stream(config, NZ=1000, S0=cf[0], loading=loading)
+    assert np.array_equal(stream.advance(cf[1:], t[1:]), ratez[:-1])
+
+
+def test_stream_invalid():
+    config = Config(deltat=60.0, tend=43200.0, depthS=-0.2, t0=720.0)
+    with pytest.raises(InvalidParameter):
+        TDSR1Stream(config, band=True)
+    with pytest.raises(InvalidParameter):
+        TDSR1Stream(config, pf_renrom=3)
+    stream = TDSR1Stream(config, NZ=500)
+    stream.step(0.1, 60.0)
+    with pytest.raises(InvalidParameter):
+        stream.step(0.2, 60.0)
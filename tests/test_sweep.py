@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for parameter sweeps"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import MatrixLoading
+from tdsr.sweep import sweep
+
+from .utils import step_setup
+
+
+def test_sweep_matches_single_runs():
+    config, loading = step_setup(NZ=2000)
+    grid = dict(depthS=[-0.3, -0.5, -1.0], t0=[360.0, 720.0])
+    result = sweep(TDSR1, loading, grid, config=config, workers=2, chunksize=1)
+    assert result.shape == (3, 2)
+    assert result.ratez.shape == (3, 2, len(result.t))
+    assert not result.errors
+    for i, depthS in enumerate(grid["depthS"]):
+        for j, t0 in enumerate(grid["t0"]):
+            _, _, _, ratez, neqz = TDSR1(config=config)(
+                loading=loading, depthS=depthS, t0=t0
+            )
+            np.testing.assert_array_equal(result.ratez[i, j], ratez)
+            np.testing.assert_array_equal(result.neqz[i, j], neqz)
+
+
+def test_sweep_serial_equals_parallel():
+    config, _ = step_setup(NZ=2000)
+    data = np.cumsum(np.full((3, 120), 0.01), axis=1)
+    loading = MatrixLoading(data=data, strend=7e-5)
+    grid = dict(depthS=[-0.3, -0.5], chi0=[1e3, 1e4])
+    serial = sweep(TDSR1, loading, grid, config=config, workers=1)
+    parallel = sweep(TDSR1, loading, grid, config=config, workers=3)
+    assert serial.ratez.shape == (2, 2, 3, 120)
+    np.testing.assert_array_equal(serial.ratez, parallel.ratez)
+
+
+def test_sweep_captures_errors():
+    config, loading = step_setup(NZ=2000)
+    result = sweep(
+        TDSR1, loading, dict(Zgrid=["uniform", "bogus"]), config=config, workers=2
+    )
+    assert list(result.errors) == [(1,)]
+    assert "InvalidParameter" in result.errors[(1,)]
+    assert list(result.failed) == [False, True]
+    assert np.all(np.isfinite(result.ratez[0]))
+    assert np.all(np.isnan(result.ratez[1]))
+    assert result.neqz.shape == (2, len(result.t) - 1)
+
+    # without any successful run the outputs are NaN as well
+    result = sweep(TDSR1, loading, dict(Zgrid=["bogus"]), config=config, workers=1)
+    assert result.ratez.shape == (1, len(result.t))
+    assert np.all(np.isnan(result.ratez)) and np.all(np.isnan(result.neqz))
+
+
+def test_sweep_invalid_grid():
+    config, loading = step_setup(NZ=2000)
+    with pytest.raises(InvalidParameter):
+        sweep(TDSR1, loading, dict(deltat=[360.0, 720.0]), config=config)
+    with pytest.raises(InvalidParameter):
+        sweep(TDSR1, loading, dict(bogus=[1.0]), config=config)
+    with pytest.raises(InvalidParameter):
+        sweep(TDSR1, loading, dict(t0=[720.0]), config=config, pf_renrom=3)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test the superposed pore-pressure loading of several wells"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter, MissingParameter
+from tdsr.loading import MatrixLoading, WellsLoading
+from tdsr.loading.pressure import read_flowrates, rudnicki_pressure
+from tdsr.loading.wells import well_pressure
+from tdsr.utils import gridrange
+
+from .utils import DATA_DIR
+
+FLOW_FILE = DATA_DIR / "ktb_flowrates.dat"
+
+
+@pytest.fixture
+def field():
+    tq, dq = read_flowrates(FLOW_FILE)
+    wells = np.array([[0.0, 0.0, -4000.0], [300.0, 100.0, -4200.0]])
+    # the second well produces, starting later
+    flows = [(tq, dq), (tq + 3.0, -0.4 * dq)]
+    _, _, _, t, _ = gridrange(150.0, 300.0, 0.25)
+    return t, wells, flows
+
+
+def expected_pressure(t, wells, flows, targets):
+    r = np.linalg.norm(targets[:, None, :] - wells[None, :, :], axis=-1)
+    return sum(
+        rudnicki_pressure(t, r[:, w], tq, dq, 0.033)
+        for w, (tq, dq) in enumerate(flows)
+    )
+
+
+def test_well_pressure_superposition(field):
+    t, wells, flows = field
+    rng = np.random.default_rng(5)
+    targets = rng.uniform([-1000, -1000, -5000], [1000, 1000, -3000], (40, 3))
+    expected = expected_pressure(t, wells, flows, targets)
+    scale = np.max(np.abs(expected))
+
+    P = well_pressure(t, wells, flows, targets, 0.033)
+    assert P.shape == (len(targets), len(t))
+    assert np.allclose(P, expected, rtol=1e-12, atol=1e-12 * scale)
+    # blocks of a few targets
+    P = well_pressure(t, wells, flows, targets, 0.033, blocksize=3 * len(t))
+    assert np.allclose(P, expected, rtol=1e-12, atol=1e-12 * scale)
+
+    # FFT at the distances of all pairs is exact (flow changes on the axis)
+    for blocksize in (1 << 22, 3 * len(t)):
+        P = well_pressure(
+            t, wells, flows, targets, 0.033, method="fft", blocksize=blocksize
+        )
+        assert np.allclose(P, expected, rtol=0.0, atol=1e-10 * scale)
+    # interpolated in the distance table
+    P = well_pressure(t, wells, flows, targets, 0.033, method="fft", ndistances=32)
+    assert np.allclose(P, expected, rtol=0.0, atol=1e-5 * scale)
+
+
+def test_well_pressure_single_well_and_files(field):
+    t, wells, flows = field
+    targets = np.array([[0.0, 0.0, -4000.0 + r] for r in (0.0, 331.0, 607.5)])
+    P = well_pressure(t, wells[:1], [FLOW_FILE], targets, 0.033, radius=1.0)
+    expected = rudnicki_pressure(t, [1.0, 331.0, 607.5], *flows[0], 0.033)
+    assert np.allclose(P, expected, rtol=1e-12, atol=0.0)
+
+
+def test_wells_loading_in_tdsr1(field):
+    t, wells, flows = field
+    strend = 1e-6 * 30.0 / 365.25
+    config = Config(
+        chi0=1.0 / strend,
+        t0=0.01,
+        depthS=-1.0,
+        tstart=150.0,
+        tend=300.0,
+        deltat=0.25,
+        taxis_log=False,
+        iX0="equilibrium",
+    )
+    targets = np.array([[100.0, 0.0, -4100.0], [0.0, 400.0, -3900.0]])
+    loading = WellsLoading(
+        wells=wells,
+        flows=flows,
+        targets=targets,
+        strend=strend,
+        method="fft",
+        config=config,
+    )
+    expected = expected_pressure(t, wells, flows, targets)
+    assert np.allclose(
+        loading.data,
+        1e-6 * expected + strend * (t - t[0]),
+        rtol=0.0,
+        atol=1e-10 * np.max(np.abs(1e-6 * expected)),
+    )
+
+    tdsr = TDSR1(config=config)
+    _, _, _, r, _ = tdsr(loading=loading)
+    _, _, _, r_matrix, _ = tdsr(loading=MatrixLoading(data=loading.data, strend=strend))
+    assert r.shape == (len(targets), len(t))
+    assert np.array_equal(r, r_matrix)
+
+
+def test_wells_loading_invalid(field):
+    t, wells, flows = field
+    with pytest.raises(MissingParameter):
+        WellsLoading(wells=wells, flows=flows)
+    with pytest.raises(InvalidParameter):
+        well_pressure(t, wells, flows[:1], [[0.0, 0.0, 0.0]], 0.033)
+    with pytest.raises(InvalidParameter):
+        well_pressure(t, wells, flows, [[0.0, 0.0]], 0.033)
+    with pytest.raises(InvalidParameter):
+        well_pressure(t, wells, flows, [[0.0, 0.0, 0.0]], 0.033, method="spline")
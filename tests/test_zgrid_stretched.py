@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Test TDSR1 on a stretched (non-uniform) stress axis"""
+
+import numpy as np
+import pytest
+
+from tdsr import TDSR1, Config
+from tdsr.exceptions import InvalidParameter
+from tdsr.loading import StepLoading
+from tdsr.utils import Zvalues, Zvalues_stretched
+
+
+def test_zvalues_stretched():
+    S = np.linspace(0.0, 2.0, 100)
+    Zu = Zvalues(S, 0.0, 0.0, 0.5, NZ=1000)
+    Z = Zvalues_stretched(S, 0.0, 0.0, 0.5, NZ=1000, Zedges=[-4.0], stretch=4.0)
+    assert len(Z) == 1000
+    assert np.isclose(Z[0], Zu[0]) and np.isclose(Z[-1], Zu[-1])
+    assert np.all(np.diff(Z) > 0)
+    dZ = np.diff(Z)
+    # refined near the failure front and the edge, coarse in the tails
+    assert np.interp(1.0, Z[:-1], dZ) < 0.3 * dZ[-1]
+    assert np.interp(-4.0, Z[:-1], dZ) < 0.3 * dZ[-1]
+    # the edge of the initial distribution is a node
+    assert -4.0 in Z
+
+
+@pytest.mark.parametrize(
+    "iX0, Sshadow",
+    [("equilibrium", 0.3), ("gaussian", 0.3), ("uniform", 0.3), ("uniform", 0.0)],
+)
+def test_stretched_convergence(iX0, Sshadow):
+    config = Config(deltat=360.0, tend=86400.0, depthS=-0.3, t0=720.0)
+    loading = StepLoading(strend=7.0e-5, sstep=0.5, deltat=360.0, config=config)
+    tdsr = TDSR1(config=config)
+    common = dict(loading=loading, iX0=iX0, Sshadow=Sshadow)
+    _, _, _, r_ref, _ = tdsr(NZ=200000, **common)
+
+    def error(**kwargs):
+        _, _, _, r, _ = tdsr(**common, **kwargs)
+        return np.max(np.abs(r - r_ref)) / np.max(r_ref)
+
+    errors = []
+    for NZ in [500, 2000]:
+        errors.append(error(NZ=NZ, Zgrid="stretched"))
+        assert errors[-1] < error(NZ=NZ)
+    assert errors[1] < errors[0]
+    if iX0 == "equilibrium":
+        # same accuracy with several times fewer nodes
+        assert error(NZ=500, Zgrid="stretched") < error(NZ=1500)
+
+
+def test_invalid_zgrid():
+    tdsr = TDSR1()
+    with pytest.raises(InvalidParameter):
+        tdsr(Zgrid="random")
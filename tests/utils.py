@@ -1,7 +1,12 @@
 import pickle as pkl
 from pathlib import Path
+import numpy as np
+import numpy.typing as npt
+from tdsr import Config
+from tdsr.loading import StepLoading
 from tdsr.types import PathLike
-from typing import List, Any
+from tdsr.utils import cumulative_integral
+from typing import List, Any, Tuple
 
 
 def ensure_dirs(*paths: List[PathLike]):
@@ -35,3 +40,27 @@ def dump_values(key: str, values: Any, overwrite: bool = False) -> None:
     if overwrite or not vf.is_file():
         with open(vf, "wb") as f:
             return pkl.dump(values, f)
+
+
+def day_config(**kwargs: Any) -> Config:
+    """config of one day sampled every 720 s"""
+    return Config(deltat=720.0, tstart=0.0, tend=86400.0, **kwargs)
+
+
+def step_setup(**kwargs: Any) -> Tuple[Config, StepLoading]:
+    """:func:`day_config` and a stress step at noon on a tectonic trend"""
+    config = day_config(**kwargs)
+    loading = StepLoading(strend=7e-5, sstep=1.0, tstep=43200.0, config=config)
+    return config, loading
+
+
+def quantile_catalog(
+    t: npt.NDArray[np.float64], ratez: npt.NDArray[np.float64], nevents: int
+) -> Tuple[npt.NDArray[np.float64], float]:
+    """
+    deterministic catalog of ``nevents`` event times at the quantiles of
+    the cumulative rate, and the expected number of events
+    """
+    cumulative = cumulative_integral(ratez, t)
+    levels = (np.arange(nevents) + 0.5) / nevents * cumulative[-1]
+    return np.interp(levels, cumulative, t), float(cumulative[-1])